@@ -0,0 +1,91 @@
+"""Benchmark DSPy inference against the pre-rendered prompt fast path.
+
+Starts a local OpenAI-compatible stub server and answers the same questions
+through (a) ``predict_answer`` on a loaded program and (b) a
+``FastPersonaClient`` built from the exported template, both over one shared
+``ConnectionPool``. Questions are unique so DSPy's cache never hits. CPU
+time includes the in-process stub server, which is the same for both. Run
+from the repo root:
+
+    python benchmarks/fast_path.py --requests 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from _stub import start_stub_server
+from persona_gepa.fast_path import FastPersonaClient, export_prompt_template
+from persona_gepa.http_pool import ConnectionPool
+from persona_gepa.infer import predict_answer
+from persona_gepa.program import PersonaAnswerProgram
+from persona_gepa.utils import build_lm
+
+
+MODEL = "openai/stub-model"
+HISTORY = "".join(f"Q: Question {idx}?\nA: Answer number {idx}.\n" for idx in range(20))
+REPLY = "[[ ## answer ## ]]\nSure.\n\n[[ ## completed ## ]]"
+
+
+def _run(call: Callable[[int], str], requests: int) -> dict:
+    latencies: List[float] = []
+    cpu_start = time.process_time()
+    for idx in range(requests):
+        start = time.perf_counter()
+        call(idx)
+        latencies.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu_start
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1e3,
+        "cpu_ms_per_call": cpu / requests * 1e3,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    server, api_base = start_stub_server(REPLY)
+
+    pool = ConnectionPool(max_connections=4)
+    lm = build_lm(MODEL, 0.2, 64, api_base=api_base, api_key="stub", pool=pool)
+    program = PersonaAnswerProgram(lm=lm)
+    client = FastPersonaClient(
+        export_prompt_template(program),
+        MODEL,
+        temperature=0.2,
+        max_tokens=64,
+        api_base=api_base,
+        api_key="stub",
+        pool=pool,
+    )
+
+    def _dspy(idx: int) -> str:
+        return predict_answer(program, lm, HISTORY, f"Question {idx} ({time.time_ns()})?")
+
+    def _fast(idx: int) -> str:
+        return client.answer(HISTORY, f"Question {idx} ({time.time_ns()})?")
+
+    print(f"{'mode':>8} {'p50_ms':>8} {'p95_ms':>8} {'cpu_ms/call':>12}")
+    try:
+        for name, call in (("dspy", _dspy), ("fast", _fast)):
+            call(-1)  # warm up the connection
+            result = _run(call, args.requests)
+            print(
+                f"{name:>8} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{result['cpu_ms_per_call']:>12.2f}"
+            )
+    finally:
+        pool.close()
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
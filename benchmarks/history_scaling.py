@@ -0,0 +1,77 @@
+"""Benchmark history construction cost against interview length.
+
+Compares the per-turn ``format_history(interview[:i])`` approach with the
+shared transcript behind ``build_examples``. Building the lazy example
+sequence (one transcript plus turn offsets) is timed separately from
+materializing every prefix history: building is linear in the interview,
+while materializing all histories is bounded by the size of its output,
+which grows quadratically with the turn count whichever way it is done
+(``history_mchars`` reports it). Run from the repo root:
+
+    python benchmarks/history_scaling.py --turns 100 200 400 800 1600
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+from persona_gepa.data import _build_transcript, build_examples, format_history
+
+
+def _make_interview(turns: int, answer_words: int) -> List[dict]:
+    answer = " ".join(["word"] * answer_words)
+    return [
+        {"q": f"Question {idx}?", "a": f"{answer} {idx}."} for idx in range(turns)
+    ]
+
+
+def _prefix_histories(interview: List[dict]) -> List[str]:
+    return [format_history(interview[:idx]) for idx in range(len(interview))]
+
+
+def _materialize(transcript: str, offsets: List[int]) -> List[str]:
+    return [transcript[: offsets[idx]] for idx in range(len(offsets) - 1)]
+
+
+def _time(func: Callable[[], object], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[100, 200, 400, 800, 1600])
+    parser.add_argument("--answer-words", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'turns':>6} {'prefix_ms':>10} {'build_ms':>9} {'build_us/turn':>14} "
+        f"{'materialize_ms':>15} {'history_mchars':>15}"
+    )
+    for turns in args.turns:
+        interview = _make_interview(turns, args.answer_words)
+        transcript, offsets = _build_transcript(interview)
+        histories = _materialize(transcript, offsets)
+        assert histories == _prefix_histories(interview)
+        assert len(build_examples([interview])) == turns
+
+        prefix = _time(lambda: _prefix_histories(interview), args.repeats)
+        build = _time(lambda: build_examples([interview]), args.repeats)
+        materialize = _time(lambda: _materialize(transcript, offsets), args.repeats)
+        print(
+            f"{turns:>6} {prefix * 1e3:>10.2f} {build * 1e3:>9.2f} "
+            f"{build / turns * 1e6:>14.2f} {materialize * 1e3:>15.2f} "
+            f"{sum(map(len, histories)) / 1e6:>15.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""Benchmark per-LM connections against a shared keep-alive pool.
+
+Starts a local OpenAI-compatible stub server and sends the same requests
+through (a) a fresh ``build_lm`` per request, which opens a new connection
+each time, and (b) LMs sharing one ``ConnectionPool``. Run from the repo
+root:
+
+    python benchmarks/http_pool.py --requests 400 --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from typing import Callable, List
+
+from _stub import start_stub_server
+from persona_gepa.http_pool import ConnectionPool
+from persona_gepa.utils import build_lm
+
+
+MODEL = "openai/stub-model"
+
+
+def _run(
+    server: ThreadingHTTPServer, call: Callable[[int], None], requests: int, threads: int
+) -> dict:
+    latencies: List[float] = []
+
+    def _timed(idx: int) -> None:
+        start = time.perf_counter()
+        call(idx)
+        latencies.append(time.perf_counter() - start)
+
+    server.connections = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(_timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1e3,
+        "req_per_s": requests / elapsed,
+        "connections": server.connections,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--max-connections", type=int, default=16)
+    parser.add_argument("--http2", action="store_true")
+    args = parser.parse_args(argv)
+
+    server, api_base = start_stub_server()
+
+    def _fresh(idx: int) -> None:
+        lm = build_lm(MODEL, 0.0, 16, api_base=api_base, api_key="stub")
+        lm(f"request {idx}", cache=False)
+
+    pool = ConnectionPool(max_connections=args.max_connections, http2=args.http2)
+    pooled_lms = [
+        build_lm(MODEL, 0.0, 16, api_base=api_base, api_key="stub", pool=pool)
+        for _ in range(3)
+    ]
+
+    def _pooled(idx: int) -> None:
+        pooled_lms[idx % len(pooled_lms)](f"request {idx}", cache=False)
+
+    print(f"{'mode':>8} {'p50_ms':>8} {'p95_ms':>8} {'req/s':>8} {'connections':>12}")
+    try:
+        for name, call in (("fresh", _fresh), ("pooled", _pooled)):
+            result = _run(server, call, args.requests, args.threads)
+            print(
+                f"{name:>8} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{result['req_per_s']:>8.1f} {result['connections']:>12}"
+            )
+    finally:
+        pool.close()
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
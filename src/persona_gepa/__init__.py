@@ -2,23 +2,35 @@
 
 from persona_gepa.config import PersonaGEPAConfig
 from persona_gepa.data import (
+    ExampleSequence,
+    InterviewRecord,
     build_examples,
     build_train_val_examples,
     format_history,
+    iter_examples,
+    iter_interviews,
     load_interviews,
+    load_parquet_records,
     split_interviews,
 )
+from persona_gepa.history import HistoryPolicy
 from persona_gepa.infer import run_inference
 from persona_gepa.optimize import run_optimization
 from persona_gepa.program import PersonaAnswerProgram
 
 __all__ = [
     "PersonaGEPAConfig",
+    "HistoryPolicy",
     "PersonaAnswerProgram",
+    "ExampleSequence",
+    "InterviewRecord",
     "build_examples",
     "build_train_val_examples",
     "format_history",
+    "iter_examples",
+    "iter_interviews",
     "load_interviews",
+    "load_parquet_records",
     "split_interviews",
     "run_optimization",
     "run_inference",
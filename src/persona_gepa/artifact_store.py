@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+from persona_gepa.artifacts import extract_instructions
+from persona_gepa.program import PersonaAnswerProgram
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    persona_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    score REAL,
+    created_at REAL NOT NULL,
+    digest TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_best ON artifacts (persona_id, model, score);
+CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (persona_id, created_at);
+"""
+
+_COLUMNS = "id, persona_id, model, score, created_at, digest, metadata"
+
+
+@dataclass(frozen=True)
+class ArtifactRecord:
+    """One indexed optimization result; ``path`` is a loadable artifact file."""
+
+    id: int
+    persona_id: str
+    model: str
+    score: Optional[float]
+    created_at: float
+    digest: str
+    path: str
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+
+class ArtifactStore:
+    """Content-addressed artifact blobs plus a SQLite index.
+
+    Instructions are stored once per distinct text under
+    ``root/blobs/<sha256[:2]>/<sha256>.json``, in the same format as
+    ``save_artifact``, so a blob path works anywhere an artifact path does
+    (``load_program``, ``ProgramRegistry``, ``--artifact-path``). Each ``put``
+    adds an index row (persona_id, model, score, timestamp, metadata) that
+    points at a blob. Blobs are written to a temporary file and renamed into
+    place and the index runs in WAL mode, so parallel optimization jobs can
+    share one store.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), timeout=30.0, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.json")
+
+    def _write_blob(self, instructions: str) -> str:
+        digest = hashlib.sha256(instructions.encode("utf-8")).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"instructions": instructions, "metadata": {}}, handle, indent=2)
+                handle.flush()
+                os.fsync(handle.fileno())
+            # Racing writers of the same digest write identical bytes.
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def put(
+        self,
+        program: Union[PersonaAnswerProgram, str],
+        persona_id: str,
+        model: str,
+        score: Optional[float] = None,
+        metadata: Optional[Dict[str, object]] = None,
+    ) -> ArtifactRecord:
+        """Store ``program`` (or its instructions) and index it under ``persona_id``."""
+        instructions = program if isinstance(program, str) else extract_instructions(program)
+        # The blob is durable before the row that points at it is committed.
+        digest = self._write_blob(instructions)
+        created_at = time.time()
+        metadata_json = json.dumps(metadata or {}, sort_keys=True)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO artifacts (persona_id, model, score, created_at, digest, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (persona_id, model, score, created_at, digest, metadata_json),
+            )
+        return self._record(
+            (cursor.lastrowid, persona_id, model, score, created_at, digest, metadata_json)
+        )
+
+    def _record(self, row) -> ArtifactRecord:
+        artifact_id, persona_id, model, score, created_at, digest, metadata = row
+        return ArtifactRecord(
+            id=artifact_id,
+            persona_id=persona_id,
+            model=model,
+            score=score,
+            created_at=created_at,
+            digest=digest,
+            path=self.blob_path(digest),
+            metadata=json.loads(metadata),
+        )
+
+    def _query(self, where: str, params: tuple, order: str, limit: Optional[int]):
+        sql = f"SELECT {_COLUMNS} FROM artifacts {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._record(row) for row in rows]
+
+    @staticmethod
+    def _filters(persona_id: Optional[str], model: Optional[str]):
+        clauses, params = [], []
+        if persona_id is not None:
+            clauses.append("persona_id = ?")
+            params.append(persona_id)
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    def get(self, artifact_id: int) -> Optional[ArtifactRecord]:
+        records = self._query("WHERE id = ?", (artifact_id,), "id", None)
+        return records[0] if records else None
+
+    def best(self, persona_id: str, model: Optional[str] = None) -> Optional[ArtifactRecord]:
+        """Highest-scoring artifact for ``persona_id`` (newest on ties; unscored last)."""
+        where, params = self._filters(persona_id, model)
+        records = self._query(
+            where, params, "score IS NULL, score DESC, created_at DESC, id DESC", 1
+        )
+        return records[0] if records else None
+
+    def latest(self, persona_id: str, model: Optional[str] = None) -> Optional[ArtifactRecord]:
+        where, params = self._filters(persona_id, model)
+        records = self._query(where, params, "created_at DESC, id DESC", 1)
+        return records[0] if records else None
+
+    def list(
+        self,
+        persona_id: Optional[str] = None,
+        model: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[ArtifactRecord]:
+        """Indexed artifacts, newest first."""
+        where, params = self._filters(persona_id, model)
+        return self._query(where, params, "created_at DESC, id DESC", limit)
+
+    def personas(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT persona_id FROM artifacts ORDER BY persona_id"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
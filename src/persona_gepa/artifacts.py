@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, Tuple
 
 from persona_gepa.program import PersonaAnswerProgram
 
@@ -26,6 +30,11 @@ def apply_instructions(program: PersonaAnswerProgram, instructions: str) -> None
     sig_obj = getattr(program.predict, "signature", None)
     if sig_obj is None:
         return
+    with_instructions = getattr(sig_obj, "with_instructions", None)
+    if callable(with_instructions):
+        # A new signature per program; the class is shared by every program.
+        program.predict.signature = with_instructions(instructions)
+        return
     if hasattr(sig_obj, "instructions"):
         setattr(sig_obj, "instructions", instructions)
     sig_obj.__doc__ = instructions
@@ -59,3 +68,105 @@ def load_program(path: str, lm=None) -> PersonaAnswerProgram:
     if instructions:
         apply_instructions(program, instructions)
     return program
+
+
+class ProgramRegistry:
+    """LRU cache of loaded programs keyed by artifact path.
+
+    Every program shares ``lm``. A cached program is reused while the
+    artifact's mtime, size and inode are unchanged, so an artifact replaced
+    on disk is reloaded on its next lookup. The file is re-checked at most
+    every ``revalidate_seconds`` (0 checks on every lookup); in between, a
+    lookup is a dictionary hit. At most ``max_size`` programs are kept.
+    Concurrent lookups that need the same load share a single read
+    (counted as ``coalesced``).
+    """
+
+    def __init__(
+        self,
+        lm=None,
+        max_size: int = 1024,
+        revalidate_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1.")
+        self.lm = lm
+        self.max_size = max_size
+        self.revalidate_seconds = revalidate_seconds
+        self._clock = clock
+        # path -> (file signature, last checked, program), least recent first.
+        self._entries: OrderedDict = OrderedDict()
+        # path -> (file signature, future) for loads in progress.
+        self._loading: Dict[str, Tuple[Tuple[int, int, int], Future]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "evictions": 0, "coalesced": 0}
+
+    @staticmethod
+    def _signature(path: str) -> Tuple[int, int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def get(self, path: str) -> PersonaAnswerProgram:
+        """Return the program for ``path``, loading or reloading it as needed."""
+        path = os.path.abspath(path)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry[1] < self.revalidate_seconds:
+                self._entries.move_to_end(path)
+                self._stats["hits"] += 1
+                return entry[2]
+
+        signature = self._signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries[path] = (signature, now, entry[2])
+                self._entries.move_to_end(path)
+                self._stats["hits"] += 1
+                return entry[2]
+            flight = self._loading.get(path)
+            if flight is not None and flight[0] == signature:
+                self._stats["coalesced"] += 1
+                future = flight[1]
+            else:
+                self._stats["reloads" if entry is not None else "misses"] += 1
+                future = Future()
+                self._loading[path] = (signature, future)
+                flight = None
+        if flight is not None:
+            return future.result()
+
+        # Load outside the lock so a slow read does not block other personas.
+        try:
+            program = load_program(path, lm=self.lm)
+        except BaseException as exc:
+            self._land(path, future)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            # A load started after the file changed supersedes this one; its
+            # entry is newer, so this program is returned but not cached.
+            if self._loading.get(path, (None, None))[1] is future:
+                del self._loading[path]
+                self._entries[path] = (signature, now, program)
+                self._entries.move_to_end(path)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+        future.set_result(program)
+        return program
+
+    def _land(self, path: str, future: Future) -> None:
+        with self._lock:
+            # A newer load may have replaced this one after the file changed.
+            if self._loading.get(path, (None, None))[1] is future:
+                del self._loading[path]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
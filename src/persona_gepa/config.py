@@ -1,7 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
+
+from persona_gepa.history import HistoryPolicy
+from persona_gepa.managed_lm import CallPolicy, LMBudget
+
+if TYPE_CHECKING:
+    # Pooling needs DSPy's lm15 engines; import it only when it is configured.
+    from persona_gepa.endpoints import EndpointBalancer
+    from persona_gepa.http_pool import ConnectionPool
 
 
 @dataclass
@@ -19,16 +27,69 @@ class PersonaGEPAConfig:
     reflection_max_tokens: int = 512
 
     num_threads: int = 8
+    eval_engine: str = "threads"
+    eval_concurrency: Optional[int] = None
+    persona_workers: Optional[int] = None
+    judge_workers: Optional[int] = None
+    eval_ci_half_width: Optional[float] = None
+    eval_max_examples: Optional[int] = None
+    eval_min_examples: int = 30
+    eval_confidence: float = 0.95
+    eval_seed: int = 0
+
+    persona_rpm: Optional[float] = None
+    judge_rpm: Optional[float] = None
+    reflection_rpm: Optional[float] = None
+    persona_tpm: Optional[float] = None
+    judge_tpm: Optional[float] = None
+    reflection_tpm: Optional[float] = None
+    persona_max_concurrency: Optional[int] = None
+    judge_max_concurrency: Optional[int] = None
+    reflection_max_concurrency: Optional[int] = None
+
+    lm_deadline_seconds: Optional[float] = None
+    lm_max_retries: int = 0
+    lm_hedge: bool = False
+    lm_hedge_quantile: float = 0.95
+    lm_single_flight: bool = False
 
     api_base: Optional[str] = None
+    http_max_connections: Optional[int] = None
+    http2: bool = False
+    endpoints: Dict[str, float] = field(default_factory=dict)
+    endpoint_routing: str = "least_outstanding"
+    endpoint_failure_threshold: int = 3
+    endpoint_cooldown_seconds: float = 30.0
 
     cache_dir: str = ".cache/dspy"
     output_dir: str = "artifacts/persona_gepa"
+    artifact_store_dir: Optional[str] = None
+    artifact_persona_id: str = "all"
     log_dir: str = "logs/persona_gepa"
 
     budget: str = "light"
     max_metric_calls: Optional[int] = None
 
+    history_max_tokens: Optional[int] = None
+    history_max_turns: Optional[int] = None
+    history_head_turns: int = 0
+    history_retrieval_top_k: Optional[int] = None
+
+    profile_chunk_turns: Optional[int] = None
+    profile_model: Optional[str] = None
+    profile_temperature: float = 0.0
+    profile_max_tokens: int = 512
+    profile_cache_dir: Optional[str] = ".cache/profiles"
+
+    program_cache_size: int = 1024
+    program_revalidate_seconds: float = 1.0
+
+    judgment_cache_path: Optional[str] = None
+    judgment_cache_max_entries: int = 200_000
+
+    judge_batch_size: Optional[int] = None
+    judge_batch_wait_ms: float = 20.0
+
     score_weights: Dict[str, float] = field(
         default_factory=lambda: {
             "accuracy": 0.4,
@@ -46,6 +107,58 @@ class PersonaGEPAConfig:
             return {"auto": self.budget}
         return {"auto": "light"}
 
+    def history_policy(self) -> HistoryPolicy:
+        """Return the history windowing policy for examples and inference."""
+        return HistoryPolicy(
+            max_tokens=self.history_max_tokens,
+            max_turns=self.history_max_turns,
+            head_turns=self.history_head_turns,
+            retrieval_top_k=self.history_retrieval_top_k,
+        )
+
+    def lm_budget(self, role: str) -> LMBudget:
+        """Return the rate/concurrency budget for ``role`` (persona, judge, reflection)."""
+        if role not in ("persona", "judge", "reflection"):
+            raise ValueError(f"Unknown LM role: {role!r}")
+        return LMBudget(
+            requests_per_minute=getattr(self, f"{role}_rpm"),
+            tokens_per_minute=getattr(self, f"{role}_tpm"),
+            max_concurrency=getattr(self, f"{role}_max_concurrency"),
+        )
+
+    def lm_call_policy(self) -> CallPolicy:
+        """Return the deadline/retry/hedging/single-flight policy shared by all LMs."""
+        return CallPolicy(
+            deadline_seconds=self.lm_deadline_seconds,
+            max_retries=self.lm_max_retries,
+            hedge=self.lm_hedge,
+            hedge_quantile=self.lm_hedge_quantile,
+            single_flight=self.lm_single_flight,
+        )
+
+    def connection_pool(self) -> Optional[ConnectionPool]:
+        """Return the shared HTTP pool for all LMs, or None to let each LM own its connections."""
+        if self.http_max_connections is None and not self.http2:
+            return None
+        from persona_gepa.http_pool import shared_connection_pool
+
+        return shared_connection_pool(
+            max_connections=self.http_max_connections or 100, http2=self.http2
+        )
+
+    def endpoint_balancer(self) -> Optional[EndpointBalancer]:
+        """Return the balancer over ``endpoints`` ({api_base: weight}), or None to use ``api_base``."""
+        if not self.endpoints:
+            return None
+        from persona_gepa.endpoints import shared_endpoint_balancer
+
+        return shared_endpoint_balancer(
+            self.endpoints,
+            strategy=self.endpoint_routing,
+            failure_threshold=self.endpoint_failure_threshold,
+            cooldown_seconds=self.endpoint_cooldown_seconds,
+        )
+
     def normalized_weights(self) -> Dict[str, float]:
         total = sum(self.score_weights.values())
         if total <= 0:
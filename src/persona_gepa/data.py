@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import bz2
+import glob
+import gzip
+import io
 import json
+import lzma
+import os
 import random
-from typing import Iterable, List, Sequence, Tuple
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 import dspy
 
+from persona_gepa.history import HistoryPolicy, approx_tokens_for_length
+from persona_gepa.retrieval import select_relevant_turns
+
 
 def _extract_question_answer(turn: dict, context: str) -> Tuple[str, str]:
     if not isinstance(turn, dict):
@@ -68,50 +80,279 @@ def _coerce_interviews(data: object, context: str) -> List[List[dict]]:
     raise ValueError(f"{context} must be a list of interviews or turns.")
 
 
+def _format_turn(question: str, answer: str) -> str:
+    return f"Q: {question}\nA: {answer}\n"
+
+
 def format_history(turns: Sequence[dict], question: str | None = None) -> str:
     """Format turns into a deterministic transcript history."""
     parts = []
     for idx, turn in enumerate(turns):
         turn_question, answer = _extract_question_answer(turn, f"history turn {idx}")
-        parts.append(f"Q: {turn_question}\nA: {answer}\n")
+        parts.append(_format_turn(turn_question, answer))
     if question is not None:
         parts.append(f"Q: {question}\n")
     return "".join(parts)
 
 
-def build_examples(
+def _build_transcript(interview: Sequence[dict]) -> Tuple[str, List[int]]:
+    """Format each normalized turn once into a shared transcript.
+
+    Returns the transcript and the offset at which each turn starts, plus a
+    final offset for the end of the transcript. The history preceding turn
+    ``i`` is ``transcript[:offsets[i]]``, which is byte-identical to
+    ``format_history(interview[:i])``.
+    """
+    parts: List[str] = []
+    offsets = [0]
+    position = 0
+    for turn in interview:
+        part = _format_turn(turn["q"], turn["a"])
+        parts.append(part)
+        position += len(part)
+        offsets.append(position)
+    return "".join(parts), offsets
+
+
+class InterviewRecord:
+    """Compact normalized interview backed by one shared transcript.
+
+    Questions, answers and histories are recovered as slices of the
+    transcript, so a record costs roughly one copy of the interview text no
+    matter how many examples are built from it.
+    """
+
+    __slots__ = ("persona_id", "transcript", "offsets", "question_lengths")
+
+    def __init__(
+        self,
+        persona_id: str | None,
+        transcript,
+        offsets: Sequence[int],
+        question_lengths: Sequence[int],
+    ):
+        self.persona_id = persona_id
+        self.transcript = transcript
+        self.offsets = array("q", offsets)
+        self.question_lengths = array("q", question_lengths)
+
+    @classmethod
+    def from_turns(
+        cls, interview: Sequence[dict], persona_id: str | None = None
+    ) -> "InterviewRecord":
+        """Build a record from a normalized interview (``q``/``a`` turns)."""
+        transcript, offsets = _build_transcript(interview)
+        return cls(persona_id, transcript, offsets, [len(turn["q"]) for turn in interview])
+
+    def __len__(self) -> int:
+        return len(self.question_lengths)
+
+    def _slice(self, start: int, stop: int) -> str:
+        return self.transcript[start:stop]
+
+    def question(self, turn_index: int) -> str:
+        start = self.offsets[turn_index] + 3
+        return self._slice(start, start + self.question_lengths[turn_index])
+
+    def answer(self, turn_index: int) -> str:
+        start = self.offsets[turn_index] + 3 + self.question_lengths[turn_index] + 4
+        return self._slice(start, self.offsets[turn_index + 1] - 1)
+
+    def turn_tokens(self, turn_index: int) -> int:
+        """Approximate token count of a formatted turn, from its offsets."""
+        return approx_tokens_for_length(
+            self.offsets[turn_index + 1] - self.offsets[turn_index]
+        )
+
+    def segment(self, start: int, stop: int) -> str:
+        """Return the formatted text of turns ``[start, stop)``."""
+        return self._slice(self.offsets[start], self.offsets[stop])
+
+    def history(
+        self,
+        turn_index: int,
+        policy: HistoryPolicy | None = None,
+        start: int = 0,
+    ) -> str:
+        """Return the formatted history preceding ``turn_index``.
+
+        Only turns from ``start`` onwards are considered; ``policy`` then
+        windows those turns.
+        """
+        if policy is None or policy.is_full():
+            return self.segment(start, turn_index)
+        ranges = policy.select(lambda idx: self.turn_tokens(start + idx), turn_index - start)
+        return "".join(self.segment(start + low, start + high) for low, high in ranges)
+
+    def turns(self) -> List[dict]:
+        return [
+            {"q": self.question(idx), "a": self.answer(idx)} for idx in range(len(self))
+        ]
+
+
+class ExampleSequence(Sequence):
+    """Lazy, sliceable sequence of DSPy Examples over interview records.
+
+    Examples are built on index or iteration; slicing returns another lazy
+    view over the same records. When per-interview profiles are attached,
+    each example carries the profile of the turns before its window as
+    ``persona_profile`` and only the turns inside the window as history.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[InterviewRecord],
+        record_ids: Iterable[int] | None = None,
+        turn_ids: Iterable[int] | None = None,
+        history_policy: HistoryPolicy | None = None,
+        profiles: Dict[int, Sequence[str]] | None = None,
+        profile_chunk_turns: int | None = None,
+        _retrieval_cache: Dict[Tuple[int, int | None], List[List[int]]] | None = None,
+    ):
+        self._records = records
+        self.history_policy = history_policy
+        self.profiles = profiles
+        self.profile_chunk_turns = profile_chunk_turns
+        # Shared by every view over the same records so each interview's
+        # retrieval index is built once.
+        self._retrieval_cache = {} if _retrieval_cache is None else _retrieval_cache
+        if record_ids is None or turn_ids is None:
+            record_ids, turn_ids = array("q"), array("q")
+            for record_id, record in enumerate(records):
+                record_ids.extend([record_id] * len(record))
+                turn_ids.extend(range(len(record)))
+        self._record_ids = array("q", record_ids)
+        self._turn_ids = array("q", turn_ids)
+
+    @property
+    def records(self) -> Sequence[InterviewRecord]:
+        return self._records
+
+    def positions(self) -> Iterator[Tuple[int, int]]:
+        """Yield ``(record_id, turn_index)`` for every example in the view."""
+        return zip(self._record_ids, self._turn_ids)
+
+    def with_profiles(
+        self, profiles: Dict[int, Sequence[str]], chunk_turns: int
+    ) -> "ExampleSequence":
+        """Return a view whose examples use ``profiles`` for older turns.
+
+        ``profiles[record_id][w]`` summarizes turns ``[0, w * chunk_turns)``.
+        """
+        return ExampleSequence(
+            self._records,
+            self._record_ids,
+            self._turn_ids,
+            history_policy=self.history_policy,
+            profiles=profiles,
+            profile_chunk_turns=chunk_turns,
+            _retrieval_cache=self._retrieval_cache,
+        )
+
+    def __len__(self) -> int:
+        return len(self._turn_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ExampleSequence(
+                self._records,
+                self._record_ids[index],
+                self._turn_ids[index],
+                history_policy=self.history_policy,
+                profiles=self.profiles,
+                profile_chunk_turns=self.profile_chunk_turns,
+                _retrieval_cache=self._retrieval_cache,
+            )
+        record_id = self._record_ids[index]
+        record = self._records[record_id]
+        turn_index = self._turn_ids[index]
+        if self.profiles is None:
+            return dspy.Example(
+                history=self._history(record_id, turn_index),
+                question=record.question(turn_index),
+                answer=record.answer(turn_index),
+                persona_id=record.persona_id,
+            ).with_inputs("history", "question")
+
+        window = turn_index // self.profile_chunk_turns
+        return dspy.Example(
+            history=self._history(
+                record_id, turn_index, start=window * self.profile_chunk_turns
+            ),
+            question=record.question(turn_index),
+            persona_profile=self.profiles[record_id][window],
+            answer=record.answer(turn_index),
+            persona_id=record.persona_id,
+        ).with_inputs("history", "question", "persona_profile")
+
+    def _history(self, record_id: int, turn_index: int, start: int = 0) -> str:
+        record = self._records[record_id]
+        policy = self.history_policy
+        if policy is None or not policy.retrieval_top_k:
+            return record.history(turn_index, policy, start=start)
+
+        # Each turn only indexes the turns its history can contain, which
+        # depend on the profile window, so views with different windows
+        # cache separately.
+        chunk = self.profile_chunk_turns if self.profiles is not None else None
+        key = (record_id, chunk)
+        relevant = self._retrieval_cache.get(key)
+        if relevant is None:
+            turns = range(len(record))
+            relevant = select_relevant_turns(
+                [record.segment(idx, idx + 1) for idx in turns],
+                [record.question(idx) for idx in turns],
+                turns,
+                policy.retrieval_top_k,
+                head_turns=policy.head_turns,
+                starts=[idx - idx % chunk if chunk else 0 for idx in turns],
+            )
+            self._retrieval_cache[key] = relevant
+        kept = policy.retrieval_turns(
+            relevant[turn_index], turn_index, record.turn_tokens, start=start
+        )
+        return "".join(record.segment(idx, idx + 1) for idx in kept)
+
+    def __iter__(self) -> Iterator[dspy.Example]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"ExampleSequence(len={len(self)}, interviews={len(self._records)})"
+
+
+def _normalized_records(
     interviews: Sequence[Sequence[dict]],
-    persona_ids: Iterable[str] | None = None,
-) -> List[dspy.Example]:
-    """Convert interview turns into DSPy Examples."""
-    examples: List[dspy.Example] = []
-    persona_list = list(persona_ids) if persona_ids is not None else None
+    persona_ids: Sequence[str | None] | None = None,
+) -> List[InterviewRecord]:
+    if isinstance(interviews, Sequence) and interviews and all(
+        isinstance(item, InterviewRecord) for item in interviews
+    ):
+        # Prebuilt records (e.g. from the dataset cache) are already normalized.
+        return list(interviews)
 
     interview_list = _coerce_interviews(interviews, "interviews")
-    normalized_interviews = [
-        _normalize_interview(interview, f"interview {idx}")
-        for idx, interview in enumerate(interview_list)
-    ]
-
-    for idx, interview in enumerate(normalized_interviews):
-        persona_id = None
-        if persona_list is not None:
-            persona_id = persona_list[idx] if idx < len(persona_list) else None
+    records: List[InterviewRecord] = []
+    for idx, interview in enumerate(interview_list):
+        if persona_ids is not None:
+            persona_id = persona_ids[idx] if idx < len(persona_ids) else None
         else:
             persona_id = str(idx)
+        normalized = _normalize_interview(interview, f"interview {idx}")
+        records.append(InterviewRecord.from_turns(normalized, persona_id))
+    return records
 
-        for turn_index, turn in enumerate(interview):
-            history = format_history(interview[:turn_index])
-            question = turn["q"]
-            answer = turn["a"]
-            example = dspy.Example(
-                history=history,
-                question=question,
-                answer=answer,
-                persona_id=persona_id,
-            ).with_inputs("history", "question")
-            examples.append(example)
-    return examples
+
+def build_examples(
+    interviews: Sequence[Sequence[dict]],
+    persona_ids: Iterable[str] | None = None,
+    history_policy: HistoryPolicy | None = None,
+) -> ExampleSequence:
+    """Convert interview turns into a lazy sequence of DSPy Examples."""
+    persona_list = list(persona_ids) if persona_ids is not None else None
+    return ExampleSequence(
+        _normalized_records(interviews, persona_list), history_policy=history_policy
+    )
 
 
 def split_interviews(
@@ -137,72 +378,414 @@ def build_train_val_examples(
     interviews: Sequence[Sequence[dict]],
     val_ratio: float = 0.2,
     seed: int = 7,
-) -> Tuple[List[dspy.Example], List[dspy.Example]]:
+    history_policy: HistoryPolicy | None = None,
+) -> Tuple[ExampleSequence, ExampleSequence]:
     """Split interviews temporally and convert to DSPy train/val examples."""
     if val_ratio < 0 or val_ratio >= 1:
         raise ValueError("val_ratio must be in [0, 1).")
 
-    train_examples: List[dspy.Example] = []
-    val_examples: List[dspy.Example] = []
+    records = _normalized_records(interviews)
+    train_ids: Tuple[array, array] = (array("q"), array("q"))
+    val_ids: Tuple[array, array] = (array("q"), array("q"))
 
-    interview_list = _coerce_interviews(interviews, "interviews")
-    normalized_interviews = [
-        _normalize_interview(interview, f"interview {idx}")
-        for idx, interview in enumerate(interview_list)
-    ]
-
-    for idx, interview in enumerate(normalized_interviews):
-        if not interview:
+    for record_id, record in enumerate(records):
+        total_turns = len(record)
+        if not total_turns:
             continue
-        total_turns = len(interview)
         split_idx = max(1, int(total_turns * (1 - val_ratio)))
         if total_turns > 1 and split_idx >= total_turns:
             split_idx = total_turns - 1
 
-        persona_id = str(idx)
-        for turn_index, turn in enumerate(interview):
-            history = format_history(interview[:turn_index])
-            example = dspy.Example(
-                history=history,
-                question=turn["q"],
-                answer=turn["a"],
-                persona_id=persona_id,
-            ).with_inputs("history", "question")
-            if turn_index < split_idx:
-                train_examples.append(example)
-            else:
-                val_examples.append(example)
-
-    return train_examples, val_examples
-
-
-def load_interviews(path: str) -> List[List[dict]]:
-    """Load interviews from JSON or JSONL."""
-    if path.endswith(".jsonl"):
-        interviews: List[List[dict]] = []
-        with open(path, "r", encoding="utf-8") as handle:
-            for line_number, line in enumerate(handle, start=1):
-                line = line.strip()
-                if not line:
+        train_ids[0].extend([record_id] * split_idx)
+        train_ids[1].extend(range(split_idx))
+        val_ids[0].extend([record_id] * (total_turns - split_idx))
+        val_ids[1].extend(range(split_idx, total_turns))
+
+    retrieval_cache: Dict[Tuple[int, int | None], List[List[int]]] = {}
+    return (
+        ExampleSequence(
+            records, *train_ids, history_policy=history_policy, _retrieval_cache=retrieval_cache
+        ),
+        ExampleSequence(
+            records, *val_ids, history_policy=history_policy, _retrieval_cache=retrieval_cache
+        ),
+    )
+
+
+_JSON_CHUNK_SIZE = 1 << 16
+_JSON_WHITESPACE = " \t\n\r"
+
+
+class _JSONArrayReader:
+    """Decode the items of a top-level JSON array one at a time.
+
+    Only the current item and a read-ahead chunk are held in memory. If the
+    document is not an array, ``items`` is ``None`` and ``document`` holds the
+    fully decoded value instead.
+    """
+
+    def __init__(self, handle, context: str):
+        self._handle = handle
+        self._context = context
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.document: object = None
+
+    def _fill(self, size: int = _JSON_CHUNK_SIZE) -> bool:
+        if self._eof:
+            return False
+        chunk = self._handle.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _JSON_WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"{self._context} is not valid JSON: {message}")
+
+    def _decode_value(self) -> object:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as exc:
+                if self._fill(max(_JSON_CHUNK_SIZE, len(self._buffer))):
                     continue
-                entry = json.loads(line)
-                if isinstance(entry, dict) and "interview" in entry:
-                    entry = entry["interview"]
-                if not isinstance(entry, list):
-                    raise ValueError(
-                        f"{path}:{line_number} must be a list of interview turns."
-                    )
-                interviews.append(entry)
-        return [
-            _normalize_interview(interview, f"{path} line {idx}")
-            for idx, interview in enumerate(interviews, start=1)
+                raise self._error(str(exc)) from exc
+            # A scalar may have been cut at the chunk boundary; read more first.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def items(self) -> Iterator[object] | None:
+        first = self._peek()
+        if first != "[":
+            self._fill(-1)
+            try:
+                self.document = json.loads(self._buffer[self._pos :])
+            except json.JSONDecodeError as exc:
+                raise self._error(str(exc)) from exc
+            return None
+        self._pos += 1
+        return self._iter_items()
+
+    def _expect_end(self) -> None:
+        # Like json.load, reject anything but whitespace after the array.
+        extra = self._peek()
+        if extra:
+            raise self._error(f"extra data after the closing ']': {extra!r}.")
+
+    def _iter_items(self) -> Iterator[object]:
+        if self._peek() == "]":
+            self._pos += 1
+            self._expect_end()
+            return
+        while True:
+            yield self._decode_value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == "]":
+                self._expect_end()
+                return
+            if separator != ",":
+                raise self._error(f"expected ',' or ']' but found {separator!r}.")
+
+
+def _iter_jsonl_interviews(handle, path: str) -> Iterator[List[dict]]:
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{path}:{line_number} is not valid JSON: {exc}") from exc
+        if isinstance(entry, dict) and "interview" in entry:
+            entry = entry["interview"]
+        if not isinstance(entry, list):
+            raise ValueError(f"{path}:{line_number} must be a list of interview turns.")
+        yield _normalize_interview(entry, f"{path} line {line_number}")
+
+
+def _iter_json_interviews(handle, path: str) -> Iterator[List[dict]]:
+    reader = _JSONArrayReader(handle, path)
+    items = reader.items()
+    if items is None:
+        for idx, interview in enumerate(_coerce_interviews(reader.document, path)):
+            yield _normalize_interview(interview, f"{path} interview {idx}")
+        return
+
+    first = next(items, None)
+    if first is None:
+        return
+    if isinstance(first, dict):
+        # A flat list of turns is a single interview.
+        turns = [first]
+        for item in items:
+            if not isinstance(item, dict):
+                raise ValueError(f"{path} must be a list of interviews or turns.")
+            turns.append(item)
+        yield _normalize_interview(turns, f"{path} interview 0")
+        return
+    if not isinstance(first, list):
+        raise ValueError(f"{path} must be a list of interviews or turns.")
+    yield _normalize_interview(first, f"{path} interview 0")
+    for idx, item in enumerate(items, start=1):
+        if not isinstance(item, list):
+            raise ValueError(f"{path} must be a list of interviews or turns.")
+        yield _normalize_interview(item, f"{path} interview {idx}")
+
+
+PARQUET_COLUMNS = {
+    "interview": "interview_id",
+    "turn": "turn_index",
+    "question": "interviewer_question",
+    "answer": "respondent_answer",
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet/Arrow inputs require the pyarrow package "
+            "(pip install persona-gepa[parquet])."
+        ) from exc
+    return pyarrow
+
+
+def records_from_arrow(
+    table,
+    context: str = "table",
+    columns: Dict[str, str] | None = None,
+) -> List[InterviewRecord]:
+    """Group an Arrow table of interview turns into interview records.
+
+    Rows are sorted by interview id and turn index, and every turn is
+    formatted and joined into its interview's transcript with vectorized
+    Arrow kernels; Python only sees one string per interview, never per
+    row. Persona ids are the stringified interview ids; null ids or turn
+    indexes and repeated (interview, turn) pairs raise ``ValueError``.
+    """
+    pa = _require_pyarrow()
+    pc = pa.compute
+    names = {**PARQUET_COLUMNS, **(columns or {})}
+    missing = [name for name in names.values() if name not in table.column_names]
+    if missing:
+        raise ValueError(f"{context} missing required columns: {', '.join(missing)}.")
+    if not table.num_rows:
+        return []
+
+    for key in ("interview", "turn"):
+        if table[names[key]].null_count:
+            raise ValueError(f"{context} column {names[key]} contains nulls.")
+    table = table.sort_by(
+        [(names["interview"], "ascending"), (names["turn"], "ascending")]
+    )
+    interview_ids = table[names["interview"]]
+    turn_indexes = table[names["turn"]]
+    repeated = pc.indices_nonzero(
+        pc.and_(
+            pc.equal(interview_ids[1:], interview_ids[:-1]),
+            pc.equal(turn_indexes[1:], turn_indexes[:-1]),
+        )
+    )
+    if len(repeated):
+        row = repeated[0].as_py()
+        raise ValueError(
+            f"{context} has duplicate turn {turn_indexes[row].as_py()!r} "
+            f"for interview {interview_ids[row].as_py()!r}."
+        )
+    text = {}
+    for key in ("question", "answer"):
+        column = table[names[key]]
+        if column.null_count:
+            raise ValueError(f"{context} column {names[key]} contains nulls.")
+        text[key] = pc.cast(column, pa.string())
+
+    formatted = pc.binary_join_element_wise(
+        "Q: ", text["question"], "\nA: ", text["answer"], "\n", ""
+    )
+    # Large (int64-offset) strings so corpora over 2 GiB of text still join.
+    formatted = pc.cast(formatted, pa.large_string()).combine_chunks()
+    ends = pc.cumulative_sum(pc.utf8_length(formatted)).to_pylist()
+    question_lengths = pc.utf8_length(text["question"]).to_pylist()
+
+    boundaries = pc.indices_nonzero(
+        pc.not_equal(interview_ids[1:], interview_ids[:-1])
+    ).to_pylist()
+    starts = [0] + [boundary + 1 for boundary in boundaries]
+    stops = starts[1:] + [table.num_rows]
+    per_interview = pa.LargeListArray.from_arrays(
+        pa.array(starts + [table.num_rows], pa.int64()), formatted
+    )
+    transcripts = pc.binary_join(per_interview, pa.scalar("", pa.large_string())).to_pylist()
+
+    records: List[InterviewRecord] = []
+    for start, stop, transcript in zip(starts, stops, transcripts):
+        base = ends[start - 1] if start else 0
+        offsets = [0] + [end - base for end in ends[start:stop]]
+        records.append(
+            InterviewRecord(
+                str(interview_ids[start].as_py()),
+                transcript,
+                offsets,
+                question_lengths[start:stop],
+            )
+        )
+    return records
+
+
+def load_parquet_records(
+    path: str, columns: Dict[str, str] | None = None
+) -> List[InterviewRecord]:
+    """Read interview turns from Parquet, projecting only the needed columns.
+
+    Parquet is already columnar and is formatted with Arrow kernels, so it
+    is read directly rather than through the dataset cache or the
+    ``load_interviews`` worker pool.
+    """
+    pa = _require_pyarrow()
+    names = {**PARQUET_COLUMNS, **(columns or {})}
+    table = pa.parquet.read_table(path, columns=list(names.values()))
+    return records_from_arrow(table, context=path, columns=columns)
+
+
+DATA_FILE_SUFFIXES = (".json", ".jsonl", ".parquet")
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+
+
+def _strip_compression(path: str) -> str:
+    for suffix in COMPRESSION_SUFFIXES:
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def _is_data_file(path: str) -> bool:
+    return _strip_compression(path).endswith(DATA_FILE_SUFFIXES)
+
+
+def _open_text(path: str):
+    """Open a data file for streaming text reads, decompressing by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError(
+                f"Reading {path} requires the zstandard package "
+                "(pip install persona-gepa[zstd])."
+            ) from exc
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def expand_data_paths(path: str) -> List[str]:
+    """Resolve a file, directory or glob pattern into a sorted list of data files.
+
+    Directories are scanned (non-recursively) for supported data files. The
+    sorted order keeps multi-shard loads and seed-based splits deterministic.
+    """
+    if os.path.isdir(path):
+        paths = [
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if _is_data_file(name)
+            and os.path.isfile(os.path.join(path, name))
         ]
+    elif glob.has_magic(path):
+        paths = [match for match in glob.glob(path) if os.path.isfile(match)]
+    else:
+        return [path]
+    if not paths:
+        raise ValueError(f"{path} did not match any data files.")
+    return sorted(paths)
+
+
+def _iter_file_interviews(path: str) -> Iterator[List[dict]]:
+    if path.endswith(".parquet"):
+        for record in load_parquet_records(path):
+            yield record.turns()
+        return
+    with _open_text(path) as handle:
+        if _strip_compression(path).endswith(".jsonl"):
+            yield from _iter_jsonl_interviews(handle, path)
+        else:
+            yield from _iter_json_interviews(handle, path)
+
+
+def iter_interviews(path: str) -> Iterator[List[dict]]:
+    """Stream normalized interviews from JSON, JSONL or Parquet one at a time.
 
-    with open(path, "r", encoding="utf-8") as handle:
-        data = json.load(handle)
+    ``path`` may also be a directory or glob of shards, read in sorted order.
+    ``.gz``, ``.bz2``, ``.xz`` and ``.zst`` files are decompressed on the fly.
+    """
+    for file_path in expand_data_paths(path):
+        yield from _iter_file_interviews(file_path)
 
-    interview_list = _coerce_interviews(data, path)
-    return [
-        _normalize_interview(interview, f"{path} interview {idx}")
-        for idx, interview in enumerate(interview_list)
-    ]
+
+def iter_examples(
+    source: str | Iterable[Sequence[dict]],
+    history_policy: HistoryPolicy | None = None,
+) -> Iterator[dspy.Example]:
+    """Stream DSPy Examples from a data path or an iterable of interviews.
+
+    Only one interview is held in memory at a time. Persona ids are the
+    interview's position in the stream, matching ``build_examples``.
+    """
+    interviews = iter_interviews(source) if isinstance(source, str) else source
+    for idx, interview in enumerate(interviews):
+        normalized = _normalize_interview(
+            interview if isinstance(interview, list) else list(interview),
+            f"interview {idx}",
+        )
+        yield from ExampleSequence(
+            [InterviewRecord.from_turns(normalized, str(idx))],
+            history_policy=history_policy,
+        )
+
+
+def _load_file_interviews(path: str) -> List[List[dict]]:
+    return list(_iter_file_interviews(path))
+
+
+def load_interviews(path: str, num_workers: int | None = None) -> List[List[dict]]:
+    """Load interviews from JSON or JSONL.
+
+    When ``path`` is a directory or glob matching several shards, they are
+    parsed and normalized in a process pool of ``num_workers`` (default: CPU
+    count; ``1`` loads serially) and merged back in sorted path order.
+    """
+    paths = expand_data_paths(path)
+    if len(paths) == 1 or num_workers == 1:
+        return list(iter_interviews(path))
+
+    interviews: List[List[dict]] = []
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        for shard in executor.map(_load_file_interviews, paths):
+            interviews.extend(shard)
+    return interviews
@@ -0,0 +1,275 @@
+"""Compiled, memory-mapped dataset cache for interview files.
+
+Normalized interviews are written once as a UTF-8 transcript blob plus an
+int64 index of per-turn byte offsets and character lengths. Later runs
+memory-map both files and build examples straight from them, skipping JSON
+parsing, validation and history formatting. Entries are keyed by the source
+file's content hash and the loader that parsed it; a per-path manifest of
+(size, mtime) avoids re-hashing unchanged files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from persona_gepa.data import (
+    InterviewRecord,
+    _format_turn,
+    expand_data_paths,
+    iter_interviews,
+)
+from persona_gepa.history import approx_tokens_for_length
+
+
+FORMAT_VERSION = 2
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+class MappedInterviewRecord(InterviewRecord):
+    """Interview record whose transcript lives in a memory-mapped blob.
+
+    Offsets are UTF-8 byte offsets into the blob, so token estimates use the
+    stored per-turn character lengths to match in-memory records.
+    """
+
+    __slots__ = ("base", "turn_lengths")
+
+    def __init__(
+        self,
+        persona_id: str | None,
+        blob,
+        base: int,
+        offsets: Sequence[int],
+        question_lengths: Sequence[int],
+        turn_lengths: Sequence[int],
+    ):
+        # Offsets are memoryview slices over the mapped index; nothing is copied.
+        self.persona_id = persona_id
+        self.transcript = blob
+        self.base = base
+        self.offsets = offsets
+        self.question_lengths = question_lengths
+        self.turn_lengths = turn_lengths
+
+    def turn_tokens(self, turn_index: int) -> int:
+        return approx_tokens_for_length(self.turn_lengths[turn_index])
+
+    def _slice(self, start: int, stop: int) -> str:
+        return self.transcript[self.base + start : self.base + stop].decode("utf-8")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(cache_dir: str, path: str) -> str:
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "manifests", f"{key}.json")
+
+
+def _loader_key(loader: Callable) -> str:
+    name = f"{getattr(loader, '__module__', '')}.{getattr(loader, '__qualname__', repr(loader))}"
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+
+
+def _entry_prefix(
+    cache_dir: str,
+    content_hash: str,
+    loader: Callable[[str], Iterable[Sequence[dict]]] = iter_interviews,
+) -> str:
+    return os.path.join(cache_dir, f"{content_hash}.{_loader_key(loader)}.v{FORMAT_VERSION}")
+
+
+def _atomic_write(path: str, write: Callable) -> None:
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        write(handle)
+    os.replace(tmp_path, path)
+
+
+def source_content_hash(path: str, cache_dir: str) -> str:
+    """Return the source file's content hash, reusing the manifest when unchanged."""
+    stat = os.stat(path)
+    manifest_path = _manifest_path(cache_dir, path)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if (
+            manifest.get("path") == os.path.abspath(path)
+            and manifest.get("size") == stat.st_size
+            and manifest.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            return str(manifest["sha256"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    content_hash = file_sha256(path)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    manifest = {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": content_hash,
+    }
+    _atomic_write(manifest_path, lambda handle: handle.write(json.dumps(manifest).encode("utf-8")))
+    return content_hash
+
+
+def compile_dataset(
+    interviews: Iterable[Sequence[dict]],
+    prefix: str,
+) -> int:
+    """Write normalized interviews to ``prefix.blob`` / ``prefix.index``.
+
+    The index is a flat int64 array: the interview count, then per interview
+    its blob base offset, turn count, ``turns + 1`` turn byte offsets,
+    ``turns`` question byte lengths and ``turns`` turn character lengths.
+    Returns the number of interviews.
+    """
+    index = array("q", [0])
+    count = 0
+
+    def _write_blob(handle) -> None:
+        nonlocal count
+        position = 0
+        for interview in interviews:
+            offsets = [0]
+            question_lengths = []
+            turn_lengths = []
+            for turn in interview:
+                formatted = _format_turn(turn["q"], turn["a"])
+                encoded = formatted.encode("utf-8")
+                handle.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+                question_lengths.append(len(turn["q"].encode("utf-8")))
+                turn_lengths.append(len(formatted))
+            index.extend([position, len(question_lengths)])
+            index.extend(offsets)
+            index.extend(question_lengths)
+            index.extend(turn_lengths)
+            position += offsets[-1]
+            count += 1
+
+    _atomic_write(f"{prefix}.blob", _write_blob)
+    index[0] = count
+    _atomic_write(f"{prefix}.index", lambda handle: index.tofile(handle))
+    return count
+
+
+def _map_file(path: str):
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def open_compiled_dataset(prefix: str, first_persona_id: int = 0) -> List[InterviewRecord]:
+    """Memory-map a compiled dataset and return its interview records."""
+    blob = _map_file(f"{prefix}.blob")
+    index = memoryview(_map_file(f"{prefix}.index")).cast("q")
+    records: List[InterviewRecord] = []
+    cursor = 1
+    for idx in range(index[0]):
+        base, turns = index[cursor], index[cursor + 1]
+        offsets = index[cursor + 2 : cursor + 3 + turns]
+        question_lengths = index[cursor + 3 + turns : cursor + 3 + 2 * turns]
+        turn_lengths = index[cursor + 3 + 2 * turns : cursor + 3 + 3 * turns]
+        cursor += 3 + 3 * turns
+        records.append(
+            MappedInterviewRecord(
+                str(first_persona_id + idx),
+                blob,
+                base,
+                offsets,
+                question_lengths,
+                turn_lengths,
+            )
+        )
+    return records
+
+
+def _compile_if_missing(
+    path: str,
+    cache_dir: str,
+    loader: Callable[[str], Iterable[Sequence[dict]]] = iter_interviews,
+) -> str:
+    prefix = _entry_prefix(cache_dir, source_content_hash(path, cache_dir), loader)
+    if not (os.path.exists(f"{prefix}.index") and os.path.exists(f"{prefix}.blob")):
+        compile_dataset(loader(path), prefix)
+    return prefix
+
+
+def load_cached_records(
+    path: str,
+    cache_dir: str,
+    first_persona_id: int = 0,
+    loader: Callable[[str], Iterable[Sequence[dict]]] = iter_interviews,
+    num_workers: int | None = None,
+) -> List[InterviewRecord]:
+    """Load interview records for ``path``, compiling them on a cache miss.
+
+    Directories and globs are expanded into shards; missing shards are
+    compiled in a process pool and records are returned in sorted shard
+    order with persona ids numbered across the whole set.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    paths = expand_data_paths(path)
+    if len(paths) == 1 or num_workers == 1:
+        prefixes = [_compile_if_missing(shard, cache_dir, loader) for shard in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            prefixes = list(
+                executor.map(
+                    _compile_if_missing,
+                    paths,
+                    [cache_dir] * len(paths),
+                    [loader] * len(paths),
+                )
+            )
+
+    records: List[InterviewRecord] = []
+    for prefix in prefixes:
+        records.extend(
+            open_compiled_dataset(prefix, first_persona_id=first_persona_id + len(records))
+        )
+    return records
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Precompile interview files into the dataset cache."
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="JSON/JSONL interview files, directories or globs."
+    )
+    parser.add_argument("--cache-dir", default=".cache/datasets")
+    parser.add_argument("--num-workers", type=int)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    summary = {}
+    for path in args.paths:
+        records = load_cached_records(path, args.cache_dir, num_workers=args.num_workers)
+        summary[path] = {
+            "interviews": len(records),
+            "turns": sum(len(record) for record in records),
+        }
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,362 @@
+"""Load balancing across several OpenAI-compatible endpoints.
+
+An ``EndpointBalancer`` spreads LM requests over weighted endpoints (gateway
+replicas, regional deployments) so one run can use their combined quota.
+Each request samples two endpoints in proportion to their weight and takes
+the one with fewer outstanding requests per unit of weight ("power of two
+choices"), or, with ``strategy="latency"``, the one with the lower
+latency-weighted load. Endpoints that fail ``failure_threshold`` times in a
+row with a retryable error are ejected for ``cooldown_seconds`` and then
+probed again; a failed request fails over to another healthy endpoint.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from persona_gepa.managed_lm import is_retryable_error
+
+if TYPE_CHECKING:
+    from persona_gepa.http_pool import ConnectionPool
+
+
+STRATEGIES = ("least_outstanding", "latency")
+_LATENCY_ALPHA = 0.3
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One OpenAI-compatible API base; ``api_key`` overrides the LM's key."""
+
+    api_base: str
+    weight: float = 1.0
+    api_key: Optional[str] = None
+
+
+class _EndpointState:
+    def __init__(self, endpoint: Endpoint):
+        self.endpoint = endpoint
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.latency: Optional[float] = None
+
+    def load(self, strategy: str) -> float:
+        if strategy == "latency":
+            # Unmeasured endpoints score zero so they get sampled early.
+            return (self.outstanding + 1) * (self.latency or 0.0) / self.endpoint.weight
+        # Idle endpoints tie at zero, so light traffic follows the weighted sample.
+        return self.outstanding / self.endpoint.weight
+
+
+class EndpointBalancer:
+    """Shared routing state for every LM that spreads calls over ``endpoints``."""
+
+    def __init__(
+        self,
+        endpoints: Iterable[Endpoint],
+        strategy: str = "least_outstanding",
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        endpoints = list(endpoints)
+        if not endpoints:
+            raise ValueError("EndpointBalancer requires at least one endpoint.")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {strategy!r}")
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1.")
+        if len({endpoint.api_base for endpoint in endpoints}) != len(endpoints):
+            raise ValueError("Endpoint api_base values must be unique.")
+        for endpoint in endpoints:
+            if endpoint.weight <= 0:
+                raise ValueError(f"Endpoint weight must be > 0: {endpoint.api_base}")
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._states = [_EndpointState(endpoint) for endpoint in endpoints]
+        self._lock = threading.Lock()
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return [state.endpoint for state in self._states]
+
+    def _sample(self, candidates: List[_EndpointState]) -> _EndpointState:
+        if len(candidates) == 1:
+            return candidates[0]
+        weights = [state.endpoint.weight for state in candidates]
+        first = self._rng.choices(candidates, weights)[0]
+        rest = [state for state in candidates if state is not first]
+        second = self._rng.choices(rest, [state.endpoint.weight for state in rest])[0]
+        if second.load(self.strategy) < first.load(self.strategy):
+            return second
+        return first
+
+    def acquire(self, exclude: Set[str] = frozenset()) -> Optional[Endpoint]:
+        """Pick an endpoint and count the request as outstanding on it.
+
+        Returns None when every endpoint outside ``exclude`` is ejected and
+        ``exclude`` is non-empty (a failover with nowhere healthy to go).
+        With nothing excluded and every endpoint ejected, the one whose
+        cooldown ends first is used rather than failing the call.
+        """
+        with self._lock:
+            now = self._clock()
+            untried = [s for s in self._states if s.endpoint.api_base not in exclude]
+            healthy = [s for s in untried if s.ejected_until <= now]
+            if healthy:
+                state = self._sample(healthy)
+            elif untried and not exclude:
+                state = min(untried, key=lambda s: s.ejected_until)
+            else:
+                return None
+            state.outstanding += 1
+            state.requests += 1
+            return state.endpoint
+
+    def release(
+        self, endpoint: Endpoint, latency: Optional[float] = None, failed: bool = False
+    ) -> None:
+        """Record the outcome of a request started with ``acquire``.
+
+        ``failed`` counts toward ejection. Without ``failed`` or ``latency``
+        (a request rejected for its own content, or abandoned by the caller)
+        only the outstanding count is released.
+        """
+        with self._lock:
+            state = next(s for s in self._states if s.endpoint == endpoint)
+            state.outstanding -= 1
+            if latency is None and not failed:
+                return
+            if failed:
+                state.failures += 1
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= self.failure_threshold:
+                    state.ejected_until = self._clock() + self.cooldown_seconds
+                    state.ejections += 1
+                return
+            state.consecutive_failures = 0
+            if state.latency is None:
+                state.latency = latency
+            else:
+                state.latency += _LATENCY_ALPHA * (latency - state.latency)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            now = self._clock()
+            return {
+                state.endpoint.api_base: {
+                    "requests": float(state.requests),
+                    "failures": float(state.failures),
+                    "ejections": float(state.ejections),
+                    "ejected": float(state.ejected_until > now),
+                    "outstanding": float(state.outstanding),
+                    "latency_ms": (state.latency or 0.0) * 1e3,
+                }
+                for state in self._states
+            }
+
+    def engines(
+        self,
+        model: str,
+        pool: ConnectionPool,
+        api_key: Optional[str] = None,
+        model_type: str = "chat",
+    ) -> Tuple["BalancedEngine", "AsyncBalancedEngine"]:
+        """Return the (sync, async) engine pair routing ``model`` over every endpoint."""
+        sync_engines = {}
+        async_engines = {}
+        for endpoint in self.endpoints:
+            sync_engine, async_engine = pool.engines(
+                model,
+                api_base=endpoint.api_base,
+                api_key=endpoint.api_key or api_key,
+                model_type=model_type,
+            )
+            sync_engines[endpoint.api_base] = sync_engine
+            async_engines[endpoint.api_base] = async_engine
+        return BalancedEngine(self, sync_engines), AsyncBalancedEngine(self, async_engines)
+
+
+class _Routed:
+    def __init__(self, balancer: EndpointBalancer, engines: Dict[str, object]):
+        self.balancer = balancer
+        self._engines = engines
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _next(self, tried: Set[str], error: Optional[BaseException]) -> Endpoint:
+        endpoint = self.balancer.acquire(exclude=tried)
+        if endpoint is None:
+            raise error
+        return endpoint
+
+    def _finish(self, endpoint: Endpoint, started: float, exc: Optional[BaseException]) -> bool:
+        """Release ``endpoint``; True when the error should fail over.
+
+        Errors that are not the endpoint's fault (bad requests, auth) neither
+        count as failures nor as successes, so they leave its health and
+        latency estimate alone.
+        """
+        latency = time.perf_counter() - started
+        if exc is None:
+            self.balancer.release(endpoint, latency)
+            return False
+        if not is_retryable_error(exc):
+            self.balancer.release(endpoint)
+            return False
+        self.balancer.release(endpoint, latency, failed=True)
+        return True
+
+
+class BalancedEngine(_Routed):
+    """Sync DSPy engine that sends each request to the balancer's pick.
+
+    Streamed requests fail over only until the first event has been yielded.
+    """
+
+    def complete(self, request):
+        tried: Set[str] = set()
+        error: Optional[BaseException] = None
+        while True:
+            endpoint = self._next(tried, error)
+            started = time.perf_counter()
+            try:
+                response = self._engines[endpoint.api_base].complete(request)
+            except Exception as exc:
+                if not self._finish(endpoint, started, exc):
+                    raise
+                tried.add(endpoint.api_base)
+                error = exc
+                continue
+            except BaseException:
+                self.balancer.release(endpoint)
+                raise
+            self._finish(endpoint, started, None)
+            return response
+
+    def stream(self, request):
+        tried: Set[str] = set()
+        error: Optional[BaseException] = None
+        while True:
+            endpoint = self._next(tried, error)
+            started = time.perf_counter()
+            events = self._engines[endpoint.api_base].stream(request)
+            emitted = False
+            try:
+                for event in events:
+                    emitted = True
+                    yield event
+            except Exception as exc:
+                if not self._finish(endpoint, started, exc) or emitted:
+                    raise
+                tried.add(endpoint.api_base)
+                error = exc
+                continue
+            except BaseException:
+                # The consumer stopped early (GeneratorExit) or was interrupted.
+                self.balancer.release(endpoint)
+                events.close()
+                raise
+            self._finish(endpoint, started, None)
+            return
+
+
+class AsyncBalancedEngine(_Routed):
+    """Async counterpart of ``BalancedEngine``."""
+
+    async def complete(self, request):
+        tried: Set[str] = set()
+        error: Optional[BaseException] = None
+        while True:
+            endpoint = self._next(tried, error)
+            started = time.perf_counter()
+            try:
+                response = await self._engines[endpoint.api_base].complete(request)
+            except Exception as exc:
+                if not self._finish(endpoint, started, exc):
+                    raise
+                tried.add(endpoint.api_base)
+                error = exc
+                continue
+            except BaseException:
+                # Cancelled, e.g. the losing attempt of a hedged call.
+                self.balancer.release(endpoint)
+                raise
+            self._finish(endpoint, started, None)
+            return response
+
+    async def stream(self, request):
+        tried: Set[str] = set()
+        error: Optional[BaseException] = None
+        while True:
+            endpoint = self._next(tried, error)
+            started = time.perf_counter()
+            events = self._engines[endpoint.api_base].stream(request)
+            emitted = False
+            try:
+                async for event in events:
+                    emitted = True
+                    yield event
+            except Exception as exc:
+                if not self._finish(endpoint, started, exc) or emitted:
+                    raise
+                tried.add(endpoint.api_base)
+                error = exc
+                continue
+            except BaseException:
+                self.balancer.release(endpoint)
+                await events.aclose()
+                raise
+            self._finish(endpoint, started, None)
+            return
+
+
+_SHARED_BALANCERS: Dict[Tuple, EndpointBalancer] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_endpoint_balancer(
+    endpoints: Dict[str, float],
+    strategy: str = "least_outstanding",
+    failure_threshold: int = 3,
+    cooldown_seconds: float = 30.0,
+) -> EndpointBalancer:
+    """Process-wide balancer for ``{api_base: weight}``, shared by every LM that uses it."""
+    key = (tuple(sorted(endpoints.items())), strategy, failure_threshold, cooldown_seconds)
+    with _SHARED_LOCK:
+        balancer = _SHARED_BALANCERS.get(key)
+        if balancer is None:
+            balancer = EndpointBalancer(
+                [Endpoint(api_base, float(weight)) for api_base, weight in endpoints.items()],
+                strategy=strategy,
+                failure_threshold=failure_threshold,
+                cooldown_seconds=cooldown_seconds,
+            )
+            _SHARED_BALANCERS[key] = balancer
+        return balancer
+
+
+def parse_endpoints(specs: Optional[List[List[str]]]) -> Dict[str, float]:
+    """Parse repeated CLI ``--endpoint URL [WEIGHT]`` values into {api_base: weight}."""
+    endpoints: Dict[str, float] = {}
+    for spec in specs or []:
+        if not spec or len(spec) > 2:
+            raise ValueError(f"Expected --endpoint URL [WEIGHT], got: {' '.join(spec)}")
+        weight = float(spec[1]) if len(spec) == 2 else 1.0
+        if weight <= 0:
+            raise ValueError(f"Endpoint weight must be > 0: {spec[0]}")
+        endpoints[spec[0]] = weight
+    return endpoints
@@ -0,0 +1,293 @@
+"""Pre-rendered prompt fast path for persona inference.
+
+Every DSPy call re-derives the same chat prompt from the signature, runs it
+through the adapter and parses the reply, which costs milliseconds of CPU
+per answer. ``export_prompt_template`` renders an optimized program once
+through DSPy's ``ChatAdapter`` with placeholders for ``history``,
+``question`` and ``persona_profile``, so the template holds exactly the text
+DSPy would send. ``FastPersonaClient`` fills the template, sends it through
+the pooled connections of ``http_pool`` and pulls the answer field out of
+the reply.
+
+``python -m persona_gepa.fast_path --artifact-path ARTIFACT --output TEMPLATE``
+exports a template from a saved artifact.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+import dspy
+from dspy.lm15 import request_from_openai_chat
+
+from persona_gepa.artifacts import load_program
+from persona_gepa.config import PersonaGEPAConfig
+from persona_gepa.endpoints import EndpointBalancer
+from persona_gepa.http_pool import ConnectionPool, shared_connection_pool
+from persona_gepa.managed_lm import (
+    CallController,
+    CallPolicy,
+    LMBudget,
+    estimate_request_tokens,
+)
+
+
+INPUT_FIELDS = ("history", "question", "persona_profile")
+OUTPUT_FIELD = "answer"
+TEMPLATE_VERSION = 1
+
+# Matches dspy.adapters.chat_adapter's field header pattern.
+_FIELD_HEADER = re.compile(r"\[\[ ## (\w+) ## \]\]")
+
+
+class PromptTemplate:
+    """Chat messages with input-field slots, filled by plain concatenation.
+
+    Each message's ``parts`` is a list of literal strings and
+    ``{"field": name}`` slots, so instructions or inputs that happen to
+    contain braces or field names are never substituted.
+    """
+
+    def __init__(self, messages: List[Dict[str, object]], output_field: str = OUTPUT_FIELD):
+        for message in messages:
+            for part in message["parts"]:
+                if not isinstance(part, str) and part.get("field") not in INPUT_FIELDS:
+                    raise ValueError(f"Unknown template slot: {part!r}")
+        self.messages = messages
+        self.output_field = output_field
+
+    def render(
+        self, history: str, question: str, persona_profile: str = ""
+    ) -> List[Dict[str, str]]:
+        values = {
+            "history": str(history),
+            "question": str(question),
+            "persona_profile": str(persona_profile),
+        }
+        return [
+            {
+                "role": message["role"],
+                "content": "".join(
+                    part if isinstance(part, str) else values[part["field"]]
+                    for part in message["parts"]
+                ),
+            }
+            for message in self.messages
+        ]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": TEMPLATE_VERSION,
+            "adapter": "ChatAdapter",
+            "output_field": self.output_field,
+            "messages": self.messages,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "PromptTemplate":
+        if payload.get("version") != TEMPLATE_VERSION:
+            raise ValueError(f"Unsupported prompt template version: {payload.get('version')!r}")
+        return cls(payload["messages"], output_field=payload.get("output_field", OUTPUT_FIELD))
+
+
+def _split_on_sentinels(content: str, sentinels: Dict[str, str]) -> List[object]:
+    pattern = re.compile("|".join(re.escape(token) for token in sentinels))
+    parts: List[object] = []
+    position = 0
+    for match in pattern.finditer(content):
+        if match.start() > position:
+            parts.append(content[position : match.start()])
+        parts.append({"field": sentinels[match.group(0)]})
+        position = match.end()
+    if position < len(content):
+        parts.append(content[position:])
+    return parts
+
+
+def export_prompt_template(program, adapter=None) -> PromptTemplate:
+    """Render ``program``'s prompt (instructions and any demos) into a template."""
+    predict = program.predict
+    adapter = adapter or dspy.ChatAdapter()
+    nonce = uuid.uuid4().hex
+    sentinels = {f"\x00{nonce}:{name}\x00": name for name in INPUT_FIELDS}
+    inputs = {name: token for token, name in sentinels.items()}
+    messages = adapter.format(
+        predict.signature, demos=list(getattr(predict, "demos", None) or []), inputs=inputs
+    )
+    rendered = []
+    for message in messages:
+        content = message["content"]
+        if not isinstance(content, str):
+            raise ValueError("Only text prompts can be exported to a template.")
+        rendered.append(
+            {"role": message["role"], "parts": _split_on_sentinels(content, sentinels)}
+        )
+    return PromptTemplate(rendered)
+
+
+def save_prompt_template(template: PromptTemplate, path: str) -> str:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(template.to_dict(), handle, indent=2)
+    return path
+
+
+def load_prompt_template(path: str) -> PromptTemplate:
+    with open(path, "r", encoding="utf-8") as handle:
+        return PromptTemplate.from_dict(json.load(handle))
+
+
+def parse_answer(completion: Optional[str], output_field: str = OUTPUT_FIELD) -> str:
+    """Extract ``output_field`` from a ChatAdapter-formatted completion.
+
+    Mirrors ``ChatAdapter.parse`` for a single string field. DSPy retries an
+    unparseable reply through its JSON adapter; the fast path raises
+    ``ValueError`` instead.
+    """
+    section: Optional[str] = None
+    lines: List[str] = []
+    for line in (completion or "").splitlines():
+        match = _FIELD_HEADER.match(line.strip())
+        if match:
+            if section == output_field:
+                break
+            section = match.group(1)
+            remaining = line[match.end() :].strip()
+            lines = [remaining] if remaining else []
+        elif section == output_field:
+            lines.append(line)
+    if section != output_field:
+        snippet = (completion or "")[:200]
+        raise ValueError(f"No [[ ## {output_field} ## ]] field in completion: {snippet!r}")
+    return "\n".join(lines).strip()
+
+
+class FastPersonaClient:
+    """Answer persona questions from a ``PromptTemplate`` without DSPy modules.
+
+    Requests go straight to the pooled lm15 engines (``pool``, or the
+    process-wide shared pool), or across a ``balancer``'s endpoints. Every
+    attempt is admitted through ``budget`` (requests and tokens per minute,
+    AIMD concurrency) as in ``ManagedLM``. Retryable failures are retried up
+    to ``policy.max_retries`` times (3 when no policy is given) with the
+    policy's backoff. Deadlines, hedging and single-flight are not supported
+    on this path, so a policy that sets them raises ``ValueError``; DSPy's
+    response cache does not apply either.
+    """
+
+    def __init__(
+        self,
+        template: PromptTemplate,
+        model: str,
+        temperature: float = 0.2,
+        max_tokens: int = 512,
+        api_base: Optional[str] = None,
+        api_key: Optional[str] = None,
+        pool: Optional[ConnectionPool] = None,
+        balancer: Optional[EndpointBalancer] = None,
+        policy: Optional[CallPolicy] = None,
+        budget: Optional[LMBudget] = None,
+    ):
+        policy = policy if policy is not None else CallPolicy(max_retries=3)
+        if policy.deadline_seconds is not None or policy.hedge or policy.single_flight:
+            raise ValueError(
+                "FastPersonaClient supports retries only; unset the policy's "
+                "deadline_seconds, hedge and single_flight."
+            )
+        api_base = api_base or os.getenv("OPENAI_API_BASE") or os.getenv("OPENAI_BASE_URL")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        pool = pool or shared_connection_pool()
+        if balancer is not None:
+            self._engine, self._async_engine = balancer.engines(model, pool, api_key=api_key)
+        else:
+            self._engine, self._async_engine = pool.engines(
+                model, api_base=api_base, api_key=api_key
+            )
+        self.template = template
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.policy = policy
+        self.budget = budget or LMBudget()
+        self._controller = CallController(self.budget, self.policy)
+
+    @classmethod
+    def from_config(
+        cls, template: PromptTemplate, config: PersonaGEPAConfig
+    ) -> "FastPersonaClient":
+        return cls(
+            template,
+            config.persona_model,
+            temperature=config.persona_temperature,
+            max_tokens=config.persona_max_tokens,
+            api_base=config.api_base,
+            pool=config.connection_pool(),
+            balancer=config.endpoint_balancer(),
+            policy=config.lm_call_policy(),
+            budget=config.lm_budget("persona"),
+        )
+
+    def _body(self, messages: List[Dict[str, str]]) -> Dict[str, object]:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+    def request(self, history: str, question: str, persona_profile: str = ""):
+        """The lm15 ``Request`` for one question, as DSPy would build it."""
+        return request_from_openai_chat(
+            self._body(self.template.render(history, question, persona_profile))
+        )
+
+    def answer(self, history: str, question: str, persona_profile: str = "") -> str:
+        messages = self.template.render(history, question, persona_profile)
+        request = request_from_openai_chat(self._body(messages))
+        tokens = estimate_request_tokens(None, messages, self.max_tokens)
+        controller = self._controller
+        response = controller.with_retries(
+            lambda: controller.call(lambda: self._engine.complete(request), tokens)
+        )
+        return parse_answer(response.text, self.template.output_field)
+
+    async def aanswer(self, history: str, question: str, persona_profile: str = "") -> str:
+        messages = self.template.render(history, question, persona_profile)
+        request = request_from_openai_chat(self._body(messages))
+        tokens = estimate_request_tokens(None, messages, self.max_tokens)
+        controller = self._controller
+        response = await controller.awith_retries(
+            lambda: controller.acall(lambda: self._async_engine.complete(request), tokens)
+        )
+        return parse_answer(response.text, self.template.output_field)
+
+    def stats(self) -> Dict[str, float]:
+        """Call, error, throttle, retry and rate-wait counters, as ``ManagedLM.stats``."""
+        return self._controller.stats()
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Export an optimized artifact as a pre-rendered prompt template."
+    )
+    parser.add_argument("--artifact-path", required=True)
+    parser.add_argument("--output", required=True, help="Template JSON file to write.")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    template = export_prompt_template(load_program(args.artifact_path))
+    print(save_prompt_template(template, args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from persona_gepa.retrieval import select_relevant_turns
+
+
+_TURN_START = re.compile(r"(?m)^Q: ")
+
+
+def approx_token_count(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for history budgeting."""
+    return approx_tokens_for_length(len(text))
+
+
+def approx_tokens_for_length(length: int) -> int:
+    return (length + 3) // 4
+
+
+@dataclass(frozen=True)
+class HistoryPolicy:
+    """Which previous turns an example's history includes.
+
+    ``head_turns`` always keeps the first turns of the interview, and
+    ``max_turns`` keeps at most that many of the most recent turns after
+    them (so first-k plus last-k is ``head_turns=k, max_turns=k``).
+    ``max_tokens`` caps the approximate token count of the whole history;
+    head turns are charged first and recent turns fill the remainder.
+    ``retrieval_top_k`` replaces recency with relevance: the head turns plus
+    the ``k`` earlier turns most similar to the current question are kept
+    (see ``persona_gepa.retrieval``), still within ``max_tokens`` and with
+    at most ``max_turns`` retrieved turns. The default keeps every previous
+    turn.
+    """
+
+    max_tokens: Optional[int] = None
+    max_turns: Optional[int] = None
+    head_turns: int = 0
+    retrieval_top_k: Optional[int] = None
+
+    def is_full(self) -> bool:
+        return (
+            self.max_tokens is None
+            and self.max_turns is None
+            and self.retrieval_top_k is None
+        )
+
+    def retrieval_turns(
+        self,
+        relevant: List[int],
+        turn_index: int,
+        turn_tokens: Callable[[int], int],
+        start: int = 0,
+    ) -> List[int]:
+        """Merge head turns with retrieved turns inside ``[start, turn_index)``.
+
+        ``relevant`` is ordered from most to least relevant. Head turns are
+        charged to ``max_tokens`` first, then retrieved turns in relevance
+        order until the budget or ``max_turns`` runs out. Returns the kept
+        turns in chronological order.
+        """
+        budget = self.max_tokens
+        kept: List[int] = []
+        for idx in range(start, min(start + max(self.head_turns, 0), turn_index)):
+            if budget is not None:
+                cost = turn_tokens(idx)
+                if cost > budget:
+                    break
+                budget -= cost
+            kept.append(idx)
+        head = set(kept)
+        retrieved = [idx for idx in relevant if start <= idx < turn_index and idx not in head]
+        if self.max_turns is not None:
+            retrieved = retrieved[: max(self.max_turns, 0)]
+        for idx in retrieved:
+            if budget is not None:
+                cost = turn_tokens(idx)
+                if cost > budget:
+                    break
+                budget -= cost
+            kept.append(idx)
+        return sorted(kept)
+
+    def select(
+        self, turn_tokens: Callable[[int], int], turn_index: int
+    ) -> List[Tuple[int, int]]:
+        """Return ``[start, stop)`` turn ranges to keep before ``turn_index``."""
+        if self.is_full():
+            return [(0, turn_index)] if turn_index else []
+
+        budget = self.max_tokens
+        head_stop = min(max(self.head_turns, 0), turn_index)
+        if budget is not None:
+            for idx in range(head_stop):
+                cost = turn_tokens(idx)
+                if cost > budget:
+                    head_stop = idx
+                    break
+                budget -= cost
+
+        tail_start = turn_index
+        lowest = head_stop
+        if self.max_turns is not None:
+            lowest = max(lowest, turn_index - max(self.max_turns, 0))
+        while tail_start > lowest:
+            if budget is not None:
+                cost = turn_tokens(tail_start - 1)
+                if cost > budget:
+                    break
+                budget -= cost
+            tail_start -= 1
+
+        ranges = []
+        if head_stop:
+            ranges.append((0, head_stop))
+        if tail_start < turn_index:
+            if ranges and tail_start == head_stop:
+                ranges = [(0, turn_index)]
+            else:
+                ranges.append((tail_start, turn_index))
+        return ranges
+
+
+def split_history_turns(history: str) -> List[str]:
+    """Split a formatted ``Q:/A:`` history string into per-turn chunks."""
+    starts = [match.start() for match in _TURN_START.finditer(history)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(history)]
+    return [history[start:stop] for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def apply_history_policy(
+    history: str, policy: Optional[HistoryPolicy], question: str = ""
+) -> str:
+    """Window an already formatted history string with ``policy``."""
+    if not history or policy is None or policy.is_full():
+        return history
+    turns = split_history_turns(history)
+    if policy.retrieval_top_k:
+        relevant = select_relevant_turns(
+            turns,
+            [question],
+            [len(turns)],
+            policy.retrieval_top_k,
+            head_turns=policy.head_turns,
+        )[0]
+        kept = policy.retrieval_turns(
+            relevant, len(turns), lambda idx: approx_token_count(turns[idx])
+        )
+        return "".join(turns[idx] for idx in kept)
+    ranges = policy.select(lambda idx: approx_token_count(turns[idx]), len(turns))
+    return "".join("".join(turns[start:stop]) for start, stop in ranges)
@@ -0,0 +1,428 @@
+"""Shared keep-alive HTTP connection pools for DSPy LMs.
+
+By default every ``dspy.LM`` owns its own connections, so the persona, judge
+and reflection LMs each open and handshake separately even when they talk
+to the same gateway. A ``ConnectionPool`` hands out DSPy engines whose
+transport is shared per ``api_base``: idle keep-alive connections are reused
+by every LM pointed at that endpoint, and the total per endpoint is capped
+at ``max_connections``. ``http2=True`` multiplexes requests over HTTP/2 via
+httpx (``pip install persona-gepa[http2]``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+from dspy.clients.engines import AsyncLM15Engine, LM15Engine
+from dspy.lm15 import RouterConfig
+
+
+DEFAULT_MAX_CONNECTIONS = 100
+_DEFAULT_ENDPOINT = "default"
+
+
+def _transports():
+    from dspy._vendor.lm15 import transports
+
+    return transports
+
+
+def _require_httpx():
+    try:
+        import h2  # noqa: F401
+        import httpx
+    except ImportError as exc:
+        raise RuntimeError(
+            "HTTP/2 connection pooling requires httpx with h2 "
+            "(pip install persona-gepa[http2])."
+        ) from exc
+    return httpx
+
+
+def _map_httpx_error(httpx, exc: Exception) -> Exception:
+    transports = _transports()
+    for source, target in (
+        ("ConnectTimeout", "ConnectTimeout"),
+        ("ReadTimeout", "ReadTimeout"),
+        ("WriteTimeout", "WriteTimeout"),
+        ("ConnectError", "ConnectError"),
+        ("ReadError", "ReadError"),
+        ("WriteError", "WriteError"),
+        ("RemoteProtocolError", "ProtocolError"),
+    ):
+        if isinstance(exc, getattr(httpx, source)):
+            return getattr(transports, target)(str(exc))
+    return transports.TransportError(str(exc))
+
+
+def _httpx_timeout(httpx, request):
+    return httpx.Timeout(
+        connect=request.connect_timeout,
+        read=request.read_timeout,
+        write=request.write_timeout,
+        pool=None,
+    )
+
+
+def _response_headers(response):
+    # httpx already decoded the body, so its content-encoding no longer applies.
+    return [
+        (name, value)
+        for name, value in response.headers.multi_items()
+        if name.lower() != "content-encoding"
+    ]
+
+
+# httpcore trace events emitted once per newly opened connection.
+_CONNECT_EVENTS = frozenset(
+    ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete")
+)
+
+
+def _httpx_pool_stats(client, counters: Dict[str, int]) -> Dict[str, int]:
+    # httpx keeps its pool on the transport; idle stays 0 if the private
+    # layout changes.
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for conn in connections if getattr(conn, "is_idle", lambda: False)())
+    return {
+        "idle": idle,
+        "in_use": counters["in_use"],
+        "total_opened": counters["total_opened"],
+    }
+
+
+class _HttpxTransport:
+    """lm15 transport protocol over a shared ``httpx.Client``."""
+
+    def __init__(self, max_connections: int, http2: bool = True):
+        self._httpx = _require_httpx()
+        self._client = self._httpx.Client(
+            http2=http2,
+            limits=self._httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._lock = threading.Lock()
+        self._counters = {"in_use": 0, "total_opened": 0}
+        self.max_connections = max_connections
+
+    def _trace(self, event: str, info) -> None:
+        if event in _CONNECT_EVENTS:
+            with self._lock:
+                self._counters["total_opened"] += 1
+
+    def stream(self, request):
+        httpx = self._httpx
+        transports = _transports()
+        try:
+            outgoing = self._client.build_request(
+                request.method,
+                request.url,
+                headers=request.headers,
+                content=request.body or None,
+                timeout=_httpx_timeout(httpx, request),
+                extensions={"trace": self._trace},
+            )
+            response = self._client.send(outgoing, stream=True)
+        except httpx.HTTPError as exc:
+            raise _map_httpx_error(httpx, exc) from exc
+        with self._lock:
+            self._counters["in_use"] += 1
+        released = threading.Event()
+
+        def _release(body_consumed: bool = True) -> None:
+            if released.is_set():
+                return
+            released.set()
+            response.close()
+            with self._lock:
+                self._counters["in_use"] -= 1
+
+        def _chunks():
+            try:
+                for chunk in response.iter_bytes():
+                    yield chunk
+            except httpx.HTTPError as exc:
+                raise _map_httpx_error(httpx, exc) from exc
+
+        return transports.TransportResponse(
+            status=response.status_code,
+            reason=response.reason_phrase,
+            headers=_response_headers(response),
+            http_version=response.http_version,
+            chunks=_chunks(),
+            release=_release,
+        )
+
+    def pool_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return _httpx_pool_stats(self._client, self._counters)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class _HttpxAsyncTransport:
+    """Async lm15 transport over an ``httpx.AsyncClient`` bound to one loop."""
+
+    def __init__(self, max_connections: int, http2: bool = True):
+        self._httpx = _require_httpx()
+        self._client = self._httpx.AsyncClient(
+            http2=http2,
+            limits=self._httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._counters = {"in_use": 0, "total_opened": 0}
+        self.max_connections = max_connections
+
+    async def _trace(self, event: str, info) -> None:
+        if event in _CONNECT_EVENTS:
+            self._counters["total_opened"] += 1
+
+    def stream(self, request) -> "_HttpxStream":
+        return _HttpxStream(self, request)
+
+    def pool_stats(self) -> Dict[str, int]:
+        return _httpx_pool_stats(self._client, self._counters)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class _HttpxStream:
+    def __init__(self, transport: _HttpxAsyncTransport, request):
+        self._transport = transport
+        self._request = request
+        self._response = None
+
+    async def __aenter__(self):
+        httpx = self._transport._httpx
+        transports = _transports()
+        client = self._transport._client
+        try:
+            outgoing = client.build_request(
+                self._request.method,
+                self._request.url,
+                headers=self._request.headers,
+                content=self._request.body or None,
+                timeout=_httpx_timeout(httpx, self._request),
+                extensions={"trace": self._transport._trace},
+            )
+            self._response = await client.send(outgoing, stream=True)
+        except httpx.HTTPError as exc:
+            raise _map_httpx_error(httpx, exc) from exc
+        self._transport._counters["in_use"] += 1
+        response = self._response
+
+        async def _chunks():
+            try:
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+            except httpx.HTTPError as exc:
+                raise _map_httpx_error(httpx, exc) from exc
+
+        return transports.AsyncTransportResponse(
+            status=response.status_code,
+            reason=response.reason_phrase,
+            headers=_response_headers(response),
+            http_version=response.http_version,
+            chunks=_chunks(),
+            release=self._release,
+        )
+
+    async def _release(self, body_consumed: bool = True) -> None:
+        if self._response is not None:
+            response, self._response = self._response, None
+            await response.aclose()
+            self._transport._counters["in_use"] -= 1
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self._release()
+
+
+class _PooledEngine(LM15Engine):
+    """Sync engine on a pooled transport; deep copies of an LM keep sharing it."""
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class _PooledAsyncEngine:
+    """Async engine that routes through the pool's transport for the running loop.
+
+    Async transports are confined to the event loop that first used them, so
+    each loop gets its own transport and ``AsyncLM15Engine``; connections are
+    still shared by every LM on that loop.
+    """
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __init__(self, pool: "ConnectionPool", endpoint: Optional[str], key: Tuple):
+        self._pool = pool
+        self._endpoint = endpoint
+        self._key = key
+        self._engines: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _engine(self) -> AsyncLM15Engine:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            engine = self._engines.get(loop)
+            if engine is None:
+                transport = self._pool._async_transport(loop, self._endpoint)
+                engine = self._pool._make_engine(AsyncLM15Engine, transport, self._key)
+                self._engines[loop] = engine
+            return engine
+
+    async def complete(self, request):
+        return await self._engine().complete(request)
+
+    async def stream(self, request):
+        async for event in self._engine().stream(request):
+            yield event
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            engine = self._engines.pop(loop, None)
+        if engine is not None:
+            await engine.aclose()
+
+
+class ConnectionPool:
+    """Size-limited keep-alive connections shared by every LM built with it.
+
+    Pass the pool to ``build_lm(pool=...)``. One transport is kept per
+    ``api_base`` (per event loop for async calls), each capped at
+    ``max_connections``; engines are cached per (api_base, api_key, model
+    route) so LMs with the same endpoint and credentials also share routing
+    state.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, http2: bool = False):
+        if max_connections < 1:
+            raise ValueError("max_connections must be >= 1.")
+        if http2:
+            _require_httpx()
+        self.max_connections = max_connections
+        self.http2 = http2
+        self._lock = threading.Lock()
+        self._sync_transports: Dict[str, object] = {}
+        self._async_transports: Dict[str, "weakref.WeakKeyDictionary"] = {}
+        self._engines: Dict[Tuple, Tuple[_PooledEngine, _PooledAsyncEngine]] = {}
+        self._closed = False
+
+    def _new_transport(self, asynchronous: bool):
+        if self.http2:
+            cls = _HttpxAsyncTransport if asynchronous else _HttpxTransport
+            return cls(self.max_connections)
+        transports = _transports()
+        cls = transports.StdlibAsyncTransport if asynchronous else transports.StdlibTransport
+        return cls(max_connections=self.max_connections)
+
+    def _sync_transport(self, endpoint: Optional[str]):
+        name = endpoint or _DEFAULT_ENDPOINT
+        transport = self._sync_transports.get(name)
+        if transport is None:
+            transport = self._new_transport(asynchronous=False)
+            self._sync_transports[name] = transport
+        return transport
+
+    def _async_transport(self, loop, endpoint: Optional[str]):
+        name = endpoint or _DEFAULT_ENDPOINT
+        with self._lock:
+            per_loop = self._async_transports.setdefault(name, weakref.WeakKeyDictionary())
+            transport = per_loop.get(loop)
+            if transport is None:
+                transport = self._new_transport(asynchronous=True)
+                per_loop[loop] = transport
+            return transport
+
+    @staticmethod
+    def _make_engine(cls, transport, key: Tuple):
+        provider, api_base, api_key, model_type = key
+        return cls(
+            RouterConfig(
+                transport=transport,
+                api_keys={provider: api_key} if api_key else None,
+                base_urls={provider: api_base} if api_base else None,
+            ),
+            model_type=model_type,
+        )
+
+    def engines(
+        self,
+        model: str,
+        api_base: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model_type: str = "chat",
+    ) -> Tuple[_PooledEngine, _PooledAsyncEngine]:
+        """Return the (sync, async) engine pair for ``dspy.LM(engine=..., async_engine=...)``."""
+        if self._closed:
+            raise RuntimeError("ConnectionPool is closed.")
+        provider = LM15Engine(RouterConfig(), model_type=model_type).resolve(model).provider
+        key = (provider, api_base, api_key, model_type)
+        with self._lock:
+            pair = self._engines.get(key)
+            if pair is None:
+                engine = self._make_engine(_PooledEngine, self._sync_transport(api_base), key)
+                pair = (engine, _PooledAsyncEngine(self, api_base, key))
+                self._engines[key] = pair
+            return pair
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Connection counts per endpoint, summed over sync and per-loop transports."""
+        report: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            transports = [(name, t) for name, t in self._sync_transports.items()]
+            for name, per_loop in self._async_transports.items():
+                transports.extend((name, t) for t in list(per_loop.values()))
+        for name, transport in transports:
+            entry = report.setdefault(name, {"idle": 0, "in_use": 0, "total_opened": 0})
+            for field, value in transport.pool_stats().items():
+                if field in entry:
+                    entry[field] += int(value)
+        return report
+
+    def totals(self) -> Dict[str, int]:
+        """``stats()`` summed over all endpoints."""
+        totals = {"idle": 0, "in_use": 0, "total_opened": 0}
+        for entry in self.stats().values():
+            for field, value in entry.items():
+                totals[field] += value
+        return totals
+
+    def close(self) -> None:
+        """Close sync connections. Async transports close with their event loop."""
+        with self._lock:
+            self._closed = True
+            transports = list(self._sync_transports.values())
+            self._sync_transports.clear()
+            self._engines.clear()
+        for transport in transports:
+            transport.close()
+
+
+_SHARED_POOLS: Dict[Tuple[int, bool], ConnectionPool] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_connection_pool(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS, http2: bool = False
+) -> ConnectionPool:
+    """Process-wide pool for the given settings, so repeated ``build_lm`` calls reuse it."""
+    key = (max_connections, http2)
+    with _SHARED_LOCK:
+        pool = _SHARED_POOLS.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(max_connections=max_connections, http2=http2)
+            _SHARED_POOLS[key] = pool
+        return pool
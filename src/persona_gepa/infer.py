@@ -2,32 +2,45 @@ from __future__ import annotations
 
 import argparse
 import json
-from typing import Dict, List, Optional
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 
 import dspy
 
-from persona_gepa.artifacts import load_program
+from persona_gepa.artifact_store import ArtifactStore
+from persona_gepa.artifacts import ProgramRegistry, load_program
 from persona_gepa.cache import configure_dspy_cache
 from persona_gepa.config import PersonaGEPAConfig
+from persona_gepa.endpoints import parse_endpoints
+from persona_gepa.history import apply_history_policy
+from persona_gepa.profile import build_profile_builder
 from persona_gepa.utils import build_lm, configure_dspy_lm
 
 
-def run_inference(
-    config: PersonaGEPAConfig,
-    artifact_path: str,
-    history: str,
-    question: str,
-    persona_profile: str = "",
-) -> str:
-    configure_dspy_cache(config.cache_dir)
+def build_persona_lm(config: PersonaGEPAConfig):
+    """Build the persona LM described by ``config`` and make it DSPy's default."""
     persona_lm = build_lm(
         config.persona_model,
         config.persona_temperature,
         config.persona_max_tokens,
         api_base=config.api_base,
+        budget=config.lm_budget("persona"),
+        policy=config.lm_call_policy(),
+        pool=config.connection_pool(),
+        balancer=config.endpoint_balancer(),
     )
     configure_dspy_lm(persona_lm)
-    program = load_program(artifact_path, lm=persona_lm)
+    return persona_lm
+
+
+def predict_answer(
+    program, persona_lm, history: str, question: str, persona_profile: str = ""
+) -> str:
+    """Answer ``question`` with ``program``, pinning ``persona_lm`` where DSPy allows."""
     context = getattr(dspy, "context", None)
     if callable(context):
         with context(lm=persona_lm):
@@ -41,30 +54,426 @@ def run_inference(
     return getattr(prediction, "answer", str(prediction))
 
 
+def run_inference(
+    config: PersonaGEPAConfig,
+    artifact_path: str,
+    history: str,
+    question: str,
+    persona_profile: str = "",
+) -> str:
+    configure_dspy_cache(config.cache_dir)
+    persona_lm = build_persona_lm(config)
+    program = load_program(artifact_path, lm=persona_lm)
+    if config.profile_chunk_turns and not persona_profile:
+        persona_profile, history = build_profile_builder(config).for_history(history)
+    history = apply_history_policy(history, config.history_policy(), question=question)
+    return predict_answer(program, persona_lm, history, question, persona_profile)
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1e3
+
+
+class InferenceService:
+    """Warm persona LM, loaded programs and profile stage shared by all requests."""
+
+    def __init__(
+        self,
+        config: PersonaGEPAConfig,
+        artifact_path: Optional[str] = None,
+        max_batch_workers: int = 8,
+    ):
+        self.config = config
+        self.artifact_path = artifact_path
+        configure_dspy_cache(config.cache_dir)
+        self.persona_lm = build_persona_lm(config)
+        self.programs = ProgramRegistry(
+            lm=self.persona_lm,
+            max_size=config.program_cache_size,
+            revalidate_seconds=config.program_revalidate_seconds,
+        )
+        self._profile_builder = (
+            build_profile_builder(config) if config.profile_chunk_turns else None
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_batch_workers), thread_name_prefix="persona-serve"
+        )
+        if artifact_path:
+            self.program(artifact_path)
+
+    def program(self, artifact_path: Optional[str] = None):
+        """Return the loaded program for ``artifact_path`` (default: the server's)."""
+        path = artifact_path or self.artifact_path
+        if not path:
+            raise ValueError("artifact_path is required (no default artifact configured).")
+        return self.programs.get(path)
+
+    def answer(
+        self,
+        question: str,
+        history: str = "",
+        persona_profile: str = "",
+        artifact_path: Optional[str] = None,
+    ) -> Dict[str, object]:
+        if not question:
+            raise ValueError("question is required.")
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        step = time.perf_counter()
+        program = self.program(artifact_path)
+        timings["load_ms"] = _elapsed_ms(step)
+
+        step = time.perf_counter()
+        if self._profile_builder is not None and not persona_profile:
+            persona_profile, history = self._profile_builder.for_history(history)
+        timings["profile_ms"] = _elapsed_ms(step)
+
+        step = time.perf_counter()
+        history = apply_history_policy(history, self.config.history_policy(), question=question)
+        timings["history_ms"] = _elapsed_ms(step)
+
+        step = time.perf_counter()
+        answer = predict_answer(program, self.persona_lm, history, question, persona_profile)
+        timings["predict_ms"] = _elapsed_ms(step)
+
+        timings["total_ms"] = _elapsed_ms(started)
+        return {"answer": answer, "timings": timings}
+
+    def answer_batch(
+        self, items: List[Dict[str, str]], artifact_path: Optional[str] = None
+    ) -> List[Dict[str, object]]:
+        """Answer ``items`` concurrently, in order; a failed item gets an ``error``."""
+
+        def _one(item):
+            try:
+                return self.answer(
+                    item.get("question", ""),
+                    history=item.get("history", ""),
+                    persona_profile=item.get("persona_profile", ""),
+                    artifact_path=item.get("artifact_path") or artifact_path,
+                )
+            except Exception as exc:
+                return {"error": f"{type(exc).__name__}: {exc}"}
+
+        return list(self._executor.map(_one, items))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def _completed_ids(output_path: str) -> set:
+    """Ids already answered in ``output_path``; drops a torn trailing line."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as handle:
+        valid_end = 0
+        for line in handle:
+            if not line.endswith(b"\n"):
+                break
+            valid_end += len(line)
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and "answer" in record:
+                done.add(_id_key(record.get("id")))
+        handle.truncate(valid_end)
+    return done
+
+
+def _id_key(record_id) -> str:
+    return json.dumps(record_id, sort_keys=True)
+
+
+def _iter_batch_records(input_path: str) -> Iterator[Tuple[object, object]]:
+    """Yield (id, record) per non-blank line; ``id`` defaults to the line number."""
+    with open(input_path, "r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_number, ValueError(f"Invalid JSON on line {line_number}: {exc}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ValueError(f"Line {line_number} is not a JSON object.")
+                continue
+            yield record.get("id", line_number), record
+
+
+def run_batch_inference(
+    config: PersonaGEPAConfig,
+    input_path: str,
+    output_path: str,
+    artifact_path: Optional[str] = None,
+    concurrency: int = 8,
+    ordered: bool = True,
+    service: Optional[InferenceService] = None,
+) -> Dict[str, float]:
+    """Answer a JSONL file of questions and append ``{"id", "answer"|"error"}`` lines.
+
+    Input lines hold ``question`` plus optional ``history``, ``persona_profile``,
+    ``artifact`` and ``id`` (default: the line number). At most ``concurrency``
+    questions are in flight and only a small window is buffered, so inputs of
+    any size stream through. Output is in input order unless ``ordered`` is
+    False, in which case lines are written as they finish. Rerunning with the
+    same output skips ids that already have an answer; failed ids are retried
+    and appended again, so the last line for an id wins. A ``service`` passed
+    in is left open; one created here is closed before returning.
+    """
+    completed = _completed_ids(output_path)
+    counts = {"records": 0, "answered": 0, "errors": 0, "skipped": 0}
+    window = max(1, concurrency) * 2
+    owns_service = service is None
+    if owns_service:
+        service = InferenceService(
+            config, artifact_path=artifact_path, max_batch_workers=concurrency
+        )
+
+    def _answer(record_id, record) -> Dict[str, object]:
+        if isinstance(record, Exception):
+            return {"id": record_id, "error": str(record)}
+        try:
+            result = service.answer(
+                str(record.get("question", "")),
+                history=str(record.get("history", "")),
+                persona_profile=str(record.get("persona_profile", "")),
+                artifact_path=record.get("artifact") or artifact_path,
+            )
+        except Exception as exc:
+            return {"id": record_id, "error": f"{type(exc).__name__}: {exc}"}
+        return {"id": record_id, "answer": result["answer"]}
+
+    try:
+        started = time.perf_counter()
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+            max_workers=max(1, concurrency), thread_name_prefix="persona-batch"
+        ) as executor:
+
+            def _write(future) -> None:
+                result = future.result()
+                counts["errors" if "error" in result else "answered"] += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+
+            pending: Deque = deque()
+            for record_id, record in _iter_batch_records(input_path):
+                counts["records"] += 1
+                if _id_key(record_id) in completed:
+                    counts["skipped"] += 1
+                    continue
+                pending.append(executor.submit(_answer, record_id, record))
+                if len(pending) < window:
+                    continue
+                if ordered:
+                    _write(pending.popleft())
+                else:
+                    done, remaining = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _write(future)
+                    pending = deque(remaining)
+            if not ordered:
+                pending = deque(as_completed(pending))
+            while pending:
+                _write(pending.popleft())
+    finally:
+        if owns_service:
+            service.close()
+
+    elapsed = time.perf_counter() - started
+    processed = counts["answered"] + counts["errors"]
+    return {
+        **{key: float(value) for key, value in counts.items()},
+        "elapsed_seconds": elapsed,
+        "throughput_per_s": processed / elapsed if elapsed > 0 else 0.0,
+    }
+
+
 def _load_input(path: str) -> Dict[str, str]:
     with open(path, "r", encoding="utf-8") as handle:
         return json.load(handle)
 
 
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the persona LM, budget, history, profile and connection flags shared with ``serve``."""
+    parser.add_argument("--persona-model", default="openai/gpt-4o")
+    parser.add_argument("--persona-temperature", type=float, default=0.2)
+    parser.add_argument("--persona-max-tokens", type=int, default=512)
+    parser.add_argument(
+        "--persona-rpm", type=float, help="Requests-per-minute budget for the persona model."
+    )
+    parser.add_argument(
+        "--persona-tpm", type=float, help="Tokens-per-minute budget for the persona model."
+    )
+    parser.add_argument(
+        "--persona-max-concurrency",
+        type=int,
+        help="Adaptive (AIMD) in-flight ceiling for the persona model.",
+    )
+
+    parser.add_argument(
+        "--lm-deadline-seconds",
+        type=float,
+        help="Per-call deadline for every LM call, including retries and hedges.",
+    )
+    parser.add_argument(
+        "--lm-max-retries",
+        type=int,
+        default=0,
+        help="Retries with jittered backoff for 429/5xx/timeout failures.",
+    )
+    parser.add_argument(
+        "--lm-hedge",
+        action="store_true",
+        help="Send a duplicate request when a call exceeds the recent p95 latency.",
+    )
+    parser.add_argument("--lm-hedge-quantile", type=float, default=0.95)
+    parser.add_argument(
+        "--lm-single-flight",
+        action="store_true",
+        help="Share one LM call between concurrent identical requests.",
+    )
+
+    parser.add_argument("--history-max-tokens", type=int)
+    parser.add_argument("--history-max-turns", type=int)
+    parser.add_argument("--history-head-turns", type=int, default=0)
+    parser.add_argument("--history-retrieval-top-k", type=int)
+
+    parser.add_argument("--profile-chunk-turns", type=int)
+    parser.add_argument("--profile-model")
+    parser.add_argument("--profile-cache-dir", default=".cache/profiles")
+
+    parser.add_argument(
+        "--api-base",
+        help="Optional API base URL for OpenAI-compatible endpoints.",
+    )
+    parser.add_argument(
+        "--http-max-connections",
+        type=int,
+        help="Share one keep-alive connection pool of this size per API base across all LMs.",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 for the shared connection pool (requires persona-gepa[http2]).",
+    )
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        nargs="+",
+        metavar="URL [WEIGHT]",
+        help="OpenAI-compatible API base to balance calls across (repeatable; overrides --api-base).",
+    )
+    parser.add_argument(
+        "--endpoint-routing",
+        choices=["least_outstanding", "latency"],
+        default="least_outstanding",
+    )
+    parser.add_argument(
+        "--endpoint-failure-threshold",
+        type=int,
+        default=3,
+        help="Consecutive retryable failures before an endpoint is ejected.",
+    )
+    parser.add_argument(
+        "--endpoint-cooldown-seconds",
+        type=float,
+        default=30.0,
+        help="How long an ejected endpoint is skipped before it is retried.",
+    )
+
+    parser.add_argument("--cache-dir", default=".cache/dspy")
+    parser.add_argument(
+        "--program-cache-size",
+        type=int,
+        default=1024,
+        help="Loaded artifacts kept in memory (least recently used are dropped).",
+    )
+    parser.add_argument(
+        "--program-revalidate-seconds",
+        type=float,
+        default=1.0,
+        help="How often a cached artifact is checked for changes on disk.",
+    )
+
+
+def config_from_args(args: argparse.Namespace) -> PersonaGEPAConfig:
+    """Build the config for flags added by ``add_config_arguments``."""
+    return PersonaGEPAConfig(
+        persona_model=args.persona_model,
+        persona_temperature=args.persona_temperature,
+        persona_max_tokens=args.persona_max_tokens,
+        persona_rpm=args.persona_rpm,
+        persona_tpm=args.persona_tpm,
+        persona_max_concurrency=args.persona_max_concurrency,
+        lm_deadline_seconds=args.lm_deadline_seconds,
+        lm_max_retries=args.lm_max_retries,
+        lm_hedge=args.lm_hedge,
+        lm_hedge_quantile=args.lm_hedge_quantile,
+        lm_single_flight=args.lm_single_flight,
+        api_base=args.api_base,
+        http_max_connections=args.http_max_connections,
+        http2=args.http2,
+        endpoints=parse_endpoints(args.endpoint),
+        endpoint_routing=args.endpoint_routing,
+        endpoint_failure_threshold=args.endpoint_failure_threshold,
+        endpoint_cooldown_seconds=args.endpoint_cooldown_seconds,
+        cache_dir=args.cache_dir,
+        history_max_tokens=args.history_max_tokens,
+        history_max_turns=args.history_max_turns,
+        history_head_turns=args.history_head_turns,
+        history_retrieval_top_k=args.history_retrieval_top_k,
+        profile_chunk_turns=args.profile_chunk_turns,
+        profile_model=args.profile_model,
+        profile_cache_dir=args.profile_cache_dir,
+        program_cache_size=args.program_cache_size,
+        program_revalidate_seconds=args.program_revalidate_seconds,
+    )
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run inference with optimized persona.")
-    parser.add_argument("--artifact-path", required=True)
+    parser.add_argument(
+        "--artifact-path",
+        help="Artifact to answer with (batch records may name their own 'artifact').",
+    )
+
+    parser.add_argument(
+        "--artifact-store",
+        help=(
+            "Answer with the best artifact for --persona-id and --persona-model "
+            "from this artifact store."
+        ),
+    )
+    parser.add_argument("--persona-id", help="Persona to look up in --artifact-store.")
 
     parser.add_argument("--history", help="Transcript history string.")
     parser.add_argument("--question", help="Current question.")
     parser.add_argument("--persona-profile", default="")
     parser.add_argument("--input-path", help="JSON file with history/question keys.")
 
-    parser.add_argument("--persona-model", default="openai/gpt-4o")
-    parser.add_argument("--persona-temperature", type=float, default=0.2)
-    parser.add_argument("--persona-max-tokens", type=int, default=512)
-
     parser.add_argument(
-        "--api-base",
-        help="Optional API base URL for OpenAI-compatible endpoints.",
+        "--batch-input",
+        help="JSONL file of {question, history, persona_profile, artifact, id} records.",
+    )
+    parser.add_argument(
+        "--batch-output",
+        help="JSONL file to append {id, answer|error} lines to; rerun to resume.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Batch questions in flight at once."
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Write batch results as they finish instead of in input order.",
     )
 
-    parser.add_argument("--cache-dir", default=".cache/dspy")
+    add_config_arguments(parser)
 
     return parser
 
@@ -73,6 +482,37 @@ def main(argv: Optional[List[str]] = None) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
 
+    if args.artifact_store:
+        if not args.persona_id:
+            raise SystemExit("--persona-id is required with --artifact-store.")
+        store = ArtifactStore(args.artifact_store)
+        try:
+            record = store.best(args.persona_id, model=args.persona_model)
+        finally:
+            store.close()
+        if record is None:
+            raise SystemExit(
+                f"No artifact stored for persona {args.persona_id!r} "
+                f"and model {args.persona_model!r}."
+            )
+        args.artifact_path = record.path
+
+    if args.batch_input:
+        if not args.batch_output:
+            raise SystemExit("--batch-output is required with --batch-input.")
+        stats = run_batch_inference(
+            config_from_args(args),
+            args.batch_input,
+            args.batch_output,
+            artifact_path=args.artifact_path,
+            concurrency=args.concurrency,
+            ordered=not args.unordered,
+        )
+        print(json.dumps(stats), file=sys.stderr)
+        return 1 if stats["errors"] else 0
+
+    if not args.artifact_path:
+        raise SystemExit("--artifact-path is required.")
     if args.input_path:
         payload = _load_input(args.input_path)
         history = payload.get("history", "")
@@ -86,13 +526,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     if not question:
         raise SystemExit("Question is required (use --question or --input-path).")
 
-    config = PersonaGEPAConfig(
-        persona_model=args.persona_model,
-        persona_temperature=args.persona_temperature,
-        persona_max_tokens=args.persona_max_tokens,
-        api_base=args.api_base,
-        cache_dir=args.cache_dir,
-    )
+    config = config_from_args(args)
 
     answer = run_inference(config, args.artifact_path, history, question, persona_profile)
     print(answer)
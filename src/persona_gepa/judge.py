@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import re
 from dataclasses import dataclass
-from typing import ClassVar, Dict
+from typing import ClassVar, Dict, List, Optional, Sequence
 
 import dspy
 
@@ -16,6 +16,16 @@ JUDGE_INSTRUCTIONS = (
     "actionable string."
 )
 
+BATCH_JUDGE_INSTRUCTIONS = (
+    "You are a strict evaluator of interview answers. You receive a JSON array "
+    "of items, each with an id, transcript history, question, reference answer "
+    "and candidate answer. Score every candidate answer versus its own reference "
+    "answer and history, independently of the other items. Return ONLY a JSON "
+    "array with one object per item, in the same order, with keys: id, accuracy, "
+    "faithfulness, tone, style, feedback. Each score must be a float in [0,1]. "
+    "Feedback must be a short, actionable string."
+)
+
 
 @dataclass
 class Judgment:
@@ -24,6 +34,9 @@ class Judgment:
     tone: float
     style: float
     feedback: str
+    # False for the placeholder returned when no judgment could be parsed;
+    # such results are never written to the judgment cache.
+    parsed: bool = True
 
     def as_dict(self) -> Dict[str, object]:
         return {
@@ -71,6 +84,62 @@ class JudgeProgram(dspy.Module):
             candidate_answer=candidate_answer,
         )
 
+    async def aforward(
+        self,
+        history: str,
+        question: str,
+        reference_answer: str,
+        candidate_answer: str,
+    ):
+        return await self.predict.acall(
+            history=history,
+            question=question,
+            reference_answer=reference_answer,
+            candidate_answer=candidate_answer,
+        )
+
+
+class BatchJudgeSignature(dspy.Signature):
+    """You are a strict evaluator of interview answers. You receive a JSON array of items, each with an id, transcript history, question, reference answer and candidate answer. Score every candidate answer versus its own reference answer and history, independently of the other items. Return ONLY a JSON array with one object per item, in the same order, with keys: id, accuracy, faithfulness, tone, style, feedback. Each score must be a float in [0,1]. Feedback must be a short, actionable string."""
+
+    instructions: ClassVar[str] = BATCH_JUDGE_INSTRUCTIONS
+
+    items = dspy.InputField(
+        desc="JSON array of {id, history, question, reference_answer, candidate_answer}."
+    )
+
+    judgments = dspy.OutputField(desc="Strict JSON array of per-item scores and feedback.")
+
+
+class BatchJudgeProgram(dspy.Module):
+    def __init__(self, lm=None):
+        super().__init__()
+        self.predict = dspy.Predict(BatchJudgeSignature)
+        if lm is not None:
+            self.predict.lm = lm
+            if hasattr(self.predict, "_lm"):
+                self.predict._lm = lm
+
+    def forward(self, items: str):
+        return self.predict(items=items)
+
+
+def format_batch_items(items: Sequence[Dict[str, str]]) -> str:
+    """Serialize judge inputs for ``BatchJudgeSignature`` with positional ids."""
+    return json.dumps(
+        [
+            {
+                "id": idx,
+                "history": item.get("history", ""),
+                "question": item.get("question", ""),
+                "reference_answer": item.get("reference_answer", ""),
+                "candidate_answer": item.get("candidate_answer", ""),
+            }
+            for idx, item in enumerate(items)
+        ],
+        ensure_ascii=False,
+    )
+
 
 def _clamp(value: float) -> float:
     return max(0.0, min(1.0, value))
@@ -110,7 +179,7 @@ def parse_judge_output(raw_output: object) -> Judgment:
 
     text = str(raw_output or "").strip()
     if not text:
-        return Judgment(0.0, 0.0, 0.0, 0.0, "No judgment returned.")
+        return Judgment(0.0, 0.0, 0.0, 0.0, "No judgment returned.", parsed=False)
 
     try:
         payload = json.loads(text)
@@ -140,4 +209,57 @@ def parse_judge_output(raw_output: object) -> Judgment:
     if payload:
         return _normalize_judgment(payload)
 
-    return Judgment(0.0, 0.0, 0.0, 0.0, "Failed to parse judge output.")
+    return Judgment(0.0, 0.0, 0.0, 0.0, "Failed to parse judge output.", parsed=False)
+
+
+def _extract_json_array(text: str) -> str | None:
+    if not text:
+        return None
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    return match.group(0) if match else None
+
+
+def _is_scored(payload: object) -> bool:
+    return isinstance(payload, dict) and any(
+        key in payload for key in ("accuracy", "faithfulness", "tone", "style")
+    )
+
+
+def parse_batch_judge_output(raw_output: object, count: int) -> List[Optional[Judgment]]:
+    """Split a batched judge response into ``count`` per-item judgments.
+
+    Entries are matched by ``id`` when present and by position otherwise.
+    Items that are missing or carry no scores come back as ``None`` so the
+    caller can re-judge them one at a time.
+    """
+    payload = raw_output
+    if not isinstance(payload, list):
+        text = str(raw_output or "").strip()
+        payload = None
+        for candidate in (text, _extract_json_array(text)):
+            if not candidate:
+                continue
+            try:
+                payload = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(payload, dict):
+                payload = payload.get("judgments")
+            if isinstance(payload, list):
+                break
+            payload = None
+    if not isinstance(payload, list):
+        return [None] * count
+
+    results: List[Optional[Judgment]] = [None] * count
+    for position, entry in enumerate(payload):
+        if not _is_scored(entry):
+            continue
+        index = entry.get("id", position)
+        try:
+            index = int(index)
+        except (TypeError, ValueError):
+            index = position
+        if 0 <= index < count and results[index] is None:
+            results[index] = parse_judge_output(entry)
+    return results
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from persona_gepa.judge import Judgment
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS judgments (
+    key TEXT PRIMARY KEY,
+    accuracy REAL NOT NULL,
+    faithfulness REAL NOT NULL,
+    tone REAL NOT NULL,
+    style REAL NOT NULL,
+    feedback TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS judgments_last_used ON judgments (last_used);
+"""
+
+
+def _judge_instructions(judge_module) -> str:
+    signature = getattr(getattr(judge_module, "predict", None), "signature", None)
+    return str(getattr(signature, "instructions", "") or "")
+
+
+class JudgmentCache:
+    """Persistent, content-addressed cache of parsed judge results.
+
+    Entries are keyed by a hash of the judge instructions, judge model and
+    temperature, and the (history, question, reference, candidate) inputs.
+    Parsed ``Judgment`` fields are stored in SQLite; once the table exceeds
+    ``max_entries`` the least recently used tenth is evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200_000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._size = self._count()
+
+    def key(
+        self,
+        judge_module,
+        judge_lm,
+        history: str,
+        question: str,
+        reference_answer: str,
+        candidate_answer: str,
+    ) -> str:
+        payload = [
+            _judge_instructions(judge_module),
+            getattr(judge_lm, "model", None),
+            (getattr(judge_lm, "kwargs", None) or {}).get("temperature"),
+            history,
+            question,
+            reference_answer,
+            candidate_answer,
+        ]
+        return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Judgment]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT accuracy, faithfulness, tone, style, feedback "
+                "FROM judgments WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE judgments SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return Judgment(*row)
+
+    def put(self, key: str, judgment: Judgment) -> None:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO judgments "
+                "(key, accuracy, faithfulness, tone, style, feedback, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    judgment.accuracy,
+                    judgment.faithfulness,
+                    judgment.tone,
+                    judgment.style,
+                    judgment.feedback,
+                    time.time(),
+                ),
+            )
+            self._size += max(cursor.rowcount, 0)
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM judgments").fetchone()[0]
+
+    def _evict(self) -> None:
+        # Replaced rows also count as inserts, so recount before evicting.
+        self._size = self._count()
+        if self._size <= self.max_entries:
+            return
+        excess = self._size - self.max_entries + max(1, self.max_entries // 10)
+        self._conn.execute(
+            "DELETE FROM judgments WHERE key IN "
+            "(SELECT key FROM judgments ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self._size = self._count()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": self._size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,702 @@
+"""Rate-limited, adaptively throttled DSPy LMs.
+
+``ManagedLM`` is a ``dspy.LM`` whose calls pass through per-model request
+and token budgets and an AIMD concurrency limit before reaching the
+provider. A ``CallPolicy`` adds per-call deadlines, jittered retries and
+hedged requests on top. Copies made by DSPy (e.g. when GEPA copies a
+program) share the same budget and latency history, so every predictor
+using a model draws from one quota. ``CallController`` holds that shared
+admission and retry logic for callers that send requests without DSPy.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import copy
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import dspy
+
+from persona_gepa.history import approx_token_count
+from persona_gepa.ratelimit import RateLimiter
+
+
+_ASYNC_POLL_SECONDS = 0.005
+_LATENCY_WINDOW = 256
+
+
+@dataclass(frozen=True)
+class LMBudget:
+    """Per-model limits enforced by ``ManagedLM``.
+
+    ``requests_per_minute`` and ``tokens_per_minute`` are token buckets; a
+    request is charged its estimated prompt tokens plus ``max_tokens``,
+    which is how most gateways admit requests. ``max_concurrency`` enables
+    AIMD concurrency control between ``min_concurrency`` and that ceiling.
+    """
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    min_concurrency: int = 1
+
+    def is_unlimited(self) -> bool:
+        return (
+            self.requests_per_minute is None
+            and self.tokens_per_minute is None
+            and self.max_concurrency is None
+        )
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """Tail-latency controls applied to every ``ManagedLM`` call.
+
+    ``deadline_seconds`` bounds a call including retries and hedges; when it
+    passes, the caller gets a ``TimeoutError`` (a sync attempt already on the
+    wire finishes in the background; one still waiting for admission is
+    dropped without being sent). Retryable failures (429s, timeouts,
+    5xx and transport errors) are retried up to ``max_retries`` times with
+    full-jitter exponential backoff. With ``hedge`` enabled, an attempt that
+    has not finished after the ``hedge_quantile`` latency of recent calls
+    (once ``hedge_min_samples`` are known, never sooner than
+    ``hedge_min_delay``) gets a duplicate request, and whichever finishes
+    first wins. ``single_flight`` makes concurrent identical requests (same
+    rendered prompt, model and parameters) share one underlying call; it is
+    skipped for calls with DSPy's cache disabled, which ask for fresh samples.
+    """
+
+    deadline_seconds: Optional[float] = None
+    max_retries: int = 0
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    hedge_min_delay: float = 0.05
+    single_flight: bool = False
+
+    def is_default(self) -> bool:
+        return not self.controls_latency() and not self.single_flight
+
+    def controls_latency(self) -> bool:
+        return self.deadline_seconds is not None or self.max_retries > 0 or self.hedge
+
+    def needs_executor(self) -> bool:
+        return self.deadline_seconds is not None or self.hedge
+
+    def backoff(self, attempt: int) -> float:
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * (2**attempt))
+        return random.uniform(0.0, ceiling)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease cap on in-flight calls.
+
+    Each success raises the limit by ``1 / limit`` (about +1 per full window
+    of successes); a throttled call halves it, at most once per
+    ``decrease_cooldown`` seconds so a burst of 429s from one window only
+    counts once. The limit starts at half of ``max_limit``.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        decrease_cooldown: float = 1.0,
+        clock=time.monotonic,
+    ):
+        if max_limit < 1:
+            raise ValueError("max_limit must be >= 1.")
+        self.max_limit = float(max_limit)
+        self.min_limit = float(max(1, min(min_limit, max_limit)))
+        self.limit = max(self.min_limit, self.max_limit / 2)
+        self.in_flight = 0
+        self.decrease_cooldown = decrease_cooldown
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        while not self.try_acquire():
+            await asyncio.sleep(_ASYNC_POLL_SECONDS)
+
+    def release(self, throttled: bool = False, succeeded: bool = True) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                now = self._clock()
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self._last_decrease = now
+            elif succeeded:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """True for rate-limit (429) and timeout failures from any LM backend."""
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    if status == 429:
+        return True
+    if isinstance(exc, TimeoutError):
+        return True
+    name = type(exc).__name__
+    return "RateLimit" in name or "Timeout" in name
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Throttles plus server-side and transport failures."""
+    if is_throttle_error(exc):
+        return True
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    if isinstance(exc, ConnectionError):
+        return True
+    name = type(exc).__name__
+    return any(marker in name for marker in ("Server", "Transport", "Connection"))
+
+
+def estimate_request_tokens(prompt, messages, max_tokens) -> int:
+    """Approximate prompt tokens plus the completion allowance."""
+    if messages is not None:
+        text = json.dumps(messages, ensure_ascii=False, default=str)
+    else:
+        text = str(prompt or "")
+    return approx_token_count(text) + int(max_tokens or 0)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight wait for and share its outcome. Nothing is kept afterwards,
+    so this complements (rather than replaces) a response cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._tasks: Dict[tuple, asyncio.Future] = {}
+        self.coalesced = 0
+
+    def run(self, key: str, func: Callable):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.copy(flight.result)
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def arun(self, key: str, factory: Callable):
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[loop_key] = asyncio.ensure_future(factory())
+                task.add_done_callback(lambda _: self._forget(loop_key))
+            else:
+                self.coalesced += 1
+        # Shielded so a cancelled caller does not cancel the shared call.
+        result = await asyncio.shield(task)
+        return result if leader else copy.copy(result)
+
+    def _forget(self, loop_key: tuple) -> None:
+        with self._lock:
+            self._tasks.pop(loop_key, None)
+
+
+class _Admission:
+    """Hand-off between a queued attempt and a caller waiting on its deadline.
+
+    Exactly one of ``admit`` (by the attempt, once it holds its budget and
+    slot) and ``cancel`` (by the caller, when the deadline passes) wins.
+    """
+
+    def __init__(self, on_admit: Callable[[], None]):
+        self._on_admit = on_admit
+        self._lock = threading.Lock()
+        self._admitted = False
+        self._cancelled = False
+
+    def admit(self) -> bool:
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._admitted = True
+        self._on_admit()
+        return True
+
+    def cancel(self) -> bool:
+        with self._lock:
+            if self._admitted:
+                return False
+            self._cancelled = True
+            return True
+
+
+class CallController:
+    """Admission, retries and counters for every call to one model.
+
+    ``call``/``acall`` wait for the ``budget`` (rate buckets, then an AIMD
+    concurrency slot), run ``send`` and record its outcome;
+    ``with_retries``/``awith_retries`` repeat a call on retryable failures
+    with ``policy``'s backoff. A ``ManagedLM`` and its copies share one
+    controller; ``FastPersonaClient`` uses one for requests that bypass DSPy.
+    """
+
+    def __init__(self, budget: LMBudget, policy: CallPolicy):
+        self.budget = budget
+        self.policy = policy
+        self.requests = (
+            RateLimiter(budget.requests_per_minute) if budget.requests_per_minute else None
+        )
+        self.tokens = (
+            RateLimiter(budget.tokens_per_minute, burst=budget.tokens_per_minute / 6)
+            if budget.tokens_per_minute
+            else None
+        )
+        self.concurrency = (
+            AdaptiveConcurrencyLimiter(budget.max_concurrency, budget.min_concurrency)
+            if budget.max_concurrency
+            else None
+        )
+        self.lock = threading.Lock()
+        self.flights = SingleFlight()
+        self.latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.counters: Dict[str, float] = {
+            "calls": 0.0,
+            "errors": 0.0,
+            "throttled": 0.0,
+            "rate_wait_seconds": 0.0,
+            "retries": 0.0,
+            "deadline_exceeded": 0.0,
+            "hedges_fired": 0.0,
+            "hedges_won": 0.0,
+        }
+
+    def executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self._executor is None:
+                workers = max(32, 2 * (self.budget.max_concurrency or 0))
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="managed-lm"
+                )
+            return self._executor
+
+    def record_latency(self, seconds: float) -> None:
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which an unfinished attempt is hedged, if known."""
+        policy = self.policy
+        if not policy.hedge:
+            return None
+        with self.lock:
+            if len(self.latencies) < max(policy.hedge_min_samples, 1):
+                return None
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(policy.hedge_quantile * len(ordered)))
+        return max(policy.hedge_min_delay, ordered[index])
+
+    def count(self, key: str, amount: float = 1.0) -> None:
+        with self.lock:
+            self.counters[key] += amount
+
+    def admission_delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(tokens))
+        if delay:
+            self.count("rate_wait_seconds", delay)
+        return delay
+
+    def finish(self, exc: BaseException | None, started: float) -> None:
+        """Record one attempt's outcome and release its concurrency slot."""
+        self.count("calls")
+        throttled = exc is not None and is_throttle_error(exc)
+        if exc is None:
+            self.record_latency(time.monotonic() - started)
+        else:
+            self.count("errors")
+        if throttled:
+            self.count("throttled")
+        if self.concurrency is not None:
+            self.concurrency.release(throttled=throttled, succeeded=exc is None)
+
+    def _admit(self, admission: Optional[_Admission]) -> None:
+        if admission is not None and not admission.admit():
+            if self.concurrency is not None:
+                self.concurrency.release(succeeded=False)
+            raise TimeoutError("Call dropped: its deadline passed before admission.")
+
+    def call(self, send: Callable[[], object], tokens: int, admission=None):
+        """Admit one attempt charged ``tokens``, then return ``send()``."""
+        delay = self.admission_delay(tokens)
+        if delay:
+            time.sleep(delay)
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        self._admit(admission)
+        started = time.monotonic()
+        try:
+            result = send()
+        except BaseException as exc:
+            self.finish(exc, started)
+            raise
+        self.finish(None, started)
+        return result
+
+    async def acall(self, send: Callable[[], Awaitable], tokens: int, admission=None):
+        """Async ``call``; ``send()`` returns the awaitable to run once admitted."""
+        delay = self.admission_delay(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.concurrency is not None:
+            await self.concurrency.acquire_async()
+        self._admit(admission)
+        started = time.monotonic()
+        try:
+            result = await send()
+        except BaseException as exc:
+            self.finish(exc, started)
+            raise
+        self.finish(None, started)
+        return result
+
+    def retry_delay(
+        self, exc: BaseException, retry: int, deadline: Optional[float] = None
+    ) -> Optional[float]:
+        """Return the backoff before retry number ``retry + 1``, or None to give up."""
+        if retry >= self.policy.max_retries or not is_retryable_error(exc):
+            return None
+        delay = self.policy.backoff(retry)
+        if deadline is not None and delay >= deadline - time.monotonic():
+            return None
+        self.count("retries")
+        return delay
+
+    def with_retries(self, call: Callable[[], object], deadline: Optional[float] = None):
+        """Return ``call()``, retrying retryable failures per the policy."""
+        retry = 0
+        while True:
+            try:
+                return call()
+            except Exception as exc:
+                delay = self.retry_delay(exc, retry, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                retry += 1
+
+    async def awith_retries(
+        self, call: Callable[[], Awaitable], deadline: Optional[float] = None
+    ):
+        """Async ``with_retries``; ``call()`` returns a fresh awaitable per attempt."""
+        retry = 0
+        while True:
+            try:
+                return await call()
+            except Exception as exc:
+                delay = self.retry_delay(exc, retry, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                retry += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self.counters)
+        if self.concurrency is not None:
+            stats["concurrency_limit"] = float(int(self.concurrency.limit))
+        return stats
+
+
+class ManagedLM(dspy.LM):
+    """``dspy.LM`` that enforces an ``LMBudget`` and ``CallPolicy`` on every call.
+
+    DSPy's own retries default to off (``num_retries=0``) so that every
+    attempt passes through the budget and throttle accounting and
+    ``policy.max_retries`` alone sets the number of retries.
+    """
+
+    def __init__(
+        self,
+        *args,
+        budget: LMBudget | None = None,
+        policy: CallPolicy | None = None,
+        **kwargs,
+    ):
+        kwargs.setdefault("num_retries", 0)
+        super().__init__(*args, **kwargs)
+        self.budget = budget or LMBudget()
+        self.policy = policy or CallPolicy()
+        self._shared = CallController(self.budget, self.policy)
+
+    def _estimate(self, prompt, messages, kwargs) -> int:
+        max_tokens = kwargs.get("max_tokens", self.kwargs.get("max_tokens"))
+        return estimate_request_tokens(prompt, messages, max_tokens)
+
+    def _call_once(self, prompt, messages, kwargs, admission=None):
+        send = super().__call__
+        return self._shared.call(
+            lambda: send(prompt, messages=messages, **kwargs),
+            self._estimate(prompt, messages, kwargs),
+            admission,
+        )
+
+    async def _acall_once(self, prompt, messages, kwargs, admission=None):
+        send = super().acall
+        return await self._shared.acall(
+            lambda: send(prompt, messages=messages, **kwargs),
+            self._estimate(prompt, messages, kwargs),
+            admission,
+        )
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _deadline_exceeded(self) -> TimeoutError:
+        self._shared.count("deadline_exceeded")
+        return TimeoutError(
+            f"{self.model} call exceeded {self.policy.deadline_seconds}s deadline."
+        )
+
+    def _hedged(self, attempt: Callable, deadline: Optional[float]):
+        """Run ``attempt`` and hedge it if it outlives the hedge delay.
+
+        ``attempt(admission)`` calls ``admission.admit()`` once it holds its
+        rate budget and concurrency slot; the hedge timer starts there, so
+        time spent waiting for admission never triggers a hedge. If the
+        deadline passes first, the admission is cancelled and the queued
+        attempt gives its slot back instead of calling the backend.
+        """
+        state = self._shared
+        executor = state.executor()
+
+        def _submit(admission=None):
+            return executor.submit(contextvars.copy_context().run, attempt, admission)
+
+        admitted = threading.Event()
+        admission = _Admission(admitted.set)
+        primary = _submit(admission)
+        primary.add_done_callback(lambda _future: admitted.set())
+        remaining = self._remaining(deadline)
+        if (
+            not admitted.wait(None if remaining is None else max(remaining, 0.0))
+            and admission.cancel()
+        ):
+            raise self._deadline_exceeded()
+        started = time.monotonic()
+        hedge_after = state.hedge_delay()
+        pending = {primary}
+        hedge = None
+        while True:
+            timeouts = []
+            remaining = self._remaining(deadline)
+            if remaining is not None:
+                timeouts.append(max(remaining, 0.0))
+            if hedge is None and hedge_after is not None:
+                timeouts.append(max(hedge_after - (time.monotonic() - started), 0.0))
+            done, pending = wait(
+                pending, timeout=min(timeouts) if timeouts else None, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None or not pending:
+                    if future is hedge and future.exception() is None:
+                        state.count("hedges_won")
+                    return future.result()
+            if done:
+                continue
+            if remaining is not None and self._remaining(deadline) <= 0:
+                raise self._deadline_exceeded()
+            if hedge is None and hedge_after is not None:
+                hedge = _submit()
+                pending.add(hedge)
+                state.count("hedges_fired")
+
+    async def _ahedged(self, attempt: Callable, deadline: Optional[float]):
+        state = self._shared
+        admitted = asyncio.Event()
+        admission = _Admission(admitted.set)
+        primary = asyncio.ensure_future(attempt(admission))
+        primary.add_done_callback(lambda _task: admitted.set())
+        pending = {primary}
+        hedge = None
+        try:
+            remaining = self._remaining(deadline)
+            try:
+                await asyncio.wait_for(
+                    admitted.wait(), None if remaining is None else max(remaining, 0.0)
+                )
+            except asyncio.TimeoutError:
+                if admission.cancel():
+                    raise self._deadline_exceeded() from None
+            started = time.monotonic()
+            hedge_after = state.hedge_delay()
+            while True:
+                timeouts = []
+                remaining = self._remaining(deadline)
+                if remaining is not None:
+                    timeouts.append(max(remaining, 0.0))
+                if hedge is None and hedge_after is not None:
+                    timeouts.append(max(hedge_after - (time.monotonic() - started), 0.0))
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=min(timeouts) if timeouts else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None or not pending:
+                        if task is hedge and task.exception() is None:
+                            state.count("hedges_won")
+                        return task.result()
+                if done:
+                    continue
+                if remaining is not None and self._remaining(deadline) <= 0:
+                    raise self._deadline_exceeded()
+                if hedge is None and hedge_after is not None:
+                    hedge = asyncio.ensure_future(attempt(None))
+                    pending.add(hedge)
+                    state.count("hedges_fired")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _flight_key(self, prompt, messages, kwargs) -> Optional[str]:
+        if not self.policy.single_flight or not kwargs.get("cache", self.cache):
+            return None
+        payload = [self.model, self.model_type, prompt, messages, {**self.kwargs, **kwargs}]
+        encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def __call__(self, prompt=None, *, messages=None, **kwargs):
+        key = self._flight_key(prompt, messages, kwargs)
+        if key is None:
+            return self._call_with_policy(prompt, messages, kwargs)
+        return self._shared.flights.run(
+            key, lambda: self._call_with_policy(prompt, messages, kwargs)
+        )
+
+    async def acall(self, prompt=None, *, messages=None, **kwargs):
+        key = self._flight_key(prompt, messages, kwargs)
+        if key is None:
+            return await self._acall_with_policy(prompt, messages, kwargs)
+        return await self._shared.flights.arun(
+            key, lambda: self._acall_with_policy(prompt, messages, kwargs)
+        )
+
+    def _call_with_policy(self, prompt, messages, kwargs):
+        policy = self.policy
+        if not policy.controls_latency():
+            return self._call_once(prompt, messages, kwargs)
+
+        deadline = (
+            time.monotonic() + policy.deadline_seconds
+            if policy.deadline_seconds is not None
+            else None
+        )
+        if policy.needs_executor():
+            return self._shared.with_retries(
+                lambda: self._hedged(
+                    lambda admission: self._call_once(prompt, messages, kwargs, admission),
+                    deadline,
+                ),
+                deadline,
+            )
+        return self._shared.with_retries(
+            lambda: self._call_once(prompt, messages, kwargs), deadline
+        )
+
+    async def _acall_with_policy(self, prompt, messages, kwargs):
+        policy = self.policy
+        if not policy.controls_latency():
+            return await self._acall_once(prompt, messages, kwargs)
+
+        deadline = (
+            time.monotonic() + policy.deadline_seconds
+            if policy.deadline_seconds is not None
+            else None
+        )
+        return await self._shared.awith_retries(
+            lambda: self._ahedged(
+                lambda admission: self._acall_once(prompt, messages, kwargs, admission),
+                deadline,
+            ),
+            deadline,
+        )
+
+    def __deepcopy__(self, memo):
+        # Program copies must keep drawing from the same budget.
+        return self.copy()
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("_shared", None)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._shared = CallController(self.budget, self.policy)
+
+    def stats(self) -> Dict[str, float]:
+        state = self._shared
+        stats = state.stats()
+        stats["coalesced"] = float(state.flights.coalesced)
+        hedge_after = state.hedge_delay()
+        if hedge_after is not None:
+            stats["hedge_after_seconds"] = hedge_after
+        return stats
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
 
 import dspy
 
-from persona_gepa.judge import Judgment, parse_judge_output
+from persona_gepa.judge import (
+    Judgment,
+    format_batch_items,
+    parse_batch_judge_output,
+    parse_judge_output,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def weighted_score(judgment: Judgment, weights: Dict[str, float]) -> float:
@@ -21,36 +31,257 @@ def weighted_score(judgment: Judgment, weights: Dict[str, float]) -> float:
     return total
 
 
-def build_metric(judge_module, weights: Dict[str, float], judge_lm=None):
+def _cached_judgment(judgment_cache, judge_module, judge_lm, inputs: Dict[str, str]):
+    if judgment_cache is None:
+        return None, None
+    key = judgment_cache.key(
+        judge_module,
+        judge_lm,
+        inputs["history"],
+        inputs["question"],
+        inputs["reference_answer"],
+        inputs["candidate_answer"],
+    )
+    return key, judgment_cache.get(key)
+
+
+def judge_answer(
+    judge_module,
+    history: str,
+    question: str,
+    reference_answer: str,
+    candidate_answer: str,
+    judge_lm=None,
+    judgment_cache=None,
+) -> Judgment:
+    """Run the judge on one candidate answer, consulting ``judgment_cache``."""
+    inputs = {
+        "history": history,
+        "question": question,
+        "reference_answer": reference_answer,
+        "candidate_answer": candidate_answer,
+    }
+    key, cached = _cached_judgment(judgment_cache, judge_module, judge_lm, inputs)
+    if cached is not None:
+        return cached
+
+    context = getattr(dspy, "context", None)
+    if callable(context) and judge_lm is not None:
+        with context(lm=judge_lm):
+            judge_pred = judge_module(**inputs)
+    else:
+        judge_pred = judge_module(**inputs)
+    raw_judgment = getattr(judge_pred, "judgment", judge_pred)
+    judgment = parse_judge_output(raw_judgment)
+    if key is not None and judgment.parsed:
+        judgment_cache.put(key, judgment)
+    return judgment
+
+
+async def ajudge_answer(
+    judge_module,
+    history: str,
+    question: str,
+    reference_answer: str,
+    candidate_answer: str,
+    judge_lm=None,
+    judgment_cache=None,
+) -> Judgment:
+    """Async ``judge_answer``; judges without ``acall`` run in a worker thread."""
+    inputs = {
+        "history": history,
+        "question": question,
+        "reference_answer": reference_answer,
+        "candidate_answer": candidate_answer,
+    }
+    key, cached = _cached_judgment(judgment_cache, judge_module, judge_lm, inputs)
+    if cached is not None:
+        return cached
+
+    acall = getattr(judge_module, "acall", None)
+    if not callable(acall):
+        judgment = await asyncio.to_thread(
+            judge_answer, judge_module, judge_lm=judge_lm, **inputs
+        )
+    else:
+        context = getattr(dspy, "context", None)
+        if callable(context) and judge_lm is not None:
+            with context(lm=judge_lm):
+                judge_pred = await acall(**inputs)
+        else:
+            judge_pred = await acall(**inputs)
+        judgment = parse_judge_output(getattr(judge_pred, "judgment", judge_pred))
+    if key is not None and judgment.parsed:
+        judgment_cache.put(key, judgment)
+    return judgment
+
+
+class _PendingJudgment:
+    __slots__ = ("item", "done", "judgment")
+
+    def __init__(self, item: Dict[str, str]):
+        self.item = item
+        self.done = threading.Event()
+        self.judgment: Optional[Judgment] = None
+
+
+class JudgeBatcher:
+    """Coalesce concurrent judge calls into batched judge requests.
+
+    Callers block in ``judge`` while their item waits in a shared buffer. The
+    buffer is sent to ``batch_judge`` as one request once it holds
+    ``batch_size`` items or the oldest waiter has waited ``max_wait_ms``;
+    whichever caller triggers the flush runs it. Items the batched response
+    does not score (or every item, if the batched call fails) are handed back
+    unscored, and each waiting caller re-judges its own item with
+    ``judge_module`` in its own thread. Judgments are cached under the key of
+    the program that produced them (``batch_judge`` or ``judge_module``), since
+    the two prompts may score differently; lookups try the batched key and
+    then the single-item key, so a batched run reuses unbatched results.
+    Unparseable judgments are not cached.
+    """
+
+    def __init__(
+        self,
+        batch_judge,
+        judge_module,
+        batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        judge_lm=None,
+        judgment_cache=None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1.")
+        self.batch_judge = batch_judge
+        self.judge_module = judge_module
+        self.batch_size = batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.judge_lm = judge_lm
+        self.judgment_cache = judgment_cache
+        self.batches = 0
+        self.batched_items = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self._pending: List[_PendingJudgment] = []
+
+    def judge(
+        self,
+        history: str,
+        question: str,
+        reference_answer: str,
+        candidate_answer: str,
+    ) -> Judgment:
+        inputs = {
+            "history": history,
+            "question": question,
+            "reference_answer": reference_answer,
+            "candidate_answer": candidate_answer,
+        }
+        batch_key, cached = _cached_judgment(
+            self.judgment_cache, self.batch_judge, self.judge_lm, inputs
+        )
+        if cached is not None:
+            return cached
+        key, cached = _cached_judgment(
+            self.judgment_cache, self.judge_module, self.judge_lm, inputs
+        )
+        if cached is not None:
+            return cached
+
+        pending = _PendingJudgment(inputs)
+        batch = None
+        with self._lock:
+            self._pending.append(pending)
+            if len(self._pending) >= self.batch_size:
+                batch, self._pending = self._pending, []
+        if batch is None and not pending.done.wait(self.max_wait):
+            with self._lock:
+                if any(item is pending for item in self._pending):
+                    batch, self._pending = self._pending, []
+        if batch is not None:
+            self._run(batch)
+        pending.done.wait()
+
+        judgment = pending.judgment
+        if judgment is None:
+            judgment = judge_answer(self.judge_module, judge_lm=self.judge_lm, **inputs)
+        else:
+            key = batch_key
+        if key is not None and judgment.parsed:
+            self.judgment_cache.put(key, judgment)
+        return judgment
+
+    def _call_batch(self, items: str):
+        context = getattr(dspy, "context", None)
+        if callable(context) and self.judge_lm is not None:
+            with context(lm=self.judge_lm):
+                return self.batch_judge(items=items)
+        return self.batch_judge(items=items)
+
+    def _run(self, batch: List[_PendingJudgment]) -> None:
+        """Score ``batch`` in one call; unscored items are left for their callers."""
+        judgments: List[Optional[Judgment]] = [None] * len(batch)
+        try:
+            if len(batch) > 1:
+                try:
+                    pred = self._call_batch(format_batch_items([p.item for p in batch]))
+                    raw = getattr(pred, "judgments", pred)
+                    judgments = parse_batch_judge_output(raw, len(batch))
+                except Exception:
+                    logger.debug(
+                        "Batched judge call failed; judging %d items one at a time.",
+                        len(batch),
+                        exc_info=True,
+                    )
+            with self._lock:
+                self.batches += 1
+                self.batched_items += len(batch)
+                if len(batch) > 1:
+                    self.fallbacks += sum(judgment is None for judgment in judgments)
+        finally:
+            for pending, judgment in zip(batch, judgments):
+                pending.judgment = judgment
+                pending.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def build_metric(
+    judge_module,
+    weights: Dict[str, float],
+    judge_lm=None,
+    judgment_cache=None,
+    judge_batcher: Optional[JudgeBatcher] = None,
+):
     normalized = _normalize_weights(weights)
 
     def metric(gold, pred, trace=None, pred_name=None, pred_trace=None):
-        history = getattr(gold, "history", "")
-        question = getattr(gold, "question", "")
-        reference_answer = getattr(gold, "answer", "")
-
         candidate_answer = getattr(pred, "answer", None)
         if candidate_answer is None:
             candidate_answer = str(pred)
 
-        context = getattr(dspy, "context", None)
-        if callable(context) and judge_lm is not None:
-            with context(lm=judge_lm):
-                judge_pred = judge_module(
-                    history=history,
-                    question=question,
-                    reference_answer=reference_answer,
-                    candidate_answer=candidate_answer,
-                )
+        if judge_batcher is not None:
+            judgment = judge_batcher.judge(
+                history=getattr(gold, "history", ""),
+                question=getattr(gold, "question", ""),
+                reference_answer=getattr(gold, "answer", ""),
+                candidate_answer=candidate_answer,
+            )
         else:
-            judge_pred = judge_module(
-                history=history,
-                question=question,
-                reference_answer=reference_answer,
+            judgment = judge_answer(
+                judge_module,
+                history=getattr(gold, "history", ""),
+                question=getattr(gold, "question", ""),
+                reference_answer=getattr(gold, "answer", ""),
                 candidate_answer=candidate_answer,
+                judge_lm=judge_lm,
+                judgment_cache=judgment_cache,
             )
-        raw_judgment = getattr(judge_pred, "judgment", judge_pred)
-        judgment = parse_judge_output(raw_judgment)
         score = weighted_score(judgment, normalized)
         return dspy.Prediction(score=score, feedback=judgment.feedback)
 
@@ -1,33 +1,173 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
 import importlib
 import json
 import os
+from collections import deque
+from collections.abc import Sequence
 from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, Dict, Iterable, List, Tuple
+from dataclasses import asdict
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Tuple
 
 import dspy
 
+from persona_gepa.artifact_store import ArtifactStore
 from persona_gepa.artifacts import save_artifact
 from persona_gepa.cache import configure_dspy_cache
 from persona_gepa.config import PersonaGEPAConfig
-from persona_gepa.data import build_examples, build_train_val_examples, load_interviews
-from persona_gepa.judge import JudgeProgram, parse_judge_output
-from persona_gepa.metric import build_metric, weighted_score
+from persona_gepa.data import (
+    ExampleSequence,
+    build_examples,
+    build_train_val_examples,
+    load_interviews,
+    load_parquet_records,
+)
+from persona_gepa.dataset_cache import load_cached_records
+from persona_gepa.endpoints import parse_endpoints
+from persona_gepa.judge import BatchJudgeProgram, JudgeProgram
+from persona_gepa.judge_cache import JudgmentCache
+from persona_gepa.metric import (
+    JudgeBatcher,
+    ajudge_answer,
+    build_metric,
+    judge_answer,
+    weighted_score,
+)
+from persona_gepa.pipeline import Stage, run_pipeline
+from persona_gepa.profile import attach_profiles, build_profile_builder
 from persona_gepa.program import PersonaAnswerProgram
+from persona_gepa.sequential import SequentialEstimate, strata_keys, stratified_order
 from persona_gepa.utils import build_lm, configure_dspy_lm, filter_kwargs
 
 
-def _load_interviews_with_hook(path: str, loader_path: str | None):
+def _load_interviews_with_hook(
+    path: str,
+    loader_path: str | None,
+    dataset_cache_dir: str | None = None,
+    num_workers: int | None = None,
+):
     if not loader_path:
-        return load_interviews(path)
+        if path.endswith(".parquet"):
+            # Read column-wise with Arrow kernels; the dataset cache and
+            # --load-workers apply to JSON/JSONL inputs only.
+            return load_parquet_records(path)
+        if dataset_cache_dir:
+            return load_cached_records(path, dataset_cache_dir, num_workers=num_workers)
+        return load_interviews(path, num_workers=num_workers)
     module_name, func_name = loader_path.split(":", 1)
     module = importlib.import_module(module_name)
     loader: Callable[[str], List[List[dict]]] = getattr(module, func_name)
     return loader(path)
 
 
+def _bounded_map(executor, func: Callable, items: Iterable, window: int) -> Iterator:
+    """Like ``executor.map`` but keeps at most ``window`` items in flight.
+
+    Lazy example sequences stay lazy: examples are built only as workers
+    free up instead of all being submitted up front.
+    """
+    pending: Deque = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _example_inputs(example) -> Dict[str, str]:
+    return {
+        "history": getattr(example, "history", ""),
+        "question": getattr(example, "question", ""),
+        "persona_profile": getattr(example, "persona_profile", ""),
+    }
+
+
+def _judge_inputs(example, candidate_answer: str) -> Dict[str, str]:
+    return {
+        "history": getattr(example, "history", ""),
+        "question": getattr(example, "question", ""),
+        "reference_answer": getattr(example, "answer", ""),
+        "candidate_answer": candidate_answer,
+    }
+
+
+def _run_coroutine(coro):
+    """Run ``coro`` to completion, even when called from a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Notebooks (e.g. Databricks) already run a loop in this thread.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def _aevaluate_examples(
+    program,
+    valset: Iterable,
+    judge,
+    weights: Dict[str, float],
+    concurrency: int,
+    persona_lm=None,
+    judge_lm=None,
+    judgment_cache=None,
+    judge_batcher=None,
+    on_score: Callable[[float], None] | None = None,
+) -> List[Tuple[float, object]]:
+    """Score ``valset`` with async LM calls, at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    context = getattr(dspy, "context", None)
+    loop = asyncio.get_running_loop()
+    # The batcher blocks while its batch fills, so every in-flight example
+    # needs its own thread; the loop's default executor may be smaller.
+    judge_executor = (
+        ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="judge")
+        if judge_batcher is not None
+        else None
+    )
+
+    async def _score_example(example):
+        try:
+            inputs = _example_inputs(example)
+            if callable(context) and persona_lm is not None:
+                with context(lm=persona_lm):
+                    pred = await program.acall(**inputs)
+            else:
+                pred = await program.acall(**inputs)
+            judge_inputs = _judge_inputs(example, getattr(pred, "answer", str(pred)))
+            if judge_batcher is not None:
+                judgment = await loop.run_in_executor(
+                    judge_executor, functools.partial(judge_batcher.judge, **judge_inputs)
+                )
+            else:
+                judgment = await ajudge_answer(
+                    judge,
+                    judge_lm=judge_lm,
+                    judgment_cache=judgment_cache,
+                    **judge_inputs,
+                )
+            score = weighted_score(judgment, weights)
+            if on_score is not None:
+                on_score(score)
+            return score, judgment
+        finally:
+            semaphore.release()
+
+    tasks = []
+    try:
+        for example in valset:
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(_score_example(example)))
+        return list(await asyncio.gather(*tasks))
+    finally:
+        if judge_executor is not None:
+            judge_executor.shutdown(wait=False)
+
+
 def _evaluate_program(
     program: PersonaAnswerProgram,
     valset: Iterable,
@@ -36,61 +176,137 @@ def _evaluate_program(
     num_threads: int,
     persona_lm=None,
     judge_lm=None,
+    judgment_cache=None,
+    judge_batcher=None,
+    engine: str = "threads",
+    concurrency: int | None = None,
+    persona_workers: int | None = None,
+    judge_workers: int | None = None,
+    ci_half_width: float | None = None,
+    max_examples: int | None = None,
+    min_examples: int = 30,
+    confidence: float = 0.95,
+    seed: int = 0,
 ) -> Dict[str, float]:
-    valset = list(valset)
-    if not valset:
+    """Score ``program`` on ``valset`` with the judge and summarize the results.
+
+    ``engine="threads"`` runs each example's persona and judge calls in a
+    pool of ``num_threads`` workers. ``engine="async"`` uses async LM calls
+    with up to ``concurrency`` (default ``num_threads``) examples in flight.
+    ``engine="pipeline"`` runs persona and judge calls as separate stages
+    with their own worker counts, connected by bounded queues, and adds
+    per-stage stats to the report; rate limits come from the LMs' budgets.
+
+    With ``ci_half_width`` or ``max_examples`` set, examples are scored in a
+    persona-stratified random order (``seed``) and evaluation stops once the
+    ``confidence`` interval of the mean score is at most ``ci_half_width``
+    wide on each side (after ``min_examples``) or ``max_examples`` have been
+    fed; the report then includes the interval and the examples used.
+    """
+    if engine not in ("threads", "async", "pipeline"):
+        raise ValueError(f"Unknown evaluation engine: {engine!r}")
+    if not isinstance(valset, Sequence):
+        valset = list(valset)
+    if not len(valset):
         return {}
 
     normalized = weights
+    cache_start = judgment_cache.stats() if judgment_cache is not None else None
+    batch_start = judge_batcher.stats() if judge_batcher is not None else None
+    stage_stats: Dict[str, Dict[str, float]] = {}
     scores: List[float] = []
     aspect_totals = {"accuracy": 0.0, "faithfulness": 0.0, "tone": 0.0, "style": 0.0}
+    estimate = None
+    examples: Iterable = valset
+    if ci_half_width is not None or max_examples is not None:
+        estimate = SequentialEstimate(
+            len(valset),
+            half_width=ci_half_width,
+            max_examples=max_examples,
+            min_examples=min_examples,
+            confidence=confidence,
+        )
+        examples = estimate.feed(valset, stratified_order(strata_keys(valset), seed))
 
-    def _score_example(example):
+    def _predict(example):
         context = getattr(dspy, "context", None)
         if callable(context) and persona_lm is not None:
             with context(lm=persona_lm):
-                pred = program(
-                    history=getattr(example, "history", ""),
-                    question=getattr(example, "question", ""),
-                    persona_profile=getattr(example, "persona_profile", ""),
-                )
+                pred = program(**_example_inputs(example))
         else:
-            pred = program(
-                history=getattr(example, "history", ""),
-                question=getattr(example, "question", ""),
-                persona_profile=getattr(example, "persona_profile", ""),
-            )
-        candidate_answer = getattr(pred, "answer", str(pred))
-        if callable(context) and judge_lm is not None:
-            with context(lm=judge_lm):
-                judge_pred = judge(
-                    history=getattr(example, "history", ""),
-                    question=getattr(example, "question", ""),
-                    reference_answer=getattr(example, "answer", ""),
-                    candidate_answer=candidate_answer,
-                )
+            pred = program(**_example_inputs(example))
+        return example, getattr(pred, "answer", str(pred))
+
+    def _judge(item):
+        example, candidate_answer = item
+        judge_inputs = _judge_inputs(example, candidate_answer)
+        if judge_batcher is not None:
+            judgment = judge_batcher.judge(**judge_inputs)
         else:
-            judge_pred = judge(
-                history=getattr(example, "history", ""),
-                question=getattr(example, "question", ""),
-                reference_answer=getattr(example, "answer", ""),
-                candidate_answer=candidate_answer,
+            judgment = judge_answer(
+                judge,
+                judge_lm=judge_lm,
+                judgment_cache=judgment_cache,
+                **judge_inputs,
             )
-        raw_judgment = getattr(judge_pred, "judgment", judge_pred)
-        judgment = parse_judge_output(raw_judgment)
         score = weighted_score(judgment, normalized)
+        if estimate is not None:
+            estimate.add(score)
         return score, judgment
 
-    with ThreadPoolExecutor(max_workers=max(1, num_threads)) as executor:
-        for score, judgment in executor.map(_score_example, valset):
+    def _score_example(example):
+        return _judge(_predict(example))
+
+    def _accumulate(results) -> None:
+        for score, judgment in results:
             scores.append(score)
             aspect_totals["accuracy"] += judgment.accuracy
             aspect_totals["faithfulness"] += judgment.faithfulness
             aspect_totals["tone"] += judgment.tone
             aspect_totals["style"] += judgment.style
 
+    if engine == "async":
+        _accumulate(
+            _run_coroutine(
+                _aevaluate_examples(
+                    program,
+                    examples,
+                    judge,
+                    normalized,
+                    concurrency or num_threads,
+                    persona_lm=persona_lm,
+                    judge_lm=judge_lm,
+                    judgment_cache=judgment_cache,
+                    judge_batcher=judge_batcher,
+                    on_score=estimate.add if estimate is not None else None,
+                )
+            )
+        )
+    elif engine == "pipeline":
+        results, stage_stats = run_pipeline(
+            examples,
+            [
+                Stage(
+                    "persona",
+                    _predict,
+                    workers=persona_workers or num_threads,
+                ),
+                Stage(
+                    "judge",
+                    _judge,
+                    workers=judge_workers or num_threads,
+                ),
+            ],
+        )
+        _accumulate(results)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, num_threads)) as executor:
+            _accumulate(
+                _bounded_map(executor, _score_example, examples, max(1, num_threads) * 4)
+            )
+
     count = max(len(scores), 1)
-    return {
+    report = {
         "mean_score": sum(scores) / count,
         "mean_accuracy": aspect_totals["accuracy"] / count,
         "mean_faithfulness": aspect_totals["faithfulness"] / count,
@@ -98,6 +314,20 @@ def _evaluate_program(
         "mean_style": aspect_totals["style"] / count,
         "count": float(len(scores)),
     }
+    if estimate is not None:
+        report.update(estimate.report())
+    if cache_start is not None:
+        cache_end = judgment_cache.stats()
+        report["judge_cache_hits"] = float(cache_end["hits"] - cache_start["hits"])
+        report["judge_cache_misses"] = float(cache_end["misses"] - cache_start["misses"])
+    if batch_start is not None:
+        batch_end = judge_batcher.stats()
+        for key in ("batches", "batched_items", "fallbacks"):
+            report[f"judge_{key}"] = float(batch_end[key] - batch_start[key])
+    for stage_name, values in stage_stats.items():
+        for key, value in values.items():
+            report[f"{stage_name}_stage_{key}"] = float(value)
+    return report
 
 
 def run_optimization(
@@ -113,6 +343,10 @@ def run_optimization(
         config.persona_temperature,
         config.persona_max_tokens,
         api_base=config.api_base,
+        budget=config.lm_budget("persona"),
+        policy=config.lm_call_policy(),
+        pool=config.connection_pool(),
+        balancer=config.endpoint_balancer(),
     )
     configure_dspy_lm(persona_lm)
     judge_lm = build_lm(
@@ -120,18 +354,61 @@ def run_optimization(
         config.judge_temperature,
         config.judge_max_tokens,
         api_base=config.api_base,
+        budget=config.lm_budget("judge"),
+        policy=config.lm_call_policy(),
+        pool=config.connection_pool(),
+        balancer=config.endpoint_balancer(),
     )
     reflection_lm = build_lm(
         config.reflection_model,
         config.reflection_temperature,
         config.reflection_max_tokens,
         api_base=config.api_base,
+        budget=config.lm_budget("reflection"),
+        policy=config.lm_call_policy(),
+        pool=config.connection_pool(),
+        balancer=config.endpoint_balancer(),
     )
 
+    if config.profile_chunk_turns:
+        if not isinstance(trainset, ExampleSequence) or not isinstance(
+            valset, ExampleSequence
+        ):
+            raise ValueError(
+                "profile_chunk_turns requires examples from build_examples or "
+                "build_train_val_examples."
+            )
+        profile_builder = build_profile_builder(config)
+        trainset = attach_profiles(trainset, profile_builder, config.num_threads)
+        valset = attach_profiles(valset, profile_builder, config.num_threads)
+
     program = PersonaAnswerProgram(lm=persona_lm)
     judge = JudgeProgram(lm=judge_lm)
 
-    metric = build_metric(judge, config.normalized_weights(), judge_lm=judge_lm)
+    judgment_cache = None
+    if config.judgment_cache_path:
+        judgment_cache = JudgmentCache(
+            config.judgment_cache_path, max_entries=config.judgment_cache_max_entries
+        )
+
+    judge_batcher = None
+    if config.judge_batch_size and config.judge_batch_size > 1:
+        judge_batcher = JudgeBatcher(
+            BatchJudgeProgram(lm=judge_lm),
+            judge,
+            batch_size=config.judge_batch_size,
+            max_wait_ms=config.judge_batch_wait_ms,
+            judge_lm=judge_lm,
+            judgment_cache=judgment_cache,
+        )
+
+    metric = build_metric(
+        judge,
+        config.normalized_weights(),
+        judge_lm=judge_lm,
+        judgment_cache=judgment_cache,
+        judge_batcher=judge_batcher,
+    )
 
     gepa_kwargs = {
         "num_threads": config.num_threads,
@@ -159,6 +436,8 @@ def run_optimization(
         "reflection_model": config.reflection_model,
         "budget": config.budget,
         "max_metric_calls": config.max_metric_calls,
+        "history_policy": asdict(config.history_policy()),
+        "profile_chunk_turns": config.profile_chunk_turns,
     }
     save_artifact(optimized_program, artifact_path, metadata=metadata)
 
@@ -170,22 +449,85 @@ def run_optimization(
         config.num_threads,
         persona_lm=persona_lm,
         judge_lm=judge_lm,
+        judgment_cache=judgment_cache,
+        judge_batcher=judge_batcher,
+        engine=config.eval_engine,
+        concurrency=config.eval_concurrency,
+        persona_workers=config.persona_workers,
+        judge_workers=config.judge_workers,
+        ci_half_width=config.eval_ci_half_width,
+        max_examples=config.eval_max_examples,
+        min_examples=config.eval_min_examples,
+        confidence=config.eval_confidence,
+        seed=config.eval_seed,
     )
+    if judgment_cache is not None:
+        compile_stats = judgment_cache.stats()
+        if report:
+            report["judge_cache_total_hits"] = float(compile_stats["hits"])
+            report["judge_cache_total_misses"] = float(compile_stats["misses"])
+        judgment_cache.close()
     if report:
+        for role, lm in (
+            ("persona", persona_lm),
+            ("judge", judge_lm),
+            ("reflection", reflection_lm),
+        ):
+            lm_stats = getattr(lm, "stats", None)
+            if callable(lm_stats):
+                for key, value in lm_stats().items():
+                    report[f"{role}_lm_{key}"] = float(value)
+        pool = config.connection_pool()
+        if pool is not None:
+            for key, value in pool.totals().items():
+                report[f"http_pool_{key}"] = float(value)
+        balancer = config.endpoint_balancer()
+        if balancer is not None:
+            for index, endpoint_stats in enumerate(balancer.stats().values()):
+                for key, value in endpoint_stats.items():
+                    report[f"endpoint_{index}_{key}"] = value
         report_path = os.path.join(config.output_dir, "validation_report.json")
         with open(report_path, "w", encoding="utf-8") as handle:
             json.dump(report, handle, indent=2)
 
+    if config.artifact_store_dir:
+        store = ArtifactStore(config.artifact_store_dir)
+        try:
+            store.put(
+                optimized_program,
+                persona_id=config.artifact_persona_id,
+                model=config.persona_model,
+                score=report.get("mean_score") if report else None,
+                metadata=metadata,
+            )
+        finally:
+            store.close()
+
     return optimized_program, artifact_path, report
 
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run GEPA optimization for personas.")
     data_group = parser.add_mutually_exclusive_group(required=True)
-    data_group.add_argument("--data-path", help="JSON/JSONL path to split into train/val.")
-    data_group.add_argument("--train-path", help="JSON/JSONL path for training interviews.")
-    parser.add_argument("--val-path", help="JSON/JSONL path for validation interviews.")
+    data_group.add_argument(
+        "--data-path", help="JSON/JSONL path, directory or glob to split into train/val."
+    )
+    data_group.add_argument(
+        "--train-path", help="JSON/JSONL path, directory or glob for training interviews."
+    )
+    parser.add_argument(
+        "--val-path", help="JSON/JSONL path, directory or glob for validation interviews."
+    )
     parser.add_argument("--loader", help="Optional loader hook module:function.")
+    parser.add_argument(
+        "--dataset-cache-dir",
+        help="Optional directory for compiled, memory-mapped datasets (JSON/JSONL inputs).",
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        help="Processes for parsing sharded JSON/JSONL inputs (default: CPU count).",
+    )
 
     parser.add_argument("--val-ratio", type=float, default=0.2)
     parser.add_argument("--seed", type=int, default=7)
@@ -206,13 +548,173 @@ def _build_parser() -> argparse.ArgumentParser:
         "--api-base",
         help="Optional API base URL for OpenAI-compatible endpoints.",
     )
+    parser.add_argument(
+        "--http-max-connections",
+        type=int,
+        help="Share one keep-alive connection pool of this size per API base across all LMs.",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 for the shared connection pool (requires persona-gepa[http2]).",
+    )
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        nargs="+",
+        metavar="URL [WEIGHT]",
+        help="OpenAI-compatible API base to balance calls across (repeatable; overrides --api-base).",
+    )
+    parser.add_argument(
+        "--endpoint-routing",
+        choices=["least_outstanding", "latency"],
+        default="least_outstanding",
+    )
+    parser.add_argument(
+        "--endpoint-failure-threshold",
+        type=int,
+        default=3,
+        help="Consecutive retryable failures before an endpoint is ejected.",
+    )
+    parser.add_argument(
+        "--endpoint-cooldown-seconds",
+        type=float,
+        default=30.0,
+        help="How long an ejected endpoint is skipped before it is retried.",
+    )
+
+    parser.add_argument(
+        "--lm-deadline-seconds",
+        type=float,
+        help="Per-call deadline for every LM call, including retries and hedges.",
+    )
+    parser.add_argument(
+        "--lm-max-retries",
+        type=int,
+        default=0,
+        help="Retries with jittered backoff for 429/5xx/timeout failures.",
+    )
+    parser.add_argument(
+        "--lm-hedge",
+        action="store_true",
+        help="Send a duplicate request when a call exceeds the recent p95 latency.",
+    )
+    parser.add_argument("--lm-hedge-quantile", type=float, default=0.95)
+    parser.add_argument(
+        "--lm-single-flight",
+        action="store_true",
+        help="Share one LM call between concurrent identical requests.",
+    )
+
+    for role in ("persona", "judge", "reflection"):
+        parser.add_argument(
+            f"--{role}-rpm", type=float, help=f"Requests-per-minute budget for the {role} model."
+        )
+        parser.add_argument(
+            f"--{role}-tpm", type=float, help=f"Tokens-per-minute budget for the {role} model."
+        )
+        parser.add_argument(
+            f"--{role}-max-concurrency",
+            type=int,
+            help=f"Adaptive (AIMD) in-flight ceiling for the {role} model.",
+        )
+
+    parser.add_argument(
+        "--history-max-tokens",
+        type=int,
+        help="Approximate token budget for each example's history.",
+    )
+    parser.add_argument(
+        "--history-max-turns",
+        type=int,
+        help="Keep at most this many of the most recent history turns.",
+    )
+    parser.add_argument(
+        "--history-head-turns",
+        type=int,
+        default=0,
+        help="Always keep this many opening turns in the history.",
+    )
+    parser.add_argument(
+        "--history-retrieval-top-k",
+        type=int,
+        help="Keep only the K earlier turns most relevant to each question.",
+    )
+
+    parser.add_argument(
+        "--profile-chunk-turns",
+        type=int,
+        help="Summarize older turns into persona_profile every N turns.",
+    )
+    parser.add_argument("--profile-model", help="Model for profile summaries.")
+    parser.add_argument("--profile-cache-dir", default=".cache/profiles")
+
+    parser.add_argument(
+        "--judgment-cache-path",
+        help="Optional SQLite file caching parsed judgments across runs.",
+    )
+    parser.add_argument("--judgment-cache-max-entries", type=int, default=200_000)
+    parser.add_argument(
+        "--judge-batch-size",
+        type=int,
+        help="Score up to N candidate answers per judge call (default: 1).",
+    )
+    parser.add_argument(
+        "--judge-batch-wait-ms",
+        type=float,
+        default=20.0,
+        help="Max time a metric call waits for its judge batch to fill.",
+    )
 
     parser.add_argument("--budget", default="light", choices=["light", "medium", "heavy"])
     parser.add_argument("--max-metric-calls", type=int)
     parser.add_argument("--num-threads", type=int, default=8)
+    parser.add_argument(
+        "--eval-engine",
+        default="threads",
+        choices=["threads", "async", "pipeline"],
+        help="How the final validation pass runs LM calls.",
+    )
+    parser.add_argument(
+        "--eval-concurrency",
+        type=int,
+        help="In-flight examples for --eval-engine async (default: --num-threads).",
+    )
+    parser.add_argument(
+        "--persona-workers",
+        type=int,
+        help="Persona stage workers for --eval-engine pipeline (default: --num-threads).",
+    )
+    parser.add_argument(
+        "--judge-workers",
+        type=int,
+        help="Judge stage workers for --eval-engine pipeline (default: --num-threads).",
+    )
+    parser.add_argument(
+        "--eval-ci-half-width",
+        type=float,
+        help="Stop validation once the mean score's CI half-width is at most this.",
+    )
+    parser.add_argument(
+        "--eval-max-examples",
+        type=int,
+        help="Score at most this many validation examples (stratified random sample).",
+    )
+    parser.add_argument("--eval-min-examples", type=int, default=30)
+    parser.add_argument("--eval-confidence", type=float, default=0.95)
+    parser.add_argument("--eval-seed", type=int, default=0)
 
     parser.add_argument("--cache-dir", default=".cache/dspy")
     parser.add_argument("--output-dir", default="artifacts/persona_gepa")
+    parser.add_argument(
+        "--artifact-store",
+        help="Also index the artifact in this content-addressed store (see --persona-id).",
+    )
+    parser.add_argument(
+        "--persona-id",
+        default="all",
+        help="Persona the artifact is indexed under in --artifact-store.",
+    )
     parser.add_argument("--log-dir", default="logs/persona_gepa")
 
     parser.add_argument("--weight-accuracy", type=float, default=0.4)
@@ -227,19 +729,6 @@ def main(argv: List[str] | None = None) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
 
-    if args.train_path:
-        train_interviews = _load_interviews_with_hook(args.train_path, args.loader)
-        if not args.val_path:
-            raise SystemExit("--val-path is required when using --train-path")
-        val_interviews = _load_interviews_with_hook(args.val_path, args.loader)
-        trainset = build_examples(train_interviews)
-        valset = build_examples(val_interviews)
-    else:
-        interviews = _load_interviews_with_hook(args.data_path, args.loader)
-        trainset, valset = build_train_val_examples(
-            interviews, val_ratio=args.val_ratio, seed=args.seed
-        )
-
     config = PersonaGEPAConfig(
         persona_model=args.persona_model,
         judge_model=args.judge_model,
@@ -251,11 +740,53 @@ def main(argv: List[str] | None = None) -> int:
         judge_max_tokens=args.judge_max_tokens,
         reflection_max_tokens=args.reflection_max_tokens,
         api_base=args.api_base,
+        http_max_connections=args.http_max_connections,
+        http2=args.http2,
+        endpoints=parse_endpoints(args.endpoint),
+        endpoint_routing=args.endpoint_routing,
+        endpoint_failure_threshold=args.endpoint_failure_threshold,
+        endpoint_cooldown_seconds=args.endpoint_cooldown_seconds,
         budget=args.budget,
         max_metric_calls=args.max_metric_calls,
+        history_max_tokens=args.history_max_tokens,
+        history_max_turns=args.history_max_turns,
+        history_head_turns=args.history_head_turns,
+        history_retrieval_top_k=args.history_retrieval_top_k,
+        profile_chunk_turns=args.profile_chunk_turns,
+        profile_model=args.profile_model,
+        profile_cache_dir=args.profile_cache_dir,
+        judgment_cache_path=args.judgment_cache_path,
+        judgment_cache_max_entries=args.judgment_cache_max_entries,
+        judge_batch_size=args.judge_batch_size,
+        judge_batch_wait_ms=args.judge_batch_wait_ms,
         num_threads=args.num_threads,
+        eval_engine=args.eval_engine,
+        eval_concurrency=args.eval_concurrency,
+        persona_workers=args.persona_workers,
+        judge_workers=args.judge_workers,
+        eval_ci_half_width=args.eval_ci_half_width,
+        eval_max_examples=args.eval_max_examples,
+        eval_min_examples=args.eval_min_examples,
+        eval_confidence=args.eval_confidence,
+        eval_seed=args.eval_seed,
+        persona_rpm=args.persona_rpm,
+        judge_rpm=args.judge_rpm,
+        reflection_rpm=args.reflection_rpm,
+        persona_tpm=args.persona_tpm,
+        judge_tpm=args.judge_tpm,
+        reflection_tpm=args.reflection_tpm,
+        persona_max_concurrency=args.persona_max_concurrency,
+        judge_max_concurrency=args.judge_max_concurrency,
+        reflection_max_concurrency=args.reflection_max_concurrency,
+        lm_deadline_seconds=args.lm_deadline_seconds,
+        lm_max_retries=args.lm_max_retries,
+        lm_hedge=args.lm_hedge,
+        lm_hedge_quantile=args.lm_hedge_quantile,
+        lm_single_flight=args.lm_single_flight,
         cache_dir=args.cache_dir,
         output_dir=args.output_dir,
+        artifact_store_dir=args.artifact_store,
+        artifact_persona_id=args.persona_id,
         log_dir=args.log_dir,
         score_weights={
             "accuracy": args.weight_accuracy,
@@ -265,6 +796,29 @@ def main(argv: List[str] | None = None) -> int:
         },
     )
 
+    history_policy = config.history_policy()
+    if args.train_path:
+        train_interviews = _load_interviews_with_hook(
+            args.train_path, args.loader, args.dataset_cache_dir, args.load_workers
+        )
+        if not args.val_path:
+            raise SystemExit("--val-path is required when using --train-path")
+        val_interviews = _load_interviews_with_hook(
+            args.val_path, args.loader, args.dataset_cache_dir, args.load_workers
+        )
+        trainset = build_examples(train_interviews, history_policy=history_policy)
+        valset = build_examples(val_interviews, history_policy=history_policy)
+    else:
+        interviews = _load_interviews_with_hook(
+            args.data_path, args.loader, args.dataset_cache_dir, args.load_workers
+        )
+        trainset, valset = build_train_val_examples(
+            interviews,
+            val_ratio=args.val_ratio,
+            seed=args.seed,
+            history_policy=history_policy,
+        )
+
     _, artifact_path, report = run_optimization(config, trainset, valset)
     summary = {"artifact_path": artifact_path, "validation_report": report}
     print(json.dumps(summary, indent=2))
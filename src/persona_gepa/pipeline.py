@@ -0,0 +1,141 @@
+"""Bounded multi-stage worker pipelines.
+
+Each stage has its own worker threads and a bounded input queue, so a slow
+stage applies backpressure upstream instead of buffering the whole dataset,
+and a fast stage keeps working while the other waits on its backend.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One pipeline step: ``func`` maps an item to the next stage's item."""
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    queue_size: Optional[int] = None
+
+
+class _StageStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.max_depth = 0
+
+    def sample_depth(self, depth: int) -> None:
+        with self.lock:
+            self.depth_samples += 1
+            self.depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self, workers: int, elapsed: float) -> Dict[str, float]:
+        elapsed = max(elapsed, 1e-9)
+        return {
+            "processed": float(self.processed),
+            "throughput_per_s": self.processed / elapsed,
+            "utilization": self.busy_seconds / (elapsed * max(workers, 1)),
+            "queue_max_depth": float(self.max_depth),
+            "queue_mean_depth": self.depth_total / max(self.depth_samples, 1),
+        }
+
+
+def run_pipeline(
+    items: Iterable, stages: List[Stage]
+) -> Tuple[List[Any], Dict[str, Dict[str, float]]]:
+    """Push ``items`` through ``stages`` and return (outputs, per-stage stats).
+
+    Outputs are in completion order. Queue depth is sampled whenever an item
+    is enqueued. The first exception raised by any stage stops the feed and
+    is re-raised once the workers have drained.
+    """
+    if not stages:
+        raise ValueError("run_pipeline requires at least one stage.")
+
+    queues = [
+        queue.Queue(maxsize=stage.queue_size or max(stage.workers, 1) * 2)
+        for stage in stages
+    ]
+    stats = [_StageStats() for _ in stages]
+    outputs: List[Any] = []
+    outputs_lock = threading.Lock()
+    errors: List[BaseException] = []
+    failed = threading.Event()
+
+    def _put(index: int, item) -> None:
+        queues[index].put(item)
+        stats[index].sample_depth(queues[index].qsize())
+
+    def _worker(index: int) -> None:
+        stage = stages[index]
+        while True:
+            item = queues[index].get()
+            if item is _DONE:
+                return
+            if failed.is_set():
+                continue
+            try:
+                started = time.perf_counter()
+                result = stage.func(item)
+                busy = time.perf_counter() - started
+            except BaseException as exc:
+                with outputs_lock:
+                    errors.append(exc)
+                failed.set()
+                continue
+            with stats[index].lock:
+                stats[index].processed += 1
+                stats[index].busy_seconds += busy
+            if index + 1 < len(stages):
+                _put(index + 1, result)
+            else:
+                with outputs_lock:
+                    outputs.append(result)
+
+    threads = []
+    for index, stage in enumerate(stages):
+        group = [
+            threading.Thread(
+                target=_worker, args=(index,), name=f"{stage.name}-{n}", daemon=True
+            )
+            for n in range(max(stage.workers, 1))
+        ]
+        for thread in group:
+            thread.start()
+        threads.append(group)
+
+    started = time.perf_counter()
+    try:
+        for item in items:
+            if failed.is_set():
+                break
+            _put(0, item)
+    finally:
+        # Shut stages down in order so every queued item reaches the end.
+        for index, group in enumerate(threads):
+            for _ in group:
+                queues[index].put(_DONE)
+            for thread in group:
+                thread.join()
+    elapsed = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+    report = {
+        stage.name: stat.as_dict(stage.workers, elapsed)
+        for stage, stat in zip(stages, stats)
+    }
+    return outputs, report
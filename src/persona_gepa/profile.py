@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, ClassVar, Dict, List, Optional, Tuple
+
+import dspy
+
+from persona_gepa.config import PersonaGEPAConfig
+from persona_gepa.data import ExampleSequence
+from persona_gepa.history import split_history_turns
+from persona_gepa.utils import build_lm
+
+
+PROFILE_INSTRUCTIONS = (
+    "You maintain a compact profile of an interviewee. Update the previous "
+    "profile with any new facts, opinions, tone and speaking style revealed in "
+    "the new transcript turns. Keep it concise, factual and written in the "
+    "third person. Do not invent details that are not in the transcript."
+)
+
+
+class PersonaProfileSignature(dspy.Signature):
+    """You maintain a compact profile of an interviewee. Update the previous profile with any new facts, opinions, tone and speaking style revealed in the new transcript turns. Keep it concise, factual and written in the third person. Do not invent details that are not in the transcript."""
+
+    instructions: ClassVar[str] = PROFILE_INSTRUCTIONS
+
+    previous_profile = dspy.InputField(desc="Profile summarizing earlier turns.")
+    transcript = dspy.InputField(desc="New transcript turns in Q/A format.")
+
+    profile = dspy.OutputField(desc="Updated compact persona profile.")
+
+
+class ProfileSummarizerProgram(dspy.Module):
+    def __init__(self, lm=None):
+        super().__init__()
+        self.predict = dspy.Predict(PersonaProfileSignature)
+        if lm is not None:
+            self.predict.lm = lm
+            if hasattr(self.predict, "_lm"):
+                self.predict._lm = lm
+
+    def forward(self, previous_profile: str, transcript: str):
+        return self.predict(previous_profile=previous_profile, transcript=transcript)
+
+
+class ProfileCache:
+    """On-disk JSON cache of profiles, one file per key."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as handle:
+                return str(json.load(handle)["profile"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, profile: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"profile": profile}, handle)
+        os.replace(tmp_path, path)
+
+
+class ProfileBuilder:
+    """Incrementally summarize interview turns into persona profiles.
+
+    Turns are grouped into windows of ``chunk_turns``. The profile for window
+    ``w`` covers turns ``[0, w * chunk_turns)`` and is built from the profile
+    of window ``w - 1`` plus the turns in between, so each turn is summarized
+    once. Profiles are cached per (hash of the covered transcript, window).
+    """
+
+    def __init__(
+        self,
+        summarizer,
+        chunk_turns: int,
+        cache: ProfileCache | None = None,
+        lm=None,
+    ):
+        if chunk_turns < 1:
+            raise ValueError("chunk_turns must be >= 1.")
+        self.summarizer = summarizer
+        self.chunk_turns = chunk_turns
+        self.cache = cache
+        self.lm = lm
+        self._key_prefix = json.dumps(
+            [PROFILE_INSTRUCTIONS, getattr(lm, "model", None), chunk_turns]
+        )
+
+    def _summarize(self, previous_profile: str, transcript: str) -> str:
+        context = getattr(dspy, "context", None)
+        if callable(context) and self.lm is not None:
+            with context(lm=self.lm):
+                pred = self.summarizer(
+                    previous_profile=previous_profile, transcript=transcript
+                )
+        else:
+            pred = self.summarizer(previous_profile=previous_profile, transcript=transcript)
+        return str(getattr(pred, "profile", pred)).strip()
+
+    def profiles(self, segment: Callable[[int, int], str], num_windows: int) -> List[str]:
+        """Return profiles for windows ``0..num_windows`` (window 0 is empty)."""
+        profiles = [""]
+        covered = hashlib.sha256(self._key_prefix.encode("utf-8"))
+        for window in range(1, num_windows + 1):
+            text = segment((window - 1) * self.chunk_turns, window * self.chunk_turns)
+            covered.update(text.encode("utf-8"))
+            key = f"{covered.hexdigest()}-{window}"
+            profile = self.cache.get(key) if self.cache is not None else None
+            if profile is None:
+                profile = self._summarize(profiles[-1], text)
+                if self.cache is not None:
+                    self.cache.set(key, profile)
+            profiles.append(profile)
+        return profiles
+
+    def for_history(self, history: str) -> Tuple[str, str]:
+        """Split a formatted history into (profile of older turns, recent turns)."""
+        turns = split_history_turns(history)
+        windows = len(turns) // self.chunk_turns
+        profiles = self.profiles(lambda start, stop: "".join(turns[start:stop]), windows)
+        return profiles[windows], "".join(turns[windows * self.chunk_turns :])
+
+
+def attach_profiles(
+    examples: ExampleSequence,
+    builder: ProfileBuilder,
+    num_threads: int = 1,
+) -> ExampleSequence:
+    """Summarize older turns for every interview used by ``examples``."""
+    needed: Dict[int, int] = {}
+    for record_id, turn_index in examples.positions():
+        window = turn_index // builder.chunk_turns
+        needed[record_id] = max(needed.get(record_id, 0), window)
+
+    def _build(item):
+        record_id, windows = item
+        record = examples.records[record_id]
+        return record_id, builder.profiles(record.segment, windows)
+
+    with ThreadPoolExecutor(max_workers=max(1, num_threads)) as executor:
+        profiles = dict(executor.map(_build, sorted(needed.items())))
+    return examples.with_profiles(profiles, builder.chunk_turns)
+
+
+def build_profile_builder(config: PersonaGEPAConfig) -> ProfileBuilder:
+    """Build the profile stage configured by ``config.profile_*``."""
+    lm = build_lm(
+        config.profile_model or config.persona_model,
+        config.profile_temperature,
+        config.profile_max_tokens,
+        api_base=config.api_base,
+        policy=config.lm_call_policy(),
+        pool=config.connection_pool(),
+        balancer=config.endpoint_balancer(),
+    )
+    cache = ProfileCache(config.profile_cache_dir) if config.profile_cache_dir else None
+    return ProfileBuilder(
+        ProfileSummarizerProgram(lm=lm),
+        config.profile_chunk_turns,
+        cache=cache,
+        lm=lm,
+    )
@@ -37,3 +37,8 @@ class PersonaAnswerProgram(dspy.Module):
         return self.predict(
             history=history, question=question, persona_profile=persona_profile
         )
+
+    async def aforward(self, history: str, question: str, persona_profile: str = ""):
+        return await self.predict.acall(
+            history=history, question=question, persona_profile=persona_profile
+        )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+class RateLimiter:
+    """Thread-safe token bucket refilled at ``per_minute`` tokens per minute.
+
+    The bucket holds up to ``burst`` tokens (default: one second's worth, at
+    least one), so short idle periods do not turn into large bursts.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be > 0.")
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens now and return how long to wait before using them.
+
+        Requests larger than the bucket are charged in full, so they wait
+        until the rate catches up instead of blocking forever.
+        """
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import List, Optional, Sequence
+
+
+DEFAULT_DIM = 1 << 12
+_TOKEN = re.compile(r"\w+")
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise RuntimeError(
+            "Retrieval history selection requires numpy "
+            "(pip install persona-gepa[retrieval])."
+        ) from exc
+    return numpy
+
+
+def _hashed_features(text: str, dim: int) -> List[int]:
+    words = _TOKEN.findall(text.lower())
+    grams = words + [f"{left} {right}" for left, right in zip(words, words[1:])]
+    return [zlib.crc32(gram.encode("utf-8")) % dim for gram in grams]
+
+
+def _count_matrix(np, texts: Sequence[str], dim: int):
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, text in enumerate(texts):
+        features = _hashed_features(text, dim)
+        rows.extend([row] * len(features))
+        cols.extend(features)
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+    return matrix
+
+
+def select_relevant_turns(
+    turn_texts: Sequence[str],
+    queries: Sequence[str],
+    limits: Sequence[int],
+    top_k: int,
+    head_turns: int = 0,
+    dim: int = DEFAULT_DIM,
+    starts: Optional[Sequence[int]] = None,
+) -> List[List[int]]:
+    """Pick the ``top_k`` turns most relevant to each query.
+
+    Turns and queries are embedded as TF-IDF weighted, hashed word uni- and
+    bigrams. Query ``q`` only sees turns in ``[starts[q], limits[q])``
+    (``starts`` defaults to 0): document frequencies come from those turns
+    alone, exactly as if the visible history were indexed on its own, and
+    the first ``head_turns`` of them are never selected. All queries are
+    scored in two matrix products. Ties favour more recent turns. Returns
+    indices ordered from most to least relevant.
+    """
+    np = _require_numpy()
+    if not turn_texts or not queries or top_k <= 0:
+        return [[] for _ in queries]
+
+    count = len(turn_texts)
+    limits = np.minimum(np.asarray(limits, dtype=np.intp), count)
+    starts = np.zeros_like(limits) if starts is None else np.asarray(starts, dtype=np.intp)
+    turns = np.log1p(_count_matrix(np, turn_texts, dim))
+    query_matrix = np.log1p(_count_matrix(np, queries, dim))
+
+    # Per-query IDF over the visible turns, from prefix sums of document counts.
+    seen = np.zeros((count + 1, dim), dtype=np.int32)
+    np.cumsum(turns > 0, axis=0, out=seen[1:])
+    visible = (limits - starts).astype(np.float32)[:, None]
+    document_frequency = (seen[limits] - seen[starts]).astype(np.float32)
+    idf = np.log((1.0 + visible) / (1.0 + document_frequency)) + 1.0
+    weight = idf * idf
+
+    # Cosine of idf-weighted vectors, with each turn's norm under each query's idf.
+    dots = (query_matrix * weight) @ turns.T
+    turn_norms = np.sqrt(weight @ (turns * turns).T)
+    query_norms = np.sqrt(np.sum(query_matrix * query_matrix * weight, axis=1, keepdims=True))
+    scores = dots / np.maximum(query_norms * turn_norms, 1e-12)
+
+    positions = np.arange(count)
+    scores += (positions / (count * 1e4)).astype(np.float32)
+    allowed = (positions[None, :] < limits[:, None]) & (
+        positions[None, :] >= (starts + max(head_turns, 0))[:, None]
+    )
+    scores = np.where(allowed, scores, -np.inf)
+
+    k = min(top_k, count)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    keep = np.isfinite(np.take_along_axis(top_scores, order, axis=1))
+    return [row[mask].tolist() for row, mask in zip(top, keep)]
@@ -0,0 +1,159 @@
+"""Sequential (early-stopping) estimation of a program's mean score.
+
+Examples are visited in a randomized order stratified by persona, so every
+prefix of the order is a representative sample of the valset. Scores are
+folded into running (Welford) mean and variance as they arrive, and the feed
+stops once the confidence interval of the mean is narrower than the target
+or a maximum number of examples has been scored.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+from collections import defaultdict
+from statistics import NormalDist
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence
+
+
+class RunningStats:
+    """Numerically stable running mean and variance (Welford's algorithm)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 until two values are seen)."""
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+
+def strata_keys(valset: Sequence) -> List[Hashable]:
+    """Persona of each example; lazy example sequences are not materialized."""
+    positions = getattr(valset, "positions", None)
+    records = getattr(valset, "records", None)
+    if callable(positions) and records is not None:
+        return [records[record_id].persona_id for record_id, _ in positions()]
+    return [getattr(example, "persona_id", None) for example in valset]
+
+
+def stratified_order(keys: Sequence[Hashable], seed: int = 0) -> List[int]:
+    """Return a shuffled order of ``range(len(keys))`` with strata spread evenly.
+
+    Each stratum is shuffled and its members are placed at evenly spaced,
+    jittered fractional positions, so any prefix holds every stratum in
+    roughly its share of the whole.
+    """
+    rng = random.Random(seed)
+    strata: Dict[Hashable, List[int]] = defaultdict(list)
+    for index, key in enumerate(keys):
+        strata[key].append(index)
+    positioned = []
+    for members in strata.values():
+        rng.shuffle(members)
+        size = len(members)
+        positioned.extend(
+            ((rank + rng.random()) / size, index) for rank, index in enumerate(members)
+        )
+    positioned.sort()
+    return [index for _, index in positioned]
+
+
+class SequentialEstimate:
+    """Track the mean score and decide when enough examples have been scored.
+
+    The interval is a normal approximation with a finite-population
+    correction, so it shrinks to zero as the whole valset gets scored.
+    Stopping on ``half_width`` waits for at least ``min_examples`` scores;
+    ``max_examples`` caps how many examples are fed regardless. Scores may
+    be added from several threads.
+    """
+
+    def __init__(
+        self,
+        population: int,
+        half_width: Optional[float] = None,
+        max_examples: Optional[int] = None,
+        min_examples: int = 30,
+        confidence: float = 0.95,
+    ):
+        if half_width is not None and half_width <= 0:
+            raise ValueError("half_width must be > 0.")
+        if max_examples is not None and max_examples < 1:
+            raise ValueError("max_examples must be >= 1.")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1.")
+        self.population = population
+        self.target_half_width = half_width
+        self.max_examples = max_examples
+        self.min_examples = min_examples
+        self.confidence = confidence
+        self._z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.stats = RunningStats()
+        self._lock = threading.Lock()
+        self._converged = threading.Event()
+
+    def half_width(self) -> float:
+        count = self.stats.count
+        if count < 2:
+            return math.inf
+        correction = 1.0
+        if self.population > 1:
+            correction = math.sqrt(max(self.population - count, 0) / (self.population - 1))
+        return self._z * math.sqrt(self.stats.variance / count) * correction
+
+    def add(self, score: float) -> None:
+        with self._lock:
+            self.stats.add(score)
+            if (
+                self.target_half_width is not None
+                and self.stats.count >= self.min_examples
+                and self.half_width() <= self.target_half_width
+            ):
+                self._converged.set()
+
+    @property
+    def converged(self) -> bool:
+        return self._converged.is_set()
+
+    def feed(self, valset: Sequence, order: Sequence[int]) -> Iterator:
+        """Yield examples in ``order`` until converged or ``max_examples`` are fed."""
+        for fed, index in enumerate(order):
+            if self.converged or (self.max_examples is not None and fed >= self.max_examples):
+                return
+            yield valset[index]
+
+    def report(self) -> Dict[str, float]:
+        """Interval and usage figures; the interval is omitted below two scores."""
+        with self._lock:
+            half_width = self.half_width()
+            mean = self.stats.mean
+            count = self.stats.count
+        report = {
+            "examples_used": float(count),
+            "valset_size": float(self.population),
+            "stopped_early": float(count < self.population),
+        }
+        if count >= self.population:
+            half_width = 0.0
+        if not math.isinf(half_width):
+            report.update(
+                {
+                    "ci_low": mean - half_width,
+                    "ci_high": mean + half_width,
+                    "ci_half_width": half_width,
+                    "ci_confidence": self.confidence,
+                }
+            )
+        return report
@@ -0,0 +1,159 @@
+"""Long-lived local inference server.
+
+``python -m persona_gepa.serve --artifact-path ARTIFACT --port 8080`` imports
+DSPy, builds the persona LM and loads artifacts once, then answers questions
+over HTTP/JSON:
+
+- ``GET /health``
+- ``POST /answer`` with ``{"question", "history", "persona_profile", "artifact_path"}``
+  (everything but ``question`` optional)
+- ``POST /batch`` with ``{"items": [...], "artifact_path"}``, answered concurrently
+
+Every answer carries a ``timings`` breakdown in milliseconds: artifact load
+(zero once warm), profile summarization, history windowing, the LM call and
+the total.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from persona_gepa.infer import (
+    InferenceService,
+    add_config_arguments,
+    config_from_args,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_InferenceServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # Small JSON replies are written as headers then body; without
+        # TCP_NODELAY keep-alive clients stall on delayed ACKs.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _send(self, status: int, payload: Dict[str, object]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, object]:
+        length = int(self.headers.get("content-length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON body: {exc}") from exc
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object.")
+        return payload
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        self._send(200, {"status": "ok", "programs": self.server.service.programs.stats()})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        try:
+            payload = self._read_json()
+            if self.path == "/answer":
+                result = service.answer(
+                    str(payload.get("question", "")),
+                    history=str(payload.get("history", "")),
+                    persona_profile=str(payload.get("persona_profile", "")),
+                    artifact_path=payload.get("artifact_path"),
+                )
+            elif self.path == "/batch":
+                started = time.perf_counter()
+                items = payload.get("items")
+                if not isinstance(items, list):
+                    raise ValueError("'items' must be a list of question objects.")
+                results = service.answer_batch(items, artifact_path=payload.get("artifact_path"))
+                total_ms = (time.perf_counter() - started) * 1e3
+                result = {"results": results, "timings": {"total_ms": total_ms}}
+            else:
+                self._send(404, {"error": f"Unknown path: {self.path}"})
+                return
+        except (ValueError, OSError) as exc:
+            self._send(400, {"error": str(exc)})
+            return
+        except Exception as exc:
+            self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        self._send(200, result)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _InferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: InferenceService, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.verbose = verbose
+
+
+def make_server(
+    service: InferenceService, host: str = "127.0.0.1", port: int = 8000, verbose: bool = False
+) -> ThreadingHTTPServer:
+    """Bind an HTTP server for ``service``; call ``serve_forever()`` to run it."""
+    return _InferenceServer((host, port), service, verbose=verbose)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve persona answers over HTTP/JSON.")
+    parser.add_argument("--artifact-path", help="Default artifact for requests without one.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--max-batch-workers",
+        type=int,
+        default=8,
+        help="Questions from one /batch request answered concurrently.",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+
+    add_config_arguments(parser)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    service = InferenceService(
+        config_from_args(args),
+        artifact_path=args.artifact_path,
+        max_batch_workers=args.max_batch_workers,
+    )
+    server = make_server(service, args.host, args.port, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving persona answers on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,9 +2,16 @@ from __future__ import annotations
 
 import inspect
 import os
+from typing import TYPE_CHECKING
 
 import dspy
 
+from persona_gepa.managed_lm import CallPolicy, LMBudget, ManagedLM
+
+if TYPE_CHECKING:
+    from persona_gepa.endpoints import EndpointBalancer
+    from persona_gepa.http_pool import ConnectionPool
+
 
 def _get_configured_lm():
     settings = getattr(dspy, "settings", None)
@@ -48,8 +55,19 @@ def build_lm(
     max_tokens: int,
     api_base: str | None = None,
     api_key: str | None = None,
+    budget: LMBudget | None = None,
+    policy: CallPolicy | None = None,
+    pool: ConnectionPool | None = None,
+    balancer: EndpointBalancer | None = None,
 ):
-    """Build a DSPy LM, falling back across available providers."""
+    """Build a DSPy LM, falling back across available providers.
+
+    With a ``budget`` or ``policy`` the LM is a ``ManagedLM`` that enforces
+    request, token and adaptive concurrency limits, deadlines, retries and
+    hedging. With a ``pool`` the LM sends its requests over the pool's shared
+    keep-alive connections for ``api_base``. With a ``balancer`` each request
+    goes to one of the balancer's endpoints instead of ``api_base``.
+    """
     api_base = api_base or os.getenv("OPENAI_API_BASE") or os.getenv("OPENAI_BASE_URL")
     api_key = api_key or os.getenv("OPENAI_API_KEY")
     lm_kwargs = {
@@ -63,6 +81,26 @@ def build_lm(
         lm_kwargs["api_key"] = api_key
 
     if hasattr(dspy, "LM"):
+        if pool is not None or balancer is not None:
+            # Pooled engines carry the endpoint and key; dspy.LM rejects
+            # client kwargs alongside a custom engine.
+            lm_kwargs.pop("api_base", None)
+            lm_kwargs.pop("api_key", None)
+            if balancer is not None:
+                from persona_gepa.http_pool import shared_connection_pool
+
+                engines = balancer.engines(
+                    model, pool or shared_connection_pool(), api_key=api_key
+                )
+            else:
+                engines = pool.engines(model, api_base=api_base, api_key=api_key)
+            lm_kwargs["engine"], lm_kwargs["async_engine"] = engines
+        if (budget is not None and not budget.is_unlimited()) or (
+            policy is not None and not policy.is_default()
+        ):
+            return ManagedLM(
+                budget=budget, policy=policy, **filter_kwargs(dspy.LM, lm_kwargs)
+            )
         return dspy.LM(**filter_kwargs(dspy.LM, lm_kwargs))
 
     if hasattr(dspy, "OpenAI"):
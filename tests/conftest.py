@@ -0,0 +1,99 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _OpenAIStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length", 0))
+        request = json.loads(self.rfile.read(length))
+        self.server.requests.append(request)
+        self.server.auth.append(self.headers.get("authorization"))
+        body = json.dumps(
+            {
+                "id": "stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": self.server.reply(request)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        if not self.server.keep_alive:
+            self.send_header("connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def openai_stub():
+    """Local OpenAI-compatible chat endpoint: yields (server, api_base).
+
+    ``server.reply`` maps the request JSON to the completion text (default
+    "pong"); ``keep_alive = False`` closes every connection after one
+    response. ``connections``, ``requests`` and ``auth`` record traffic.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenAIStubHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.requests = []
+    server.auth = []
+    server.reply = lambda _request: "pong"
+    server.keep_alive = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def _echo_question(request):
+    prompt = request["messages"][-1]["content"]
+    question = prompt.split("[[ ## question ## ]]", 1)[1].split("[[ ##", 1)[0].strip()
+    return f"[[ ## answer ## ]]\nYou asked: {question}\n\n[[ ## completed ## ]]"
+
+
+@pytest.fixture
+def persona_setup(openai_stub, tmp_path, monkeypatch):
+    """Persona config and saved artifact against the stub: yields (server, config, artifact).
+
+    The stub answers every persona question with "You asked: <question>".
+    """
+    pytest.importorskip("dspy")
+    from persona_gepa.artifacts import save_artifact
+    from persona_gepa.config import PersonaGEPAConfig
+    from persona_gepa.program import PersonaAnswerProgram
+
+    server, api_base = openai_stub
+    server.reply = _echo_question
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    artifact = save_artifact(PersonaAnswerProgram(), str(tmp_path / "artifacts" / "persona.json"))
+    config = PersonaGEPAConfig(
+        persona_model="openai/stub-model",
+        api_base=api_base,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    return server, config, artifact
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa.artifact_store import ArtifactStore
+from persona_gepa.artifacts import extract_instructions, load_program
+from persona_gepa.program import PersonaAnswerProgram
+
+
+def _blob_count(root):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(root, "blobs")))
+
+
+def test_identical_instructions_share_one_blob(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    first = store.put("Speak plainly.", persona_id="p1", model="m", score=0.5)
+    second = store.put("Speak plainly.", persona_id="p2", model="m", score=0.7)
+    other = store.put("Speak warmly.", persona_id="p1", model="m", score=0.6)
+
+    assert first.path == second.path != other.path
+    assert _blob_count(str(tmp_path)) == 2
+    assert extract_instructions(load_program(first.path)) == "Speak plainly."
+    store.close()
+
+
+def test_best_latest_and_list(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    program = PersonaAnswerProgram()
+    low = store.put("v1", persona_id="p1", model="m", score=0.2, metadata={"run": 1})
+    high = store.put("v2", persona_id="p1", model="m", score=0.9)
+    unscored = store.put("v3", persona_id="p1", model="m")
+    other_model = store.put(program, persona_id="p1", model="n", score=1.0)
+    store.put("v4", persona_id="p2", model="m", score=0.1)
+
+    assert store.best("p1", model="m") == high
+    assert store.best("p1") == other_model
+    assert store.latest("p1", model="m") == unscored
+    assert store.best("missing") is None
+    assert [record.id for record in store.list("p1", model="m")] == [
+        unscored.id, high.id, low.id
+    ]
+    assert len(store.list(limit=2)) == 2
+    assert store.get(low.id).metadata == {"run": 1}
+    assert store.personas() == ["p1", "p2"]
+    assert extract_instructions(load_program(other_model.path)) == extract_instructions(program)
+    store.close()
+
+
+def test_parallel_writers_share_one_store(tmp_path):
+    root = str(tmp_path / "store")
+
+    def job(idx):
+        # Each job opens its own store, as separate optimization processes would.
+        store = ArtifactStore(root)
+        try:
+            return store.put(f"v{idx % 5}", persona_id=f"p{idx % 10}", model="m", score=idx)
+        finally:
+            store.close()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        records = list(executor.map(job, range(40)))
+
+    store = ArtifactStore(root)
+    assert len({record.id for record in records}) == 40
+    assert len(store.list()) == 40
+    assert _blob_count(root) == 5
+    assert store.best("p3").score == 33
+    store.close()
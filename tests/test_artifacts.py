@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa import artifacts as artifacts_module
+from persona_gepa.artifacts import ProgramRegistry, extract_instructions
+
+
+def _write_artifact(path, instructions):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"instructions": instructions, "metadata": {}}, handle)
+
+
+def test_registry_reuses_programs_and_shares_the_lm(tmp_path):
+    lm = dspy.LM("openai/gpt-4o-mini")
+    registry = ProgramRegistry(lm=lm, revalidate_seconds=0)
+    paths = [str(tmp_path / f"persona_{idx}.json") for idx in range(3)]
+    for idx, path in enumerate(paths):
+        _write_artifact(path, f"Persona {idx}.")
+
+    programs = [registry.get(path) for path in paths]
+
+    assert [registry.get(path) for path in paths] == programs
+    assert [extract_instructions(program) for program in programs] == [
+        "Persona 0.", "Persona 1.", "Persona 2."
+    ]
+    assert all(program.predict.lm is lm for program in programs)
+    assert registry.stats() == {
+        "hits": 3, "misses": 3, "reloads": 0, "evictions": 0, "coalesced": 0, "size": 3
+    }
+
+
+def test_registry_reloads_changed_artifacts_after_revalidate_interval(tmp_path):
+    now = [0.0]
+    registry = ProgramRegistry(revalidate_seconds=5.0, clock=lambda: now[0])
+    path = str(tmp_path / "persona.json")
+    _write_artifact(path, "Old voice.")
+    first = registry.get(path)
+
+    _write_artifact(path, "New, longer voice.")
+    os.utime(path, ns=(1, 1))
+    assert registry.get(path) is first  # within the interval: no stat
+
+    now[0] = 6.0
+    reloaded = registry.get(path)
+    assert reloaded is not first
+    assert extract_instructions(reloaded) == "New, longer voice."
+    assert registry.stats()["reloads"] == 1
+
+
+def test_registry_evicts_least_recently_used(tmp_path):
+    registry = ProgramRegistry(max_size=2, revalidate_seconds=0)
+    paths = [str(tmp_path / f"p{idx}.json") for idx in range(3)]
+    for path in paths:
+        _write_artifact(path, path)
+
+    first = registry.get(paths[0])
+    registry.get(paths[1])
+    registry.get(paths[0])  # p1 is now least recently used
+    registry.get(paths[2])
+
+    assert len(registry) == 2
+    assert registry.get(paths[0]) is first
+    assert registry.stats()["evictions"] == 1
+    registry.get(paths[1])
+    assert registry.stats()["misses"] == 4
+
+    with pytest.raises(FileNotFoundError):
+        registry.get(str(tmp_path / "missing.json"))
+
+
+def test_registry_coalesces_concurrent_loads(tmp_path, monkeypatch):
+    path = str(tmp_path / "persona.json")
+    _write_artifact(path, "One voice.")
+    loads = []
+    release = threading.Event()
+    load_program = artifacts_module.load_program
+
+    def slow_load(path, lm=None):
+        loads.append(path)
+        release.wait(5)
+        return load_program(path, lm=lm)
+
+    monkeypatch.setattr(artifacts_module, "load_program", slow_load)
+    registry = ProgramRegistry(revalidate_seconds=0)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(registry.get, path) for _ in range(8)]
+        while registry.stats()["coalesced"] < 7:
+            time.sleep(0.001)
+        release.set()
+        programs = [future.result() for future in futures]
+
+    assert len(loads) == 1
+    assert all(program is programs[0] for program in programs)
+    assert registry.stats()["misses"] == 1
+
+    monkeypatch.setattr(artifacts_module, "load_program", load_program)
+    broken = tmp_path / "broken.json"
+    broken.write_text("{", encoding="utf-8")
+    for _ in range(2):
+        with pytest.raises(json.JSONDecodeError):
+            registry.get(str(broken))
+    assert registry.stats()["misses"] == 3
+
+
+def test_registry_keeps_a_newer_load_over_a_slow_stale_one(tmp_path, monkeypatch):
+    path = str(tmp_path / "persona.json")
+    _write_artifact(path, "Old voice.")
+    loading_old = threading.Event()
+    release = threading.Event()
+    load_program = artifacts_module.load_program
+
+    def load(path, lm=None):
+        program = load_program(path, lm=lm)
+        if extract_instructions(program) == "Old voice.":
+            loading_old.set()
+            release.wait(5)
+        return program
+
+    monkeypatch.setattr(artifacts_module, "load_program", load)
+    registry = ProgramRegistry(revalidate_seconds=0)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stale = executor.submit(registry.get, path)
+        assert loading_old.wait(5)
+        _write_artifact(path, "New, longer voice.")
+        newer = registry.get(path)
+        release.set()
+        assert extract_instructions(stale.result()) == "Old voice."
+
+    assert registry.get(path) is newer
+    assert extract_instructions(newer) == "New, longer voice."
@@ -4,7 +4,18 @@ import pytest
 
 dspy = pytest.importorskip("dspy")
 
-from persona_gepa.data import build_examples, build_train_val_examples, load_interviews
+from persona_gepa.data import (
+    ExampleSequence,
+    InterviewRecord,
+    build_examples,
+    build_train_val_examples,
+    format_history,
+    iter_examples,
+    iter_interviews,
+    load_interviews,
+    load_parquet_records,
+    records_from_arrow,
+)
 
 
 def test_load_interviews_new_format(tmp_path):
@@ -84,3 +95,181 @@ def test_build_examples_backwards_compat():
     examples = build_examples(interviews)
     assert len(examples) == 2
     assert examples[0].question == "Where were you born?"
+
+
+def test_build_examples_history_matches_format_history():
+    interview = [
+        {"interviewer_question": f"Q{idx}", "respondent_answer": f"A{idx}\nmore"}
+        for idx in range(6)
+    ]
+
+    examples = build_examples([interview])
+
+    for turn_index, example in enumerate(examples):
+        assert example.history == format_history(interview[:turn_index])
+
+
+def test_example_sequence_is_lazy_and_sliceable():
+    interviews = [
+        [{"q": f"Q{idx}", "a": f"A{idx}"} for idx in range(3)],
+        [{"q": "R0", "a": "B0"}, {"q": "R1", "a": "B1"}],
+    ]
+
+    examples = build_examples(interviews)
+
+    assert isinstance(examples, ExampleSequence)
+    assert len(examples) == 5
+    assert examples[-1].question == "R1"
+    assert examples[-1].answer == "B1"
+    assert examples[-1].history == "Q: R0\nA: B0\n"
+    assert examples[-1].persona_id == "1"
+
+    tail = examples[2:]
+    assert isinstance(tail, ExampleSequence)
+    assert [ex.question for ex in tail] == ["Q2", "R0", "R1"]
+
+
+def test_iter_interviews_jsonl_streams_with_line_context(tmp_path):
+    path = tmp_path / "interviews.jsonl"
+    path.write_text(
+        json.dumps([{"q": "Q1", "a": "A1"}])
+        + "\n\n"
+        + json.dumps({"interview": [{"q": "Q2"}]})
+        + "\n",
+        encoding="utf-8",
+    )
+
+    interviews = iter_interviews(str(path))
+    assert next(interviews) == [{"q": "Q1", "a": "A1"}]
+    with pytest.raises(ValueError, match="line 3 turn 0"):
+        next(interviews)
+
+
+def test_iter_examples_matches_build_examples(tmp_path):
+    data = [
+        [{"q": "Q1", "a": "A1"}, {"q": "Q2", "a": "A2"}],
+        [{"q": "Q3", "a": "A3"}],
+    ]
+    path = tmp_path / "interviews.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    streamed = list(iter_examples(str(path)))
+    built = build_examples(data)
+
+    assert [ex.toDict() for ex in streamed] == [ex.toDict() for ex in built]
+
+
+@pytest.mark.parametrize("trailer", ["]", " {}", "[[]]", "\n[{\"q\": \"Q\"}]"])
+def test_iter_interviews_rejects_data_after_the_array(tmp_path, trailer):
+    path = tmp_path / "interviews.json"
+    path.write_text(json.dumps([[{"q": "Q1", "a": "A1"}]]) + trailer, encoding="utf-8")
+    padded = tmp_path / "padded.json"
+    padded.write_text(json.dumps([]) + " \n\t", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="extra data"):
+        list(iter_interviews(str(path)))
+    assert list(iter_interviews(str(padded))) == []
+
+
+def test_load_interviews_sharded_directory_is_ordered(tmp_path):
+    for shard in range(4):
+        lines = [
+            json.dumps([{"q": f"S{shard}Q{idx}", "a": "A"}]) for idx in range(3)
+        ]
+        (tmp_path / f"part-{shard:05d}.jsonl").write_text(
+            "\n".join(lines), encoding="utf-8"
+        )
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    parallel = load_interviews(str(tmp_path), num_workers=2)
+    serial = load_interviews(str(tmp_path / "part-*.jsonl"), num_workers=1)
+
+    assert parallel == serial
+    assert [interview[0]["q"] for interview in parallel][:4] == [
+        "S0Q0",
+        "S0Q1",
+        "S0Q2",
+        "S1Q0",
+    ]
+    assert len(parallel) == 12
+
+
+@pytest.mark.parametrize("suffix,opener", [(".gz", "gzip"), (".bz2", "bz2"), (".xz", "lzma")])
+def test_iter_interviews_compressed(tmp_path, suffix, opener):
+    module = __import__(opener)
+    interviews = [[{"q": "Q1", "a": "A1"}], [{"q": "Q2", "a": "A2"}]]
+    lines_path = tmp_path / f"interviews.jsonl{suffix}"
+    with module.open(lines_path, "wt", encoding="utf-8") as handle:
+        handle.write("\n".join(json.dumps(interview) for interview in interviews))
+    json_path = tmp_path / f"interviews.json{suffix}"
+    with module.open(json_path, "wt", encoding="utf-8") as handle:
+        json.dump(interviews, handle)
+
+    assert list(iter_interviews(str(lines_path))) == interviews
+    assert load_interviews(str(json_path)) == interviews
+    assert len(load_interviews(str(tmp_path), num_workers=1)) == 4
+
+
+def test_iter_interviews_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    interviews = [[{"q": "Q1", "a": "A1"}]]
+    path = tmp_path / "interviews.jsonl.zst"
+    payload = "\n".join(json.dumps(interview) for interview in interviews)
+    path.write_bytes(zstandard.ZstdCompressor().compress(payload.encode("utf-8")))
+
+    assert list(iter_interviews(str(path))) == interviews
+
+
+def test_load_parquet_records_groups_and_orders_turns(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pa.table(
+        {
+            "interview_id": ["b", "a", "a", "b", "a"],
+            "turn_index": [1, 1, 0, 0, 2],
+            "interviewer_question": ["B2", "A2", "A1", "B1", "Ä3"],
+            "respondent_answer": ["b2", "a2", "a1", "b1", "ä3"],
+            "unused": [0, 0, 0, 0, 0],
+        }
+    )
+    path = tmp_path / "turns.parquet"
+    pq.write_table(table, path)
+
+    records = load_parquet_records(str(path))
+    examples = build_examples(records)
+
+    assert [record.persona_id for record in records] == ["a", "b"]
+    assert [ex.question for ex in examples] == ["A1", "A2", "Ä3", "B1", "B2"]
+    assert examples[2].history == format_history(
+        [{"q": "A1", "a": "a1"}, {"q": "A2", "a": "a2"}]
+    )
+    assert examples[2].answer == "ä3"
+    assert load_interviews(str(path))[1] == [{"q": "B1", "a": "b1"}, {"q": "B2", "a": "b2"}]
+
+    chunked = records_from_arrow(pa.concat_tables([table.slice(0, 2), table.slice(2)]))
+    assert [record.transcript for record in chunked] == [
+        InterviewRecord.from_turns(record.turns()).transcript for record in records
+    ]
+
+
+@pytest.mark.parametrize(
+    "interview_ids, turn_indexes, message",
+    [
+        (["a", None], [0, 0], "interview_id contains nulls"),
+        (["a", "a"], [0, None], "turn_index contains nulls"),
+        (["a", "b", "a"], [1, 0, 1], "duplicate turn 1 for interview 'a'"),
+    ],
+)
+def test_records_from_arrow_rejects_bad_keys(interview_ids, turn_indexes, message):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table(
+        {
+            "interview_id": interview_ids,
+            "turn_index": pa.array(turn_indexes, pa.int64()),
+            "interviewer_question": ["Q"] * len(interview_ids),
+            "respondent_answer": ["A"] * len(interview_ids),
+        }
+    )
+
+    with pytest.raises(ValueError, match=message):
+        records_from_arrow(table)
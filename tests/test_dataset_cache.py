@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa import dataset_cache
+from persona_gepa.data import (
+    InterviewRecord,
+    build_examples,
+    build_train_val_examples,
+    iter_interviews,
+)
+from persona_gepa.dataset_cache import load_cached_records
+from persona_gepa.history import HistoryPolicy, apply_history_policy
+
+
+INTERVIEWS = [
+    [
+        {"interviewer_question": "Où êtes-vous né ?", "respondent_answer": "À Paris."},
+        {"interviewer_question": "Favorite food?", "respondent_answer": "Baguettes.\nAnd cheese."},
+        {"interviewer_question": "Pets?", "respondent_answer": ""},
+    ],
+    [],
+    [{"q": "Q1", "a": "A1"}, {"q": "Q2", "a": "A2"}],
+]
+
+
+def test_cached_records_match_in_memory_examples(tmp_path):
+    path = tmp_path / "interviews.json"
+    path.write_text(json.dumps(INTERVIEWS), encoding="utf-8")
+
+    records = load_cached_records(str(path), str(tmp_path / "cache"))
+    cached = build_examples(records)
+    expected = build_examples(INTERVIEWS)
+
+    assert [ex.toDict() for ex in cached] == [ex.toDict() for ex in expected]
+
+    cached_train, cached_val = build_train_val_examples(records, val_ratio=0.4)
+    train, val = build_train_val_examples(INTERVIEWS, val_ratio=0.4)
+    assert [ex.toDict() for ex in cached_train] == [ex.toDict() for ex in train]
+    assert [ex.toDict() for ex in cached_val] == [ex.toDict() for ex in val]
+
+
+def test_cached_history_budgets_count_characters_like_in_memory(tmp_path):
+    interview = [
+        {"q": f"質問{idx}：子供の頃はどこに住んでいましたか？", "a": "東京の下町で育ちました。" * 3}
+        for idx in range(6)
+    ]
+    path = tmp_path / "ja.json"
+    path.write_text(json.dumps([interview], ensure_ascii=False), encoding="utf-8")
+    cached = load_cached_records(str(path), str(tmp_path / "cache"))[0]
+    in_memory = InterviewRecord.from_turns(interview)
+
+    assert [cached.turn_tokens(idx) for idx in range(6)] == [
+        in_memory.turn_tokens(idx) for idx in range(6)
+    ]
+    policy = HistoryPolicy(max_tokens=60, head_turns=1)
+    for turn_index in range(6):
+        assert cached.history(turn_index, policy) == in_memory.history(turn_index, policy)
+    assert cached.history(5, policy) == apply_history_policy(
+        in_memory.history(5), policy
+    )
+
+
+def test_cache_hit_skips_parsing_and_rehashing(tmp_path, monkeypatch):
+    path = tmp_path / "interviews.json"
+    path.write_text(json.dumps(INTERVIEWS), encoding="utf-8")
+    cache_dir = str(tmp_path / "cache")
+    load_cached_records(str(path), cache_dir)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(dataset_cache, "file_sha256", fail)
+    monkeypatch.setattr(dataset_cache, "compile_dataset", fail)
+    records = load_cached_records(str(path), cache_dir)
+    assert len(records) == 3
+
+    # Touching the file forces a re-hash, but identical content still hits.
+    monkeypatch.undo()
+    os.utime(path, ns=(1, 1))
+    monkeypatch.setattr(dataset_cache, "compile_dataset", fail)
+    records = load_cached_records(str(path), cache_dir)
+    assert records[2].question(1) == "Q2"
+
+
+def _first_interview_only(path):
+    return list(iter_interviews(path))[:1]
+
+
+def test_cache_entries_are_keyed_on_the_loader(tmp_path):
+    path = tmp_path / "interviews.json"
+    path.write_text(json.dumps(INTERVIEWS), encoding="utf-8")
+    cache_dir = str(tmp_path / "cache")
+    assert len(load_cached_records(str(path), cache_dir)) == 3
+
+    records = load_cached_records(str(path), cache_dir, loader=_first_interview_only)
+    assert len(records) == 1
+    assert len(load_cached_records(str(path), cache_dir)) == 3
+
+
+def test_cached_records_from_shards_number_personas_globally(tmp_path):
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    for shard in range(3):
+        (shard_dir / f"part-{shard}.json").write_text(
+            json.dumps([[{"q": f"S{shard}", "a": "A"}]] * 2), encoding="utf-8"
+        )
+
+    records = load_cached_records(str(shard_dir), str(tmp_path / "cache"), num_workers=2)
+
+    assert [record.persona_id for record in records] == [str(idx) for idx in range(6)]
+    assert [record.question(0) for record in records] == ["S0", "S0", "S1", "S1", "S2", "S2"]
@@ -0,0 +1,235 @@
+import asyncio
+import random
+from collections import Counter
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+lm15 = pytest.importorskip("dspy.lm15")
+
+from persona_gepa.config import PersonaGEPAConfig
+from persona_gepa.endpoints import (
+    AsyncBalancedEngine,
+    BalancedEngine,
+    Endpoint,
+    EndpointBalancer,
+    parse_endpoints,
+)
+from persona_gepa.utils import build_lm
+
+
+A = "http://a.example/v1"
+B = "http://b.example/v1"
+
+
+class _Engine:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+
+    def complete(self, request):
+        self.calls += 1
+        if self.fail:
+            raise lm15.TransportError("connection refused")
+        return request
+
+
+class _AsyncEngine(_Engine):
+    async def complete(self, request):
+        return _Engine.complete(self, request)
+
+
+class _Rejecting:
+    def complete(self, request):
+        raise lm15.InvalidRequestError("bad request")
+
+
+class _StreamEngine(_Engine):
+    def stream(self, request):
+        self.calls += 1
+        if self.fail:
+            raise lm15.TransportError("connection refused")
+        yield from request
+
+
+class _AsyncStreamEngine(_StreamEngine):
+    async def stream(self, request):
+        for event in _StreamEngine.stream(self, request):
+            yield event
+
+
+def test_sequential_traffic_follows_weights():
+    balancer = EndpointBalancer(
+        [Endpoint(A, weight=3), Endpoint(B, weight=1)], rng=random.Random(0)
+    )
+    picks = Counter()
+    for _ in range(2000):
+        endpoint = balancer.acquire()
+        picks[endpoint.api_base] += 1
+        balancer.release(endpoint, 0.01)
+
+    assert 2.4 < picks[A] / picks[B] < 3.6
+
+
+def test_least_outstanding_prefers_idle_endpoint():
+    balancer = EndpointBalancer([Endpoint(A), Endpoint(B)], rng=random.Random(0))
+    busy = balancer.acquire()
+    for _ in range(20):
+        endpoint = balancer.acquire()
+        assert endpoint != busy
+        balancer.release(endpoint, 0.01)
+
+
+def test_latency_routing_prefers_faster_endpoint():
+    balancer = EndpointBalancer(
+        [Endpoint(A), Endpoint(B)], strategy="latency", rng=random.Random(0)
+    )
+    for api_base, latency in ((A, 0.5), (B, 0.05)):
+        endpoint = Endpoint(api_base)
+        balancer._states[[A, B].index(api_base)].outstanding += 1
+        balancer.release(endpoint, latency)
+
+    picks = Counter()
+    for _ in range(50):
+        endpoint = balancer.acquire()
+        picks[endpoint.api_base] += 1
+        balancer.release(endpoint, 0.5 if endpoint.api_base == A else 0.05)
+    assert picks[B] == 50
+
+
+def test_failing_endpoint_is_ejected_then_probed_after_cooldown():
+    now = [0.0]
+    balancer = EndpointBalancer(
+        [Endpoint(A), Endpoint(B)],
+        failure_threshold=2,
+        cooldown_seconds=10.0,
+        clock=lambda: now[0],
+        rng=random.Random(0),
+    )
+    for _ in range(2):
+        balancer.release(balancer.acquire(exclude={B}), 0.1, failed=True)
+    assert balancer.stats()[A]["ejected"] == 1.0
+    assert all(balancer.acquire() == Endpoint(B) for _ in range(10))
+
+    now[0] = 11.0
+    assert balancer.acquire(exclude={B}) == Endpoint(A)
+    # Still at the failure threshold: one more failure re-ejects immediately.
+    balancer.release(Endpoint(A), 0.1, failed=True)
+    assert balancer.stats()[A]["ejections"] == 2.0
+    assert balancer.acquire(exclude={B}) is None
+
+
+def test_balanced_engine_fails_over_and_ejects():
+    balancer = EndpointBalancer(
+        [Endpoint(A), Endpoint(B)], failure_threshold=1, rng=random.Random(0)
+    )
+    dead, live = _Engine(fail=True), _Engine()
+    engine = BalancedEngine(balancer, {A: dead, B: live})
+
+    assert [engine.complete(idx) for idx in range(10)] == list(range(10))
+    assert dead.calls == 1
+    stats = balancer.stats()
+    assert stats[A]["ejected"] == 1.0
+    assert stats[B]["failures"] == 0.0
+    assert stats[A]["outstanding"] == stats[B]["outstanding"] == 0.0
+
+
+def test_balanced_engine_raises_when_every_endpoint_fails():
+    balancer = EndpointBalancer([Endpoint(A), Endpoint(B)], rng=random.Random(0))
+    engines = {A: _AsyncEngine(fail=True), B: _AsyncEngine(fail=True)}
+    engine = AsyncBalancedEngine(balancer, engines)
+
+    with pytest.raises(lm15.TransportError):
+        asyncio.run(engine.complete("request"))
+    assert engines[A].calls == engines[B].calls == 1
+
+
+def test_non_retryable_error_leaves_endpoint_health_alone():
+    balancer = EndpointBalancer([Endpoint(A)], failure_threshold=2)
+    failing = BalancedEngine(balancer, {A: _Engine(fail=True)})
+    rejecting = BalancedEngine(balancer, {A: _Rejecting()})
+
+    with pytest.raises(lm15.TransportError):
+        failing.complete("request")
+    with pytest.raises(lm15.InvalidRequestError):
+        rejecting.complete("request")
+    with pytest.raises(lm15.TransportError):
+        failing.complete("request")
+
+    stats = balancer.stats()
+    # The rejection neither reset the failure streak nor fed the latency estimate.
+    assert stats[A]["failures"] == 2.0
+    assert stats[A]["ejected"] == 1.0
+    assert stats[A]["latency_ms"] == 0.0
+    assert stats[A]["outstanding"] == 0.0
+
+
+def test_cancelled_request_releases_its_endpoint():
+    class _Hanging:
+        async def complete(self, request):
+            await asyncio.sleep(10)
+
+    balancer = EndpointBalancer([Endpoint(A)])
+    engine = AsyncBalancedEngine(balancer, {A: _Hanging()})
+
+    async def _run():
+        task = asyncio.ensure_future(engine.complete("request"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_run())
+    stats = balancer.stats()[A]
+    assert stats["outstanding"] == stats["failures"] == 0.0
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_balanced_engine_streams_and_fails_over_before_first_event(asynchronous):
+    balancer = EndpointBalancer(
+        [Endpoint(A), Endpoint(B)], failure_threshold=1, rng=random.Random(0)
+    )
+    cls = _AsyncStreamEngine if asynchronous else _StreamEngine
+    dead, live = cls(fail=True), cls()
+    routed = (AsyncBalancedEngine if asynchronous else BalancedEngine)(
+        balancer, {A: dead, B: live}
+    )
+
+    async def _collect(events, limit=None):
+        out = []
+        async for event in events:
+            out.append(event)
+            if len(out) == limit:
+                await events.aclose()
+        return out
+
+    def collect(events, limit=None):
+        if asynchronous:
+            return asyncio.run(_collect(events, limit))
+        out = []
+        for event in events:
+            out.append(event)
+            if len(out) == limit:
+                events.close()
+        return out
+
+    assert [collect(routed.stream(["a", "b", "c"])) for _ in range(3)] == [["a", "b", "c"]] * 3
+    assert collect(routed.stream(["a", "b", "c"]), limit=1) == ["a"]
+    assert dead.calls == 1
+    stats = balancer.stats()
+    assert stats[A]["ejected"] == 1.0
+    assert stats[B]["failures"] == 0.0
+    assert stats[A]["outstanding"] == stats[B]["outstanding"] == 0.0
+
+
+def test_config_builds_balanced_lms():
+    assert parse_endpoints([[A, "2"], [B]]) == {A: 2.0, B: 1.0}
+    with pytest.raises(ValueError):
+        parse_endpoints([[A, "0"]])
+
+    config = PersonaGEPAConfig(endpoints={A: 2.0, B: 1.0})
+    balancer = config.endpoint_balancer()
+    assert balancer is config.endpoint_balancer()
+    lm = build_lm("openai/gpt-4o-mini", 0.0, 16, api_key="k", balancer=balancer)
+    assert isinstance(lm._engine_spec, BalancedEngine)
+    assert lm._engine_spec.balancer is balancer
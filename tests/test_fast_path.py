@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+lm15 = pytest.importorskip("dspy.lm15")
+
+from persona_gepa import managed_lm as managed_lm_module
+from persona_gepa.artifacts import apply_instructions
+from persona_gepa.config import PersonaGEPAConfig
+from persona_gepa.fast_path import (
+    FastPersonaClient,
+    export_prompt_template,
+    load_prompt_template,
+    parse_answer,
+    save_prompt_template,
+)
+from persona_gepa.http_pool import ConnectionPool
+from persona_gepa.infer import predict_answer
+from persona_gepa.managed_lm import CallPolicy
+from persona_gepa.program import PersonaAnswerProgram
+from persona_gepa.utils import build_lm
+
+
+MODEL = "openai/stub-model"
+REPLY = "[[ ## answer ## ]]\nI grew up in {Austin}.\n\n[[ ## completed ## ]]"
+INPUTS = [
+    ("Q: Where?\nA: Austin.\n", "Where did you grow up?", ""),
+    ("Q: {question}\nA: [[ ## answer ## ]] braces {}\n", "And {history}?", "Likes {tacos}."),
+]
+
+
+def test_fast_path_sends_the_same_request_as_dspy(openai_stub, tmp_path):
+    server, api_base = openai_stub
+    server.reply = lambda _request: REPLY
+    pool = ConnectionPool(max_connections=2)
+    program = PersonaAnswerProgram()
+    apply_instructions(program, "Answer as {persona}; never break [[ ## answer ## ]] format.")
+    template_path = save_prompt_template(
+        export_prompt_template(program), str(tmp_path / "template.json")
+    )
+    client = FastPersonaClient(
+        load_prompt_template(template_path),
+        MODEL,
+        temperature=0.3,
+        max_tokens=64,
+        api_base=api_base,
+        api_key="k",
+        pool=pool,
+    )
+    lm = build_lm(MODEL, 0.3, 64, api_base=api_base, api_key="k", pool=pool)
+    lm.cache = False  # every DSPy call must reach the stub
+    program.predict.lm = lm
+
+    for history, question, profile in INPUTS:
+        dspy_answer = predict_answer(program, lm, history, question, profile)
+        fast_answer = client.answer(history, question, profile)
+        assert fast_answer == dspy_answer == "I grew up in {Austin}."
+        dspy_request, fast_request = server.requests[-2:]
+        assert fast_request == dspy_request
+
+    assert asyncio.run(client.aanswer(*INPUTS[0])) == "I grew up in {Austin}."
+    assert server.requests[-1] == server.requests[0]
+    pool.close()
+
+
+def test_parse_answer_matches_chat_adapter():
+    signature = PersonaAnswerProgram().predict.signature
+    completions = [
+        REPLY,
+        "preamble\n[[ ## answer ## ]] inline start\nmore\n[[ ## completed ## ]]",
+        "[[ ## answer ## ]]\n\n  spaced  \n",
+    ]
+    for completion in completions:
+        expected = dspy.ChatAdapter().parse(signature, completion)["answer"]
+        assert parse_answer(completion) == expected
+
+    with pytest.raises(ValueError):
+        parse_answer("no fields here")
+
+
+class _ThrottledEngine:
+    def complete(self, request):
+        raise lm15.RateLimitError("slow down")
+
+
+def test_from_config_applies_the_persona_budget_and_policy(openai_stub, monkeypatch):
+    server, api_base = openai_stub
+    server.reply = lambda _request: REPLY
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    config = PersonaGEPAConfig(
+        persona_model=MODEL,
+        api_base=api_base,
+        persona_tpm=600,
+        persona_max_concurrency=4,
+        lm_max_retries=0,
+    )
+    client = FastPersonaClient.from_config(export_prompt_template(PersonaAnswerProgram()), config)
+    assert client.policy.max_retries == 0
+    assert client.budget == config.lm_budget("persona")
+
+    slept = []
+    monkeypatch.setattr(managed_lm_module.time, "sleep", slept.append)
+    assert client.answer("", "First?") == client.answer("", "Second?") == "I grew up in {Austin}."
+    assert len(slept) == 2 and slept[1] > slept[0] > 0
+    assert client.stats()["rate_wait_seconds"] == pytest.approx(sum(slept))
+
+    client._engine = _ThrottledEngine()
+    with pytest.raises(lm15.RateLimitError):
+        client.answer("", "Third?")
+    stats = client.stats()
+    assert stats["calls"] == 3
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 0
+    assert stats["concurrency_limit"] == 1
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [CallPolicy(deadline_seconds=5), CallPolicy(hedge=True), CallPolicy(single_flight=True)],
+)
+def test_client_rejects_policies_it_cannot_apply(openai_stub, policy):
+    _server, api_base = openai_stub
+    with pytest.raises(ValueError, match="retries only"):
+        FastPersonaClient(
+            export_prompt_template(PersonaAnswerProgram()),
+            MODEL,
+            api_base=api_base,
+            api_key="k",
+            policy=policy,
+        )
@@ -0,0 +1,138 @@
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa.data import build_examples, build_train_val_examples, format_history
+from persona_gepa.history import HistoryPolicy, apply_history_policy, approx_token_count
+
+
+def _interview(turns):
+    return [{"q": f"Q{idx}", "a": f"A{idx}"} for idx in range(turns)]
+
+
+def test_history_policy_first_and_last_turns():
+    interview = _interview(8)
+    policy = HistoryPolicy(max_turns=2, head_turns=2)
+
+    examples = build_examples([interview], history_policy=policy)
+
+    assert examples[7].history == format_history(interview[:2] + interview[5:7])
+    assert examples[3].history == format_history(interview[:3])
+
+
+def test_history_policy_token_budget_keeps_recent_turns():
+    interview = _interview(10)
+    turn_tokens = approx_token_count(format_history(interview[:1]))
+    policy = HistoryPolicy(max_tokens=3 * turn_tokens)
+
+    history = build_examples([interview], history_policy=policy)[9].history
+
+    assert history == format_history(interview[6:9])
+
+
+def test_apply_history_policy_matches_example_windowing():
+    interview = _interview(6)
+    policy = HistoryPolicy(max_turns=3, head_turns=1)
+    full = format_history(interview[:5])
+
+    windowed = build_examples([interview], history_policy=policy)[5].history
+
+    assert apply_history_policy(full, policy) == windowed
+    assert apply_history_policy(full, HistoryPolicy()) == full
+
+
+def test_retrieval_policy_keeps_relevant_turns():
+    pytest.importorskip("numpy")
+    interview = [
+        {"q": "Where did you grow up?", "a": "I grew up in Austin, Texas."},
+        {"q": "What do you do for work?", "a": "I teach chemistry."},
+        {"q": "Do you have pets?", "a": "Two cats named Salt and Pepper."},
+        {"q": "Favorite food?", "a": "Breakfast tacos."},
+        {"q": "Tell me about your cats.", "a": "They are lazy."},
+    ]
+    policy = HistoryPolicy(retrieval_top_k=1, head_turns=1)
+
+    examples = build_examples([interview], history_policy=policy)
+    history = examples[4].history
+
+    assert history == format_history([interview[0], interview[2]])
+    assert (
+        apply_history_policy(
+            format_history(interview[:4]), policy, question="Tell me about your cats."
+        )
+        == history
+    )
+
+
+PETS_INTERVIEW = [
+    {"q": "Where did you grow up?", "a": "Austin. We had two cats and a dog there."},
+    {"q": "What do you do for work?", "a": "I teach chemistry to teenagers."},
+    {"q": "Do you have pets now?", "a": "Two cats named Salt and Pepper."},
+    {"q": "Favorite food?", "a": "Breakfast tacos with salsa."},
+    {"q": "How did you pick the cats' names?", "a": "From the kitchen table."},
+    {"q": "Any hobbies?", "a": "Climbing and chess, and the cats watch me."},
+    {"q": "Tell me about your cats.", "a": "They are lazy."},
+    {"q": "Do the cats like tacos?", "a": "Salt does."},
+]
+
+
+# Indexing the whole interview lets turns 4-5 shift document frequencies
+# enough to change which earlier turn turn 4 retrieves.
+IDF_INTERVIEW = [
+    {"q": "kitchen climbing?", "a": "pepper salt pepper."},
+    {"q": "work pepper?", "a": "pepper chess tacos."},
+    {"q": "chess cats?", "a": "work work salt."},
+    {"q": "tacos chess?", "a": "climbing kitchen climbing."},
+    {"q": "climbing work?", "a": "climbing pepper pepper."},
+    {"q": "austin kitchen?", "a": "climbing pepper kitchen."},
+]
+
+
+@pytest.mark.parametrize(
+    "interview, policy",
+    [
+        (PETS_INTERVIEW, HistoryPolicy(retrieval_top_k=2, head_turns=1)),
+        (IDF_INTERVIEW, HistoryPolicy(retrieval_top_k=1)),
+    ],
+)
+def test_retrieval_history_matches_inference_for_every_turn(interview, policy):
+    pytest.importorskip("numpy")
+    examples = build_examples([interview], history_policy=policy)
+
+    for idx, example in enumerate(examples):
+        # Inference only sees earlier turns, so training must not use later ones.
+        assert example.history == apply_history_policy(
+            format_history(interview[:idx]), policy, question=example.question
+        )
+
+
+def test_retrieval_history_respects_token_and_turn_budgets():
+    pytest.importorskip("numpy")
+    question = PETS_INTERVIEW[7]["q"]
+    full = format_history(PETS_INTERVIEW[:7])
+    unbounded = apply_history_policy(full, HistoryPolicy(retrieval_top_k=4), question=question)
+
+    capped = apply_history_policy(
+        full, HistoryPolicy(retrieval_top_k=4, max_turns=2), question=question
+    )
+    assert capped.count("Q: ") == 2
+    assert all(line in unbounded for line in capped.splitlines())
+
+    policy = HistoryPolicy(retrieval_top_k=4, max_tokens=30)
+    assert approx_token_count(apply_history_policy(full, policy, question=question)) <= 30
+    examples = build_examples([PETS_INTERVIEW], history_policy=policy)
+    assert examples[7].history == apply_history_policy(full, policy, question=question)
+
+
+def test_retrieval_fills_top_k_inside_profile_window_and_shares_index():
+    pytest.importorskip("numpy")
+    policy = HistoryPolicy(retrieval_top_k=2)
+    train, val = build_train_val_examples([PETS_INTERVIEW], val_ratio=0.25, history_policy=policy)
+    assert train._retrieval_cache is val._retrieval_cache
+
+    windowed = train.with_profiles({0: ["", "profile"]}, chunk_turns=3)
+    example = windowed[5]
+    assert example.history.count("Q: ") == 2
+    assert example.history == apply_history_policy(
+        format_history(PETS_INTERVIEW[3:5]), policy, question=example.question
+    )
@@ -0,0 +1,100 @@
+import asyncio
+import copy
+import subprocess
+import sys
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+pytest.importorskip("dspy.lm15")
+
+from persona_gepa.config import PersonaGEPAConfig
+from persona_gepa.http_pool import ConnectionPool
+from persona_gepa.managed_lm import CallPolicy, ManagedLM
+from persona_gepa.utils import build_lm
+
+
+MODEL = "openai/stub-model"
+
+
+def test_lms_sharing_a_pool_reuse_one_connection(openai_stub):
+    server, api_base = openai_stub
+    pool = ConnectionPool(max_connections=4)
+    persona = build_lm(MODEL, 0.0, 16, api_base=api_base, api_key="k", pool=pool)
+    judge = build_lm(
+        MODEL, 0.0, 16, api_base=api_base, api_key="k", pool=pool,
+        policy=CallPolicy(max_retries=1),
+    )
+    assert isinstance(judge, ManagedLM)
+
+    for lm in (persona, judge, copy.deepcopy(persona), judge):
+        assert lm("ping", cache=False) == ["pong"]
+
+    assert server.connections == 1
+    assert server.auth == ["Bearer k"] * 4
+    assert pool.stats() == {api_base: {"idle": 1, "in_use": 0, "total_opened": 1}}
+    pool.close()
+
+
+def test_pool_serves_async_calls(openai_stub):
+    server, api_base = openai_stub
+    pool = ConnectionPool(max_connections=2)
+    lm = build_lm(MODEL, 0.0, 16, api_base=api_base, api_key="k", pool=pool)
+
+    async def _run():
+        return await asyncio.gather(*(lm.acall(f"ping {idx}", cache=False) for idx in range(6)))
+
+    assert asyncio.run(_run()) == [["pong"]] * 6
+    assert server.connections <= 2
+    assert pool.totals()["total_opened"] == server.connections
+    pool.close()
+
+
+def test_config_pool_is_opt_in_and_shared():
+    assert PersonaGEPAConfig().connection_pool() is None
+    config = PersonaGEPAConfig(http_max_connections=7)
+    assert config.connection_pool() is config.connection_pool()
+    assert config.connection_pool().max_connections == 7
+
+
+def test_http2_pool_counts_opened_connections(openai_stub):
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    server, api_base = openai_stub
+    pool = ConnectionPool(max_connections=2, http2=True)
+    persona = build_lm(MODEL, 0.0, 16, api_base=api_base, api_key="k", pool=pool)
+    judge = build_lm(MODEL, 0.0, 16, api_base=api_base, api_key="k", pool=pool)
+
+    for lm in (persona, judge, persona):
+        assert lm("ping", cache=False) == ["pong"]
+    assert server.connections == 1
+    assert pool.stats() == {api_base: {"idle": 1, "in_use": 0, "total_opened": 1}}
+
+    server.keep_alive = False
+    for lm in (persona, judge, persona):
+        assert lm("ping", cache=False) == ["pong"]
+    assert server.connections == 3
+    assert pool.totals()["total_opened"] == 3
+
+    async def _run():
+        return await asyncio.gather(*(judge.acall(f"ping {idx}", cache=False) for idx in range(6)))
+
+    assert asyncio.run(_run()) == [["pong"]] * 6
+    assert pool.totals()["total_opened"] == server.connections
+    pool.close()
+
+
+def test_config_and_cli_modules_do_not_import_the_pool():
+    # Pooling needs DSPy's lm15 engines; older DSPy releases must still load
+    # the config and CLIs as long as pooling is not configured.
+    code = (
+        "import sys, persona_gepa.config, persona_gepa.utils, persona_gepa.optimize, "
+        "persona_gepa.infer; "
+        "print(sorted(m for m in ('persona_gepa.http_pool', 'persona_gepa.fast_path') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+    assert PersonaGEPAConfig().connection_pool() is None
@@ -0,0 +1,147 @@
+import argparse
+import json
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+pytest.importorskip("dspy.lm15")
+
+from persona_gepa.artifact_store import ArtifactStore
+from persona_gepa.infer import (
+    InferenceService,
+    add_config_arguments,
+    config_from_args,
+    main,
+    run_batch_inference,
+)
+from persona_gepa.managed_lm import CallPolicy, LMBudget
+
+
+def _write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as handle:
+        for record in records:
+            handle.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_batch_writes_answers_in_input_order_with_ids(persona_setup, tmp_path):
+    _stub, config, artifact = persona_setup
+    input_path = tmp_path / "in.jsonl"
+    _write_jsonl(
+        input_path,
+        [{"id": f"r{idx}", "question": f"Q{idx}?"} for idx in range(20)]
+        + ["not json", {"question": "Other?", "artifact": str(tmp_path / "missing.json")}],
+    )
+    output_path = tmp_path / "out" / "answers.jsonl"
+
+    stats = run_batch_inference(
+        config, str(input_path), str(output_path), artifact_path=artifact, concurrency=4
+    )
+
+    lines = _read_jsonl(output_path)
+    assert [line["id"] for line in lines] == [f"r{idx}" for idx in range(20)] + [21, 22]
+    assert [line["answer"] for line in lines[:20]] == [f"You asked: Q{idx}?" for idx in range(20)]
+    assert "Invalid JSON on line 21" in lines[20]["error"]
+    assert "FileNotFoundError" in lines[21]["error"]
+    assert stats["records"] == 22
+    assert stats["answered"] == 20
+    assert stats["errors"] == 2
+    assert stats["throughput_per_s"] > 0
+
+
+def test_batch_resumes_after_a_crash(persona_setup, tmp_path):
+    stub, config, artifact = persona_setup
+    input_path = tmp_path / "in.jsonl"
+    _write_jsonl(input_path, [{"question": f"Q{idx}?"} for idx in range(10)])
+    output_path = tmp_path / "answers.jsonl"
+    with open(output_path, "w", encoding="utf-8") as handle:
+        handle.write(json.dumps({"id": 1, "answer": "earlier"}) + "\n")
+        handle.write(json.dumps({"id": 2, "error": "boom"}) + "\n")
+        handle.write('{"id": 3, "ans')  # torn write from the crash
+
+    stats = run_batch_inference(
+        config, str(input_path), str(output_path), artifact_path=artifact,
+        concurrency=3, ordered=False,
+    )
+
+    lines = _read_jsonl(output_path)
+    assert lines[0] == {"id": 1, "answer": "earlier"}
+    answered = {line["id"]: line["answer"] for line in lines[2:]}
+    assert sorted(answered) == list(range(2, 11))
+    assert answered[3] == "You asked: Q2?"
+    assert stats["skipped"] == 1
+    assert stats["answered"] == 9
+    assert len(stub.requests) == 9
+
+
+def test_batch_closes_only_the_service_it_created(persona_setup, tmp_path, monkeypatch):
+    _stub, config, artifact = persona_setup
+    input_path = tmp_path / "in.jsonl"
+    _write_jsonl(input_path, [{"question": "Q?"}])
+    closed = []
+    close = InferenceService.close
+    monkeypatch.setattr(
+        InferenceService, "close", lambda self: (closed.append(self), close(self))
+    )
+
+    run_batch_inference(config, str(input_path), str(tmp_path / "a.jsonl"), artifact_path=artifact)
+    assert len(closed) == 1
+
+    service = InferenceService(config, artifact_path=artifact)
+    run_batch_inference(
+        config, str(input_path), str(tmp_path / "b.jsonl"), service=service
+    )
+    assert closed[1:] == []
+    service.close()
+
+
+def test_main_uses_the_best_stored_artifact_for_the_persona_model(persona_setup, tmp_path):
+    stub, config, _artifact = persona_setup
+    store = ArtifactStore(str(tmp_path / "store"))
+    store.put("Speak as the stub persona.", persona_id="p1", model=config.persona_model, score=0.2)
+    store.put("Speak as another model.", persona_id="p1", model="openai/other", score=0.9)
+    store.close()
+    input_path = tmp_path / "in.jsonl"
+    _write_jsonl(input_path, [{"question": "Q?"}])
+    argv = [
+        "--artifact-store", str(tmp_path / "store"),
+        "--persona-id", "p1",
+        "--persona-model", config.persona_model,
+        "--api-base", config.api_base,
+        "--cache-dir", config.cache_dir,
+        "--batch-input", str(input_path),
+        "--batch-output", str(tmp_path / "out.jsonl"),
+    ]
+
+    assert main(argv) == 0
+    assert "Speak as the stub persona." in stub.requests[0]["messages"][0]["content"]
+    with pytest.raises(SystemExit, match="openai/missing"):
+        main(argv[:4] + ["--persona-model", "openai/missing"] + argv[6:])
+
+
+def test_config_flags_set_the_persona_budget_and_call_policy():
+    parser = argparse.ArgumentParser()
+    add_config_arguments(parser)
+    args = parser.parse_args(
+        [
+            "--persona-rpm", "60",
+            "--persona-tpm", "6000",
+            "--persona-max-concurrency", "4",
+            "--lm-max-retries", "2",
+            "--lm-deadline-seconds", "30",
+            "--lm-hedge",
+            "--lm-single-flight",
+        ]
+    )
+    config = config_from_args(args)
+
+    assert config.lm_budget("persona") == LMBudget(
+        requests_per_minute=60, tokens_per_minute=6000, max_concurrency=4
+    )
+    assert config.lm_call_policy() == CallPolicy(
+        deadline_seconds=30, max_retries=2, hedge=True, single_flight=True
+    )
@@ -2,7 +2,7 @@ import pytest
 
 dspy = pytest.importorskip("dspy")
 
-from persona_gepa.judge import parse_judge_output
+from persona_gepa.judge import parse_batch_judge_output, parse_judge_output
 
 
 def test_parse_judge_output_json():
@@ -29,3 +29,18 @@ def test_parse_judge_output_fallback():
     assert judgment.faithfulness == 0.3
     assert judgment.tone == 0.4
     assert judgment.style == 0.5
+
+
+def test_parse_batch_judge_output_matches_ids_and_flags_gaps():
+    raw = (
+        "Here you go: ["
+        '{"id": 2, "accuracy": 0.1, "faithfulness": 0.2, "tone": 0.3, "style": 0.4, "feedback": "c"},'
+        '{"id": 0, "accuracy": 1, "faithfulness": 1, "tone": 1, "style": 1, "feedback": "a"},'
+        '{"id": 1, "note": "unsure"}'
+        "]"
+    )
+    judgments = parse_batch_judge_output(raw, 3)
+    assert judgments[0].feedback == "a"
+    assert judgments[1] is None
+    assert judgments[2].accuracy == 0.1
+    assert parse_batch_judge_output("not json", 2) == [None, None]
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa.judge import Judgment
+from persona_gepa.judge_cache import JudgmentCache
+from persona_gepa.metric import JudgeBatcher, build_metric
+
+
+class CountingJudge:
+    def __init__(self, replies=None):
+        self.calls = 0
+        self.replies = list(replies or [])
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        if self.replies:
+            return SimpleNamespace(judgment=self.replies.pop(0))
+        return SimpleNamespace(
+            judgment='{"accuracy": 1, "faithfulness": 0.5, "tone": 0.0, "style": 0.0, "feedback": "ok"}'
+        )
+
+
+def test_metric_reuses_cached_judgments(tmp_path):
+    cache = JudgmentCache(str(tmp_path / "judgments.sqlite"))
+    judge = CountingJudge()
+    metric = build_metric(judge, {"accuracy": 1.0}, judgment_cache=cache)
+    gold = SimpleNamespace(history="", question="Q", answer="A")
+
+    first = metric(gold, SimpleNamespace(answer="A"))
+    second = metric(gold, SimpleNamespace(answer="A"))
+    metric(gold, SimpleNamespace(answer="B"))
+
+    assert judge.calls == 2
+    assert first.score == second.score == 1.0
+    assert second.feedback == "ok"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+    reopened = JudgmentCache(str(tmp_path / "judgments.sqlite"))
+    key = reopened.key(judge, None, "", "Q", "A", "A")
+    assert reopened.get(key) == Judgment(1.0, 0.5, 0.0, 0.0, "ok")
+
+
+def test_judgment_cache_evicts_least_recently_used(tmp_path):
+    cache = JudgmentCache(str(tmp_path / "judgments.sqlite"), max_entries=10)
+    judgment = Judgment(0.1, 0.2, 0.3, 0.4, "x")
+    for idx in range(10):
+        cache.put(f"k{idx}", judgment)
+    assert cache.get("k0") == judgment
+
+    cache.put("k10", judgment)
+
+    assert cache.stats()["entries"] == 9
+    assert cache.get("k0") == judgment
+    assert cache.get("k1") is None
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_failed_judgments_are_not_cached(tmp_path, batched):
+    cache = JudgmentCache(str(tmp_path / "judgments.sqlite"))
+    judge = CountingJudge(replies=["I cannot score this.", ""])
+    batcher = None
+    if batched:
+        batcher = JudgeBatcher(None, judge, batch_size=1, judgment_cache=cache)
+    metric = build_metric(
+        judge, {"accuracy": 1.0}, judgment_cache=cache, judge_batcher=batcher
+    )
+    gold = SimpleNamespace(history="", question="Q", answer="A")
+
+    unparsed = metric(gold, SimpleNamespace(answer="A"))
+    empty = metric(gold, SimpleNamespace(answer="A"))
+    judged = metric(gold, SimpleNamespace(answer="A"))
+    cached = metric(gold, SimpleNamespace(answer="A"))
+
+    assert unparsed.feedback == "Failed to parse judge output."
+    assert empty.feedback == "No judgment returned."
+    assert judged.score == cached.score == 1.0
+    assert judge.calls == 3
+    assert cache.stats()["entries"] == 1
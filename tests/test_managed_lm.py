@@ -0,0 +1,290 @@
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+lm15 = pytest.importorskip("dspy.lm15")
+
+from persona_gepa import managed_lm as managed_lm_module
+from persona_gepa.managed_lm import (
+    AdaptiveConcurrencyLimiter,
+    CallPolicy,
+    LMBudget,
+    ManagedLM,
+    SingleFlight,
+)
+from persona_gepa.utils import build_lm
+
+
+class StubEngine:
+    def __init__(self, fail_on=()):
+        self.calls = 0
+        self.fail_on = set(fail_on)
+
+    def complete(self, request):
+        self.calls += 1
+        if self.calls in self.fail_on:
+            raise lm15.RateLimitError("slow down")
+        return self._respond()
+
+    def _respond(self):
+        return lm15.Response(
+            id=None,
+            model="stub",
+            message=lm15.Message.assistant([lm15.TextPart("hello")]),
+            finish_reason="stop",
+            usage=lm15.Usage(input_tokens=1, output_tokens=1, total_tokens=2),
+        )
+
+    def close(self):
+        pass
+
+
+def test_adaptive_limiter_halves_on_throttle_and_ramps_up():
+    now = [0.0]
+    limiter = AdaptiveConcurrencyLimiter(8, clock=lambda: now[0])
+    assert limiter.limit == 4
+
+    for _ in range(3):
+        assert limiter.try_acquire()
+    limiter.release(throttled=True)
+    limiter.release(throttled=True)  # same window: only one decrease
+    limiter.release()
+    assert 2 <= limiter.limit < 3
+
+    for _ in range(20):
+        limiter.try_acquire()
+        limiter.release()
+    assert limiter.limit > 4
+
+
+def test_managed_lm_counts_throttles_and_shares_budget_across_copies():
+    lm = ManagedLM(
+        "openai/stub",
+        engine=StubEngine(fail_on={2}),
+        cache=False,
+        num_retries=0,
+        budget=LMBudget(max_concurrency=4),
+    )
+
+    assert lm("hi") == ["hello"]
+    with pytest.raises(Exception):
+        lm("hi")
+
+    stats = lm.stats()
+    assert stats["calls"] == 2
+    assert stats["throttled"] == 1
+    assert stats["concurrency_limit"] == 1
+    assert copy.deepcopy(lm).stats() == stats
+
+
+def test_managed_lm_owns_retries():
+    engine = StubEngine(fail_on={1, 2, 3, 4})
+    lm = ManagedLM("openai/stub", engine=engine, cache=False, budget=LMBudget(max_concurrency=4))
+
+    with pytest.raises(Exception):
+        lm("hi")
+    assert engine.calls == 1
+    assert lm.stats()["throttled"] == 1
+
+    engine = StubEngine(fail_on={1, 2, 3, 4})
+    retried = ManagedLM(
+        "openai/stub",
+        engine=engine,
+        cache=False,
+        policy=CallPolicy(max_retries=1, retry_base_delay=0.001),
+    )
+    with pytest.raises(Exception):
+        retried("hi")
+    assert engine.calls == retried.stats()["calls"] == 2
+
+
+def test_managed_lm_waits_for_token_budget(monkeypatch):
+    slept = []
+    monkeypatch.setattr(managed_lm_module.time, "sleep", slept.append)
+    lm = ManagedLM(
+        "openai/stub",
+        engine=StubEngine(),
+        cache=False,
+        max_tokens=100,
+        budget=LMBudget(tokens_per_minute=600),
+    )
+
+    lm("hi")
+    lm("hi")
+
+    assert len(slept) == 2
+    assert slept[1] > slept[0] > 0
+    assert lm.stats()["rate_wait_seconds"] == pytest.approx(sum(slept))
+
+
+def test_build_lm_only_wraps_when_budgeted():
+    assert type(build_lm("openai/stub", 0.0, 16)) is dspy.LM
+    managed = build_lm("openai/stub", 0.0, 16, budget=LMBudget(requests_per_minute=60))
+    assert isinstance(managed, ManagedLM)
+
+
+class SlowFirstEngine(StubEngine):
+    """Answers instantly except for the call numbers in ``slow_on``."""
+
+    def __init__(self, slow_on=(), delay=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.slow_on = set(slow_on)
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def complete(self, request):
+        with self.lock:
+            call = self.calls + 1
+        if call in self.slow_on:
+            with self.lock:
+                self.calls += 1
+            time.sleep(self.delay)
+            return super()._respond()
+        return super().complete(request)
+
+
+class AsyncSlowEngine:
+    def __init__(self, sync):
+        self.sync = sync
+
+    async def complete(self, request):
+        with self.sync.lock:
+            self.sync.calls += 1
+            call = self.sync.calls
+        if call in self.sync.slow_on:
+            await asyncio.sleep(self.sync.delay)
+        return self.sync._respond()
+
+    async def aclose(self):
+        pass
+
+
+def _managed(engine, async_engine=None, **policy):
+    return ManagedLM(
+        "openai/stub",
+        engine=engine,
+        async_engine=async_engine,
+        cache=False,
+        num_retries=0,
+        policy=CallPolicy(**policy),
+    )
+
+
+def test_hedged_request_wins_over_slow_attempt():
+    engine = SlowFirstEngine(slow_on={4}, delay=2.0)
+    lm = _managed(engine, hedge=True, hedge_min_samples=3, hedge_min_delay=0.01)
+    for _ in range(3):
+        lm("warm up")
+
+    started = time.monotonic()
+    assert lm("hi") == ["hello"]
+
+    assert time.monotonic() - started < 1.0
+    stats = lm.stats()
+    assert stats["hedges_fired"] == 1
+    assert stats["hedges_won"] == 1
+
+
+def test_deadline_and_jittered_retries():
+    slow = _managed(SlowFirstEngine(slow_on={1}, delay=1.0), deadline_seconds=0.1)
+    with pytest.raises(TimeoutError):
+        slow("hi")
+    assert slow.stats()["deadline_exceeded"] == 1
+
+    flaky = _managed(
+        StubEngine(fail_on={1, 2}), max_retries=2, retry_base_delay=0.001
+    )
+    assert flaky("hi") == ["hello"]
+    assert flaky.stats()["retries"] == 2
+
+
+def test_async_hedged_call():
+    engine = SlowFirstEngine(slow_on={3}, delay=2.0)
+    lm = _managed(
+        engine,
+        async_engine=AsyncSlowEngine(engine),
+        hedge=True,
+        hedge_min_samples=2,
+        hedge_min_delay=0.01,
+    )
+
+    async def _run():
+        await lm.acall("warm up")
+        await lm.acall("warm up")
+        return await lm.acall("hi")
+
+    assert asyncio.run(_run()) == ["hello"]
+    assert lm.stats()["hedges_won"] == 1
+
+
+def test_hedge_timer_starts_after_admission():
+    engine = SlowFirstEngine()
+    lm = _managed(
+        engine,
+        async_engine=AsyncSlowEngine(engine),
+        hedge=True,
+        hedge_min_samples=2,
+        hedge_min_delay=0.01,
+    )
+    lm("warm up")
+    lm("warm up")
+    # Waiting for the rate budget is not latency to hedge against.
+    lm._shared.admission_delay = lambda _tokens: 0.2
+
+    assert lm("hi") == ["hello"]
+    assert asyncio.run(lm.acall("hi")) == ["hello"]
+    assert engine.calls == 4
+    assert lm.stats()["hedges_fired"] == 0
+
+
+def test_single_flight_shares_concurrent_identical_calls():
+    flights = SingleFlight()
+    calls = []
+
+    def slow_call(value):
+        calls.append(value)
+        time.sleep(0.2)
+        return [value]
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        identical = [
+            executor.submit(flights.run, "same", lambda: slow_call("same")) for _ in range(4)
+        ]
+        other = executor.submit(flights.run, "other", lambda: slow_call("other"))
+        results = [future.result() for future in identical + [other]]
+
+    assert results == [["same"]] * 4 + [["other"]]
+    assert sorted(calls) == ["other", "same"]
+    assert flights.coalesced == 3
+
+
+def test_single_flight_keys_on_prompt_and_parameters():
+    cached = ManagedLM(
+        "openai/stub", engine=StubEngine(), policy=CallPolicy(single_flight=True)
+    )
+    key = cached._flight_key("same", None, {})
+    assert key == cached._flight_key("same", None, {})
+    assert key != cached._flight_key("same", None, {"temperature": 0.7})
+    assert key != cached._flight_key("other", None, {})
+    # Uncached calls ask for fresh samples and are never shared.
+    assert cached._flight_key("same", None, {"cache": False}) is None
+
+
+def test_deadline_before_admission_never_reaches_the_backend():
+    engine = SlowFirstEngine()
+    lm = _managed(engine, async_engine=AsyncSlowEngine(engine), deadline_seconds=0.05)
+    lm._shared.admission_delay = lambda _tokens: 0.2
+
+    with pytest.raises(TimeoutError):
+        lm("hi")
+    with pytest.raises(TimeoutError):
+        asyncio.run(lm.acall("hi"))
+    time.sleep(0.4)
+
+    assert engine.calls == 0
+    assert lm.stats()["deadline_exceeded"] == 2
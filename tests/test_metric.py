@@ -1,10 +1,15 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 
 import pytest
 
 dspy = pytest.importorskip("dspy")
 
-from persona_gepa.metric import build_metric
+from persona_gepa.judge_cache import JudgmentCache
+from persona_gepa.metric import JudgeBatcher, build_metric
 
 
 class DummyJudge:
@@ -25,3 +30,117 @@ def test_metric_shape_and_signature():
     assert hasattr(result, "feedback")
     assert isinstance(result.score, float)
     assert result.feedback == "ok"
+
+
+class DummyBatchJudge:
+    predict = SimpleNamespace(signature=SimpleNamespace(instructions="Judge in batches."))
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, items):
+        parsed = json.loads(items)
+        self.calls.append(len(parsed))
+        # Score every item except the last, which must fall back to DummyJudge.
+        return SimpleNamespace(
+            judgments=json.dumps(
+                [
+                    {"id": item["id"], "accuracy": 0.5, "faithfulness": 0, "tone": 0, "style": 0, "feedback": "batched"}
+                    for item in parsed[:-1]
+                ]
+            )
+        )
+
+
+def test_metric_batches_concurrent_judge_calls():
+    batch_judge = DummyBatchJudge()
+    batcher = JudgeBatcher(batch_judge, DummyJudge(), batch_size=4, max_wait_ms=5000)
+    metric = build_metric(DummyJudge(), {"accuracy": 1.0}, judge_batcher=batcher)
+    gold = SimpleNamespace(history="", question="Q", answer="A")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(lambda idx: metric(gold, SimpleNamespace(answer=str(idx))), range(4))
+        )
+
+    assert batch_judge.calls == [4]
+    assert sorted(result.feedback for result in results) == ["batched"] * 3 + ["ok"]
+    assert batcher.stats() == {"batches": 1, "batched_items": 4, "fallbacks": 1}
+
+
+def _judge_concurrently(metric, gold, answers):
+    with ThreadPoolExecutor(max_workers=len(answers)) as executor:
+        return list(executor.map(lambda answer: metric(gold, SimpleNamespace(answer=answer)), answers))
+
+
+def test_batched_judgments_are_cached_under_the_batch_program(tmp_path):
+    cache = JudgmentCache(str(tmp_path / "judgments.sqlite"))
+    single_judge = DummyJudge()
+    batch_judge = DummyBatchJudge()
+    batcher = JudgeBatcher(
+        batch_judge, single_judge, batch_size=4, max_wait_ms=5000, judgment_cache=cache
+    )
+    metric = build_metric(single_judge, {"accuracy": 1.0}, judge_batcher=batcher)
+    gold = SimpleNamespace(history="", question="Q", answer="A")
+    answers = ["0", "1", "2", "3"]
+
+    first = _judge_concurrently(metric, gold, answers)
+    second = _judge_concurrently(metric, gold, answers)
+
+    assert batch_judge.calls == [4]
+    assert sorted(result.feedback for result in first) == ["batched"] * 3 + ["ok"]
+    assert [result.feedback for result in second] == [result.feedback for result in first]
+    for answer, result in zip(answers, first):
+        batch_key = cache.key(batch_judge, None, "", "Q", "A", answer)
+        single_key = cache.key(single_judge, None, "", "Q", "A", answer)
+        batched = result.feedback == "batched"
+        assert (cache.get(batch_key) is not None) == batched
+        assert (cache.get(single_key) is not None) == (not batched)
+
+    # An unbatched run does not reuse batch-scored answers.
+    unbatched = build_metric(single_judge, {"accuracy": 1.0}, judgment_cache=cache)
+    assert {unbatched(gold, SimpleNamespace(answer=answer)).feedback for answer in answers} == {"ok"}
+
+
+class FailingBatchJudge:
+    def __call__(self, items):
+        raise RuntimeError("batch endpoint down")
+
+
+def test_failed_batch_call_is_logged_and_rejudged(caplog):
+    batcher = JudgeBatcher(FailingBatchJudge(), DummyJudge(), batch_size=2, max_wait_ms=5000)
+    metric = build_metric(DummyJudge(), {"accuracy": 1.0}, judge_batcher=batcher)
+    gold = SimpleNamespace(history="", question="Q", answer="A")
+
+    with caplog.at_level(logging.DEBUG, logger="persona_gepa.metric"):
+        results = _judge_concurrently(metric, gold, ["0", "1"])
+
+    assert [result.feedback for result in results] == ["ok", "ok"]
+    assert batcher.stats()["fallbacks"] == 2
+    (record,) = caplog.records
+    assert "batch endpoint down" in str(record.exc_info[1])
+
+
+class BarrierJudge(DummyJudge):
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.threads = set()
+
+    def __call__(self, **kwargs):
+        self.threads.add(threading.get_ident())
+        self.barrier.wait()
+        return super().__call__(**kwargs)
+
+
+def test_unparsed_batch_items_are_rejudged_by_their_own_callers():
+    single_judge = BarrierJudge(parties=3)
+    batcher = JudgeBatcher(FailingBatchJudge(), single_judge, batch_size=3, max_wait_ms=5000)
+    metric = build_metric(single_judge, {"accuracy": 1.0}, judge_batcher=batcher)
+    gold = SimpleNamespace(history="", question="Q", answer="A")
+
+    # Serial fallbacks in the flushing thread would break the barrier.
+    results = _judge_concurrently(metric, gold, ["0", "1", "2"])
+
+    assert [result.feedback for result in results] == ["ok"] * 3
+    assert len(single_judge.threads) == 3
+    assert batcher.stats()["fallbacks"] == 3
@@ -1,3 +1,6 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 
 import pytest
@@ -6,6 +9,7 @@ dspy = pytest.importorskip("dspy")
 
 from persona_gepa.config import PersonaGEPAConfig
 from persona_gepa import optimize as optimize_module
+from persona_gepa.metric import JudgeBatcher
 
 
 def test_run_optimization_configures_lm(monkeypatch, tmp_path):
@@ -45,3 +49,115 @@ def test_run_optimization_configures_lm(monkeypatch, tmp_path):
     optimize_module.run_optimization(config, trainset=[], valset=[])
 
     assert configure_calls["lm"] is persona_lm
+
+
+class _AsyncPersona:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    def __call__(self, history, question, persona_profile=""):
+        return SimpleNamespace(answer=question)
+
+    async def acall(self, history, question, persona_profile=""):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return SimpleNamespace(answer=question)
+
+
+class _EchoJudge:
+    def _judge(self, reference_answer, candidate_answer, **_kwargs):
+        score = 1.0 if reference_answer == candidate_answer else 0.0
+        return SimpleNamespace(
+            judgment=json.dumps(
+                {"accuracy": score, "faithfulness": 1, "tone": 0, "style": 0, "feedback": ""}
+            )
+        )
+
+    def __call__(self, **kwargs):
+        return self._judge(**kwargs)
+
+    async def acall(self, **kwargs):
+        return self._judge(**kwargs)
+
+
+def test_async_engine_matches_thread_engine():
+    valset = [
+        SimpleNamespace(history="", question=f"q{idx}", answer=f"q{idx}" if idx % 2 else "x")
+        for idx in range(20)
+    ]
+    persona = _AsyncPersona()
+    weights = {"accuracy": 1.0}
+
+    threaded = optimize_module._evaluate_program(persona, valset, _EchoJudge(), weights, 4)
+    async_report = optimize_module._evaluate_program(
+        persona, valset, _EchoJudge(), weights, 4, engine="async", concurrency=5
+    )
+
+    assert async_report == threaded
+    assert threaded["mean_accuracy"] == 0.5
+    assert persona.peak == 5
+
+
+class _ScoreAllBatchJudge:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, items):
+        parsed = json.loads(items)
+        self.calls.append(len(parsed))
+        return SimpleNamespace(
+            judgments=json.dumps(
+                [
+                    {"id": item["id"], "accuracy": 1, "faithfulness": 1, "tone": 0, "style": 0, "feedback": ""}
+                    for item in parsed
+                ]
+            )
+        )
+
+
+def test_async_engine_judges_batches_beyond_the_default_executor():
+    valset = [SimpleNamespace(history="", question=f"q{idx}", answer=f"q{idx}") for idx in range(8)]
+    batch_judge = _ScoreAllBatchJudge()
+    batcher = JudgeBatcher(
+        batch_judge, _EchoJudge(), batch_size=8, max_wait_ms=1000
+    )
+
+    async def evaluate():
+        # A one-thread default executor could hold only one waiting caller.
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        return await optimize_module._aevaluate_examples(
+            _AsyncPersona(), valset, None, {"accuracy": 1.0}, 8, judge_batcher=batcher
+        )
+
+    results = asyncio.run(evaluate())
+
+    assert [score for score, _judgment in results] == [1.0] * 8
+    assert batch_judge.calls == [8]
+
+
+@pytest.mark.parametrize("engine", ["threads", "async", "pipeline"])
+def test_early_stopping_evaluates_a_fraction_of_the_valset(engine):
+    valset = [
+        SimpleNamespace(
+            history="", question=f"q{idx}", answer=f"q{idx}" if idx % 2 else "x", persona_id=idx % 7
+        )
+        for idx in range(4000)
+    ]
+
+    report = optimize_module._evaluate_program(
+        _AsyncPersona(),
+        valset,
+        _EchoJudge(),
+        {"accuracy": 1.0},
+        4,
+        engine=engine,
+        ci_half_width=0.05,
+    )
+
+    assert report["examples_used"] == report["count"] < 600
+    assert report["valset_size"] == 4000
+    assert report["ci_half_width"] <= 0.05
+    assert report["ci_low"] <= 0.5 <= report["ci_high"]
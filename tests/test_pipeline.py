@@ -0,0 +1,72 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa import optimize as optimize_module
+from persona_gepa.pipeline import Stage, run_pipeline
+
+
+def test_run_pipeline_runs_stages_and_reports_stats():
+    seen_threads = {"first": set(), "second": set()}
+
+    def first(item):
+        seen_threads["first"].add(threading.current_thread().name)
+        return item * 2
+
+    def second(item):
+        seen_threads["second"].add(threading.current_thread().name)
+        time.sleep(0.001)
+        return item + 1
+
+    outputs, stats = run_pipeline(
+        range(50), [Stage("first", first, workers=2), Stage("second", second, workers=3)]
+    )
+
+    assert sorted(outputs) == [n * 2 + 1 for n in range(50)]
+    assert all(name.startswith("first-") for name in seen_threads["first"])
+    assert all(name.startswith("second-") for name in seen_threads["second"])
+    assert stats["first"]["processed"] == stats["second"]["processed"] == 50.0
+    assert stats["second"]["queue_max_depth"] <= 6
+    assert stats["first"]["throughput_per_s"] > 0
+
+
+def test_run_pipeline_reraises_stage_errors():
+    def explode(item):
+        if item == 3:
+            raise ValueError("boom")
+        return item
+
+    with pytest.raises(ValueError, match="boom"):
+        run_pipeline(range(100), [Stage("only", explode, workers=2)])
+
+
+def test_pipeline_engine_matches_thread_engine():
+    class Persona:
+        def __call__(self, history, question, persona_profile=""):
+            return SimpleNamespace(answer=question)
+
+    class Judge:
+        def __call__(self, reference_answer, candidate_answer, **_kwargs):
+            score = 1 if reference_answer == candidate_answer else 0
+            return SimpleNamespace(
+                judgment=f'{{"accuracy": {score}, "faithfulness": 1, "tone": 0, "style": 0}}'
+            )
+
+    valset = [
+        SimpleNamespace(history="", question=f"q{idx}", answer=f"q{idx}" if idx % 4 else "x")
+        for idx in range(16)
+    ]
+    weights = {"accuracy": 1.0}
+
+    threaded = optimize_module._evaluate_program(Persona(), valset, Judge(), weights, 4)
+    pipelined = optimize_module._evaluate_program(
+        Persona(), valset, Judge(), weights, 4, engine="pipeline", persona_workers=2, judge_workers=3
+    )
+
+    assert {key: pipelined[key] for key in threaded} == threaded
+    assert pipelined["persona_stage_processed"] == 16.0
+    assert "judge_stage_queue_mean_depth" in pipelined
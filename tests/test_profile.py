@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa.data import build_examples, format_history
+from persona_gepa.profile import ProfileBuilder, ProfileCache, attach_profiles
+
+
+class CountingSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous_profile, transcript):
+        self.calls.append(transcript)
+        return SimpleNamespace(profile=f"{previous_profile}|{transcript.count('Q: ')}")
+
+
+def _interview(turns):
+    return [{"q": f"Q{idx}", "a": f"A{idx}"} for idx in range(turns)]
+
+
+def test_attach_profiles_summarizes_each_window_once(tmp_path):
+    interview = _interview(7)
+    summarizer = CountingSummarizer()
+    builder = ProfileBuilder(summarizer, chunk_turns=2, cache=ProfileCache(str(tmp_path)))
+
+    examples = attach_profiles(build_examples([interview]), builder)
+    example = examples[5]
+
+    assert example.persona_profile == "|2|2"
+    assert example.history == format_history(interview[4:5])
+    assert set(example.inputs().keys()) == {"history", "question", "persona_profile"}
+    assert examples[1].persona_profile == ""
+    assert len(summarizer.calls) == 3
+
+    cached = ProfileBuilder(CountingSummarizer(), chunk_turns=2, cache=ProfileCache(str(tmp_path)))
+    assert cached.for_history(format_history(interview[:5])) == (
+        "|2|2",
+        format_history(interview[4:5]),
+    )
+    assert cached.summarizer.calls == []
@@ -0,0 +1,77 @@
+import random
+import statistics
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+
+from persona_gepa.data import build_examples
+from persona_gepa.sequential import (
+    RunningStats,
+    SequentialEstimate,
+    strata_keys,
+    stratified_order,
+)
+
+
+def test_running_stats_match_statistics_module():
+    rng = random.Random(3)
+    values = [rng.random() for _ in range(500)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == 500
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+
+
+def test_stratified_order_keeps_persona_shares_in_every_prefix():
+    keys = ["a"] * 600 + ["b"] * 300 + ["c"] * 100
+    order = stratified_order(keys, seed=1)
+
+    assert sorted(order) == list(range(1000))
+    assert order != sorted(order)
+    for prefix in (20, 100, 250):
+        counts = Counter(keys[index] for index in order[:prefix])
+        assert abs(counts["a"] - 0.6 * prefix) <= 2
+        assert abs(counts["c"] - 0.1 * prefix) <= 2
+
+
+def test_strata_keys_read_lazy_sequences_without_building_examples():
+    interviews = [[{"q": "Q?", "a": "A."}] * 3, [{"q": "Q?", "a": "A."}] * 2]
+    examples = build_examples(interviews, persona_ids=["p1", "p2"])
+    assert strata_keys(examples) == ["p1"] * 3 + ["p2"] * 2
+    assert strata_keys([SimpleNamespace(persona_id="x")]) == ["x"]
+
+
+def test_estimate_stops_at_target_half_width():
+    estimate = SequentialEstimate(10_000, half_width=0.05, min_examples=30)
+    fed = 0
+    for _ in estimate.feed(list(range(10_000)), range(10_000)):
+        estimate.add(float(fed % 2))
+        fed += 1
+
+    report = estimate.report()
+    # 1.96 * 0.5 / sqrt(n) <= 0.05 needs n ~= 385 (a bit fewer with the
+    # finite-population correction).
+    assert 350 < fed < 400
+    assert report["examples_used"] == fed
+    assert report["ci_half_width"] <= 0.05
+    assert report["ci_low"] < 0.5 < report["ci_high"]
+    assert report["stopped_early"] == 1.0
+
+
+def test_estimate_caps_examples_and_reports_exact_interval_when_complete():
+    capped = SequentialEstimate(100, max_examples=10)
+    assert len(list(capped.feed(list(range(100)), range(100)))) == 10
+
+    complete = SequentialEstimate(5, max_examples=10)
+    for score in (0.0, 1.0, 1.0, 0.0, 1.0):
+        complete.add(score)
+    report = complete.report()
+    assert report["ci_half_width"] == 0.0
+    assert report["ci_low"] == report["ci_high"] == pytest.approx(0.6)
+    assert report["stopped_early"] == 0.0
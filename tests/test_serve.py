@@ -0,0 +1,81 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+dspy = pytest.importorskip("dspy")
+pytest.importorskip("dspy.lm15")
+
+from persona_gepa.serve import InferenceService, make_server
+
+
+def _post(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers={"content-type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+@pytest.fixture
+def served(persona_setup):
+    stub, config, artifact = persona_setup
+    service = InferenceService(config, artifact_path=artifact, max_batch_workers=4)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield stub, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_answer_uses_warm_program_and_reports_timings(served):
+    stub, base = served
+
+    status, first = _post(f"{base}/answer", {"question": "Where do you live?", "history": ""})
+    assert status == 200
+    assert first["answer"] == "You asked: Where do you live?"
+    assert set(first["timings"]) == {
+        "load_ms", "profile_ms", "history_ms", "predict_ms", "total_ms"
+    }
+    assert first["timings"]["total_ms"] >= first["timings"]["predict_ms"]
+
+    status, second = _post(f"{base}/answer", {"question": "What do you do?"})
+    assert status == 200
+    assert second["answer"] == "You asked: What do you do?"
+    assert second["timings"]["load_ms"] < 5
+    assert len(stub.requests) == 2
+
+
+def test_batch_answers_in_order_and_isolates_failures(served):
+    _stub, base = served
+    items = [{"question": f"Question {idx}?"} for idx in range(6)]
+    items.insert(3, {"question": ""})
+
+    status, payload = _post(f"{base}/batch", {"items": items})
+
+    assert status == 200
+    results = payload["results"]
+    assert [result.get("answer") for result in results if "answer" in result] == [
+        f"You asked: Question {idx}?" for idx in range(6)
+    ]
+    assert "question is required" in results[3]["error"]
+    assert payload["timings"]["total_ms"] > 0
+
+
+def test_bad_requests_get_client_errors(served):
+    _stub, base = served
+    assert _post(f"{base}/answer", {"history": "no question"})[0] == 400
+    assert _post(f"{base}/batch", {"items": "nope"})[0] == 400
+    assert _post(f"{base}/answer", {"question": "Hi?", "artifact_path": "/missing.json"})[0] == 400
+    assert _post(f"{base}/unknown", {})[0] == 404
+    with urllib.request.urlopen(f"{base}/health") as response:
+        health = json.loads(response.read())
+    assert health["status"] == "ok"
+    assert health["programs"]["size"] == 1